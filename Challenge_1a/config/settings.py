@@ -14,6 +14,52 @@ MODEL_DIR = DATA_DIR / "models"
 MAX_PROCESSING_TIME = 20  # seconds
 BATCH_SIZE = 32
 MAX_FILE_SIZE_MB = 100
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0"))  # batch worker processes, 0 = one per available core
+PAGE_SHARD_WORKERS = int(os.getenv("PAGE_SHARD_WORKERS", "0"))  # page-shard processes per document, 0 = the worker's share of the cores
+PAGE_SHARD_MIN_PAGES = 200  # only shard documents at least this long
+
+# Cores split between PDF parsing processes and torch inference threads (see
+# src/utils/cpu_scheduler.py): "auto", or "WORKERS:THREADS" to fix worker processes
+# and torch threads per worker
+CPU_SPLIT = os.getenv("CPU_SPLIT", "auto")
+CPU_CORES = int(os.getenv("CPU_CORES", "0"))  # cores to plan for, 0 = detect (CPU affinity, cgroup quota)
+
+# Deadline-aware processing: on a timeout, stages stop early and a partial result is returned
+DEADLINE_FINISH_RESERVE = float(os.getenv("DEADLINE_FINISH_RESERVE", "1.0"))  # seconds (max 10% of the budget) kept for hierarchy and output
+DEADLINE_SEMANTIC_MIN_SECONDS = float(os.getenv("DEADLINE_SEMANTIC_MIN_SECONDS", "5.0"))  # skip semantic filtering with less time left
+DEADLINE_MODEL_LOAD_SECONDS = float(os.getenv("DEADLINE_MODEL_LOAD_SECONDS", "3.0"))  # added to the above while the model is not loaded yet
+
+# Memo of per-text heading analysis (is_likely_heading, CJK heading analysis)
+HEADING_ANALYSIS_CACHE_SIZE = int(os.getenv("HEADING_ANALYSIS_CACHE_SIZE", "8192"))  # entries, LRU
+
+# Embedding Store (memory-mapped, shared by worker processes and Challenge 1B)
+EMBEDDING_STORE_DIR = Path(os.getenv("EMBEDDING_STORE_DIR", str(DATA_DIR / "embedding_store")))
+EMBEDDING_STORE_MAX_MB = float(os.getenv("EMBEDDING_STORE_MAX_MB", "512"))  # oldest shards evicted above this size
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")  # float16 halves the size
+
+# Result Cache (disable with RESULT_CACHE=false or --no-cache)
+RESULT_CACHE_DIR = DATA_DIR / "result_cache"
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "256"))  # LRU eviction above this size
+
+# Extraction daemon (python -m src.main daemon): extract forwards to it when it is running
+DAEMON_SOCKET = Path(os.getenv("EXTRACT_DAEMON_SOCKET", str(DATA_DIR / "extractd.sock")))
+DAEMON_CONNECT_TIMEOUT = float(os.getenv("DAEMON_CONNECT_TIMEOUT", "0.5"))  # seconds before extract runs in-process
+DAEMON_IDLE_TIMEOUT = float(os.getenv("DAEMON_IDLE_TIMEOUT", "0"))  # seconds without requests before exiting, 0 = never
+
+# Tracing (enabled with --trace or src.utils.tracing.enable())
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # fraction of documents traced
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "1000000"))  # events kept in memory
+
+# Benchmarks (python -m src.main benchmark)
+BENCHMARK_BASELINE_FILE = BASE_DIR / "config" / "benchmark_baseline.json"
+BENCHMARK_CORPUS_DIR = DATA_DIR / "benchmark_corpus"
+BENCHMARK_DOCUMENT_TIMEOUT = 3600  # seconds per document
+BENCHMARK_THRESHOLDS = {  # allowed relative change in the bad direction before failing
+    "p50_ms": 0.25,
+    "p95_ms": 0.35,
+    "pages_per_sec": 0.25,
+    "peak_rss_mb": 0.20
+}
 
 # Font Analysis Thresholds
 # Make font thresholds more inclusive
@@ -24,12 +70,51 @@ BOLD_WEIGHT_THRESHOLD = 400      # Lower threshold
 MIN_HEADING_LENGTH = 2           # Allow shorter headings
 MAX_HEADING_LENGTH = 300         # Allow longer headings
 
+# Candidate scoring: points per rule, summed per candidate and divided by 100
+CANDIDATE_SCORE_WEIGHTS = {
+    "font_size_ratio": 10,          # per multiple of the average font size...
+    "font_size_max": 30,            # ...capped at this
+    "bold": 20,
+    "top_of_page": 15,
+    "upper_page": 10,               # position ratio < 0.3 (when not top of page)
+    "spacing_before": 8,            # more than 10pt above
+    "spacing_after": 7,             # more than 5pt below
+    "numbering": 15,
+    "title_case": 5,
+    "colon": 5,
+    "cjk_small_font_factor": 0.3,   # CJK below 1.2x average size without chapter/section pattern
+    "cjk_chapter": 40,
+    "cjk_section": 25,
+    "cjk_confidence": 15,           # per unit of CJK heading analysis confidence
+    "contains_cjk": 10,
+    "confidence_boost": 20,         # per unit of language confidence boost
+    "cultural_heading_style": 15,
+    "cultural_numbering": 10,
+    "linguistic_confidence": 10,    # per unit of is_likely_heading confidence
+}
+
 # Semantic Filtering
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 # EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L12-v2"
 # EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L12-v1" #till now we can use either of the above all give similar accuracy with this one's being slightly higher cause of embedding dim
 #EMBEDDING_MODEL = "sentence-transformers/nli-distilroberta-base-v2" #bigger model gives similar results so shifted to the minilml12v1
 
+# Inference backend: "fp32" (full precision) or "int8" (dynamically quantized Linear
+# layers, CPU only, quantized once and kept in QUANTIZED_MODEL_DIR)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "fp32")
+QUANTIZED_MODEL_DIR = MODEL_DIR / "quantized"
+
+# Loaded models are shared by every EmbeddingModel in the process. Above the budget,
+# models no one holds are unloaded least recently used first; a model unused for
+# MODEL_IDLE_TTL seconds is unloaded even if held (reloaded on next use, 0 = never)
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+MODEL_IDLE_TTL = float(os.getenv("MODEL_IDLE_TTL", "0"))
+
+# Uncached texts are encoded longest first in batches of similar token length. A batch
+# grows until its padded size (texts x longest text, in tokens) would pass the budget
+ENCODE_TOKEN_BUDGET = int(os.getenv("ENCODE_TOKEN_BUDGET", "4096"))
+ENCODE_MAX_BATCH_SIZE = int(os.getenv("ENCODE_MAX_BATCH_SIZE", "256"))  # texts per batch
+
 SEMANTIC_SIMILARITY_THRESHOLD = 0.5
 CONTEXT_WINDOW = 3  # paragraphs before/after
 
@@ -13,11 +13,16 @@ __all__ = [
     "__description__"
 ]
 
-# Optional: Import main classes for convenience
-try:
-    from src.core.pdf_processor import PDFProcessor
-    from src.utils.validation import validate_pdf
-    __all__.extend(["PDFProcessor", "validate_pdf"])
-except ImportError:
-    # Graceful handling if dependencies aren't available yet
-    pass
\ No newline at end of file
+# Main classes for convenience, imported on first access so that light entry
+# points (the extract client of a running daemon) do not load the pipeline
+__all__.extend(["PDFProcessor", "validate_pdf"])
+
+
+def __getattr__(name):
+    if name == "PDFProcessor":
+        from src.core.pdf_processor import PDFProcessor
+        return PDFProcessor
+    if name == "validate_pdf":
+        from src.utils.validation import validate_pdf
+        return validate_pdf
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,58 @@
+from src.benchmarks.corpus import build_scaled_corpus, list_pdfs
+from src.benchmarks.synthetic import (
+    SyntheticSpec,
+    NUMBERING_STYLES,
+    generate_document,
+    generate_corpus,
+    load_ground_truth,
+    evaluate_outline
+)
+from src.benchmarks.runner import (
+    SCENARIOS,
+    run_benchmarks,
+    run_scenario,
+    compare_to_baseline,
+    percentile
+)
+from src.benchmarks.quantization import compare_backends
+
+__all__ = [
+    "SCENARIOS",
+    "build_scaled_corpus",
+    "list_pdfs",
+    "SyntheticSpec",
+    "NUMBERING_STYLES",
+    "generate_document",
+    "generate_corpus",
+    "load_ground_truth",
+    "evaluate_outline",
+    "run_benchmarks",
+    "run_scenario",
+    "compare_to_baseline",
+    "percentile",
+    "compare_backends"
+]
+
+# Module documentation
+__doc__ = """
+Reproducible performance benchmarks for the extraction pipeline.
+
+Runs the full pipeline over sample_dataset/pdfs and a scaled corpus built from
+its pages, in fast and semantic mode with cold and warm models, and reports
+p50/p95 latency, pages/sec, peak RSS and a per-stage breakdown as JSON.
+
+The synthetic generator writes parameterized documents (up to 5000 pages,
+columns, heading depth, per-language numbering, running headers, TOC, tables)
+with ground-truth outlines for offline accuracy measurements.
+
+The quantization check runs the semantic pipeline with the fp32 and int8
+embedding backends and reports embedding cosine, similarity-score drift and
+outline agreement.
+
+Usage:
+    python -m src.main benchmark --output report.json
+    python -m src.main benchmark --scenario fast-cold --scenario fast-warm
+    python -m src.main benchmark --update-baseline
+    python -m src.main generate-corpus --pages 1000 --language japanese --evaluate
+    python -m src.main quantization-check --output quantization.json
+"""
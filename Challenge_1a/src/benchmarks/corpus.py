@@ -0,0 +1,62 @@
+import logging
+from pathlib import Path
+from typing import List, Iterable, Union
+
+import fitz  # PyMuPDF
+
+
+logger = logging.getLogger(__name__)
+
+
+def list_pdfs(directory: Union[str, Path]) -> List[str]:
+    """Sorted PDF paths in a directory."""
+    return sorted(str(p) for p in Path(directory).iterdir() if p.suffix.lower() == ".pdf")
+
+
+def build_scaled_corpus(source_pdfs: Iterable[str], output_dir: Union[str, Path],
+                        page_counts: Iterable[int] = (50, 200)) -> List[str]:
+    """
+    Build long benchmark documents by cycling through the pages of real PDFs.
+
+    One document is written per requested page count (``scaled_<n>p.pdf``) and
+    reused on later runs, so timings stay comparable across runs. The pages are
+    real sample pages, which keeps fonts, layout and heading density realistic.
+    """
+    source_pdfs = list(source_pdfs)
+    if not source_pdfs:
+        raise ValueError("No source PDFs to build the scaled corpus from")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    corpus = []
+    for page_count in page_counts:
+        target = output_dir / f"scaled_{page_count}p.pdf"
+        if not target.exists():
+            logger.info(f"Building scaled benchmark document: {target.name}")
+            _write_scaled_document(source_pdfs, target, page_count)
+        corpus.append(str(target))
+
+    return corpus
+
+
+def _write_scaled_document(source_pdfs: List[str], target: Path, page_count: int) -> None:
+    output = fitz.open()
+    sources = [fitz.open(path) for path in source_pdfs]
+
+    try:
+        source_index = 0
+        while len(output) < page_count:
+            source = sources[source_index % len(sources)]
+            pages_needed = page_count - len(output)
+            output.insert_pdf(source, from_page=0, to_page=min(len(source), pages_needed) - 1)
+            source_index += 1
+
+        # Write next to the target and rename, so an interrupted run leaves no partial file
+        tmp_target = target.with_suffix(".tmp")
+        output.save(str(tmp_target), garbage=3, deflate=True)
+        tmp_target.replace(target)
+    finally:
+        output.close()
+        for source in sources:
+            source.close()
@@ -0,0 +1,133 @@
+"""
+Accuracy check of the int8 embedding backend against fp32.
+
+Runs the semantic pipeline over a set of PDFs once per backend and reports how
+far the int8 model drifts: cosine between the two embeddings of each extracted
+heading, the largest change in pairwise similarity scores, and outline
+agreement per document (fp32 outline taken as the reference).
+"""
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from config.settings import BENCHMARK_DOCUMENT_TIMEOUT
+from src.benchmarks.synthetic import evaluate_outline
+
+
+REFERENCE_BACKEND = "fp32"
+
+
+def _run_pipeline(paths: List[str], embedding_model) -> Dict[str, Dict[str, Any]]:
+    """Title and outline of every document in semantic mode."""
+    from src.core.pdf_processor import PDFProcessor
+
+    results = {}
+    for path in paths:
+        processor = PDFProcessor(embedding_model=embedding_model)
+        result = processor.process(path, timeout=BENCHMARK_DOCUMENT_TIMEOUT, include_metadata=False)
+        results[Path(path).name] = {"title": result.get("title", ""), "outline": result.get("outline", [])}
+    return results
+
+
+def _encode_timed(embedding_model, texts: List[str], repeats: int) -> Dict[str, Any]:
+    """Embeddings of ``texts`` and the best of ``repeats`` encode timings."""
+    embedding_model.encode_matrix(texts[:8])  # warm up kernels outside the timing
+    timings = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        matrix = embedding_model.encode_matrix(texts)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "matrix": matrix,
+        "encode_s": round(best, 4),
+        "texts_per_sec": round(len(texts) / best, 1) if best > 0 else 0.0,
+    }
+
+
+def compare_backends(paths: List[str], model_name: Optional[str] = None, backend: str = "int8",
+                     repeats: int = 3) -> Dict[str, Any]:
+    """
+    Compare ``backend`` with fp32 on ``paths`` and return a JSON-ready report.
+
+    Embeddings are computed with the embedding store disabled so every run
+    measures the model itself. The texts compared are the deduplicated titles
+    and outline entries of the fp32 run.
+    """
+    from src.models.embedding_model import EmbeddingModel
+
+    os.environ["FAST_MODE"] = "false"
+    os.environ["RESULT_CACHE"] = "false"  # a cached fp32 result would hide the int8 one
+
+    runs = {}
+    for name in (REFERENCE_BACKEND, backend):
+        embedding_model = EmbeddingModel(model_name, cache_embeddings=False, backend=name)
+        start = time.perf_counter()
+        embedding_model.preload_model()
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        documents = _run_pipeline(paths, embedding_model)
+        runs[name] = {
+            "model": embedding_model,
+            "documents": documents,
+            "load_s": round(load_s, 3),
+            "pipeline_s": round(time.perf_counter() - start, 3),
+        }
+
+    reference = runs[REFERENCE_BACKEND]["documents"]
+    texts = list(dict.fromkeys(
+        text for doc in reference.values()
+        for text in [doc["title"]] + [item["text"] for item in doc["outline"]]
+        if text and text.strip()
+    ))
+
+    encodings = {name: _encode_timed(run["model"], texts, repeats) for name, run in runs.items()} if texts else {}
+
+    similarity = {"texts": len(texts)}
+    if texts:
+        fp32 = encodings[REFERENCE_BACKEND]["matrix"]
+        other = encodings[backend]["matrix"]
+        # Rows are L2-normalized, so row-wise dot products are cosines
+        cosines = np.einsum("ij,ij->i", fp32.astype(np.float64), other.astype(np.float64))
+        score_diff = np.abs(fp32 @ fp32.T - other @ other.T)
+        similarity.update({
+            "cosine_mean": round(float(cosines.mean()), 6),
+            "cosine_min": round(float(cosines.min()), 6),
+            "score_abs_diff_mean": round(float(score_diff.mean()), 6),
+            "score_abs_diff_max": round(float(score_diff.max()), 6),
+        })
+
+    documents = {}
+    for doc_name, expected in reference.items():
+        actual = runs[backend]["documents"][doc_name]
+        scores = evaluate_outline(actual["outline"], expected["outline"])
+        scores["title_match"] = actual["title"] == expected["title"]
+        documents[doc_name] = scores
+
+    f1_values = [scores["f1"] if scores["expected"] or scores["predicted"] else 1.0 for scores in documents.values()]
+    return {
+        "reference": REFERENCE_BACKEND,
+        "backend": backend,
+        "model": runs[REFERENCE_BACKEND]["model"].model_name,
+        "timing": {
+            name: {
+                "load_s": run["load_s"],
+                "pipeline_s": run["pipeline_s"],
+                "encode_s": encodings[name]["encode_s"] if texts else None,
+                "texts_per_sec": encodings[name]["texts_per_sec"] if texts else None,
+            }
+            for name, run in runs.items()
+        },
+        "similarity": similarity,
+        "outline": {
+            "documents": len(documents),
+            "identical": sum(1 for name in documents if runs[backend]["documents"][name] == reference[name]),
+            "f1_mean": round(sum(f1_values) / len(f1_values), 4) if f1_values else 0.0,
+            "f1_min": round(min(f1_values), 4) if f1_values else 0.0,
+            "titles_matched": sum(1 for scores in documents.values() if scores["title_match"]),
+        },
+        "documents": documents,
+    }
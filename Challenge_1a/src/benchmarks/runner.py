@@ -0,0 +1,320 @@
+"""
+Performance benchmark suite for the extraction pipeline.
+
+Every scenario runs in a fresh interpreter (``python -m src.benchmarks.runner
+--child ...``) so cold-start costs and peak RSS are measured in isolation. The
+parent collects one JSON report and can compare it with a committed baseline.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.settings import BASE_DIR, BENCHMARK_THRESHOLDS, BENCHMARK_DOCUMENT_TIMEOUT
+
+
+# name -> (fast mode, model loaded and warmed up before timing)
+SCENARIOS = {
+    "fast-cold": {"fast_mode": True, "warm": False},
+    "fast-warm": {"fast_mode": True, "warm": True},
+    "semantic-cold": {"fast_mode": False, "warm": False},
+    "semantic-warm": {"fast_mode": False, "warm": True},
+}
+
+# Metrics compared against the baseline and whether a higher value is worse
+COMPARED_METRICS = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "pages_per_sec": False,
+    "peak_rss_mb": True,
+}
+
+# Trace span categories summed into the per-stage breakdown
+BREAKDOWN_CATEGORIES = ("stage", "mupdf", "model")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summarize(latencies: List[float], pages: int) -> Dict[str, Any]:
+    total = sum(latencies)
+    return {
+        "documents": len(latencies),
+        "pages": pages,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "total_s": round(total, 3),
+        "pages_per_sec": round(pages / total, 2) if total > 0 else 0.0,
+    }
+
+
+def _stage_breakdown(events: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Total milliseconds per span name for the breakdown categories."""
+    totals = defaultdict(float)
+    for event in events:
+        if event.get("cat") in BREAKDOWN_CATEGORIES:
+            totals[f"{event['cat']}:{event['name']}"] += event["dur"] / 1000
+    return {name: round(ms, 2) for name, ms in sorted(totals.items())}
+
+
+def run_scenario(scenario: str, corpora: Dict[str, List[str]], iterations: int = 1,
+                 launched_at: Optional[float] = None, cpu_split: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run one scenario in the current process (called in the child interpreter).
+
+    Cold scenarios process every document once, so the first document pays for
+    imports and model loading. Warm scenarios preload the model and run one
+    untimed pass first, then time ``iterations`` passes. ``launched_at`` is
+    the wall-clock time the parent started this interpreter; startup time is
+    measured from it (``import src`` already pulls in the pipeline).
+    Documents run one at a time with the single-document core split
+    (``cpu_split`` overrides it), which the report records.
+    """
+    options = SCENARIOS[scenario]
+    os.environ["FAST_MODE"] = "true" if options["fast_mode"] else "false"
+    os.environ["RESULT_CACHE"] = "false"  # always measure the pipeline itself
+
+    from src.utils.cpu_scheduler import plan_cores, apply_thread_limits
+
+    split = plan_cores(jobs=1, fast_mode=options["fast_mode"], split=cpu_split)
+    apply_thread_limits(split)  # before torch is imported, so its pools start at this size
+
+    from src.core.pdf_processor import PDFProcessor
+    from src.utils import tracing
+    import fitz
+
+    startup_time = time.time() - launched_at if launched_at else None
+
+    # One model shared by every document, as in batch mode. Cold scenarios let it
+    # load lazily inside the first document; warm ones load it before timing.
+    embedding_model = None
+    if not options["fast_mode"]:
+        from src.models.embedding_model import EmbeddingModel
+        embedding_model = EmbeddingModel()
+        if options["warm"]:
+            embedding_model.preload_model()
+
+    page_counts = {}
+    for paths in corpora.values():
+        for path in paths:
+            with fitz.open(path) as doc:
+                page_counts[path] = len(doc)
+
+    errors = {}
+
+    def process(path: str) -> float:
+        processor = PDFProcessor(embedding_model=embedding_model, page_workers=split.page_workers)
+        doc_start = time.perf_counter()
+        try:
+            # No production timeout: long synthetic documents are meant to take long
+            processor.process(path, timeout=BENCHMARK_DOCUMENT_TIMEOUT, include_metadata=False)
+        except Exception as e:
+            errors[Path(path).name] = str(e)
+        return time.perf_counter() - doc_start
+
+    if options["warm"]:
+        for paths in corpora.values():
+            for path in paths:
+                process(path)
+        iterations_run = max(1, iterations)
+    else:
+        iterations_run = 1
+
+    tracing.enable(sample_rate=1.0)
+
+    groups = {}
+    all_latencies = []
+    all_pages = 0
+    for corpus_name, paths in corpora.items():
+        latencies = []
+        pages = 0
+        for _ in range(iterations_run):
+            for path in paths:
+                latencies.append(process(path))
+                pages += page_counts[path]
+        groups[corpus_name] = _summarize(latencies, pages)
+        all_latencies.extend(latencies)
+        all_pages += pages
+
+    return {
+        "scenario": scenario,
+        "iterations": iterations_run,
+        "startup_s": round(startup_time, 3) if startup_time is not None else None,
+        "cpu_split": split.to_dict(),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "overall": _summarize(all_latencies, all_pages),
+        "corpora": groups,
+        "stage_breakdown_ms": _stage_breakdown(tracing.drain_events()),
+        "document_errors": errors,
+    }
+
+
+def _run_child(scenario: str, corpora: Dict[str, List[str]], iterations: int,
+               timeout: Optional[float], cpu_split: Optional[str] = None) -> Dict[str, Any]:
+    """Run one scenario in a fresh interpreter and parse its JSON report."""
+    command = [
+        sys.executable, "-m", "src.benchmarks.runner", "--child", scenario,
+        "--corpora", json.dumps(corpora), "--iterations", str(iterations),
+        "--launched-at", repr(time.time())
+    ]
+    if cpu_split:
+        command += ["--cpu-split", cpu_split]
+    try:
+        completed = subprocess.run(command, cwd=str(BASE_DIR), capture_output=True,
+                                   text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"scenario": scenario, "error": f"timed out after {timeout}s"}
+
+    if completed.returncode != 0:
+        stderr_tail = completed.stderr.strip().splitlines()[-5:]
+        return {"scenario": scenario, "error": f"exit code {completed.returncode}: {' | '.join(stderr_tail)}"}
+
+    # The report is the last stdout line; anything before it is library noise
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment_info() -> Dict[str, Any]:
+    """Machine and library versions the numbers were measured with."""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        from src.utils.cpu_scheduler import available_cores
+        info["available_cores"] = available_cores()
+    except Exception:
+        pass
+    try:
+        import fitz
+        info["pymupdf"] = fitz.VersionBind
+    except Exception:
+        pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(BASE_DIR),
+                                capture_output=True, text=True, timeout=10)
+        if commit.returncode == 0:
+            info["commit"] = commit.stdout.strip()
+    except Exception:
+        pass
+    return info
+
+
+def run_benchmarks(scenarios: List[str], corpora: Dict[str, List[str]], iterations: int = 3,
+                   timeout: Optional[float] = 1800, cpu_split: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run scenarios (each in its own interpreter) and build the JSON report.
+
+    ``cpu_split`` ("WORKERS:THREADS") is passed to every scenario; each one
+    reports the split it ran with.
+    """
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment_info(),
+        "corpora": {name: [Path(p).name for p in paths] for name, paths in corpora.items()},
+        "scenarios": {}
+    }
+    for scenario in scenarios:
+        report["scenarios"][scenario] = _run_child(scenario, corpora, iterations, timeout, cpu_split)
+    return report
+
+
+def _metric_pairs(report_scenario: Dict[str, Any], baseline_scenario: Dict[str, Any]
+                  ) -> List[Tuple[str, str, float, float]]:
+    """(group, metric, current, baseline) for every metric present in both."""
+    pairs = []
+    for metric in COMPARED_METRICS:
+        if metric in report_scenario and metric in baseline_scenario:
+            pairs.append(("scenario", metric, report_scenario[metric], baseline_scenario[metric]))
+
+    groups = {"overall": report_scenario.get("overall", {}), **report_scenario.get("corpora", {})}
+    baseline_groups = {"overall": baseline_scenario.get("overall", {}), **baseline_scenario.get("corpora", {})}
+    for group, metrics in groups.items():
+        baseline_metrics = baseline_groups.get(group, {})
+        for metric in COMPARED_METRICS:
+            if metric in metrics and metric in baseline_metrics:
+                pairs.append((group, metric, metrics[metric], baseline_metrics[metric]))
+    return pairs
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        thresholds: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline report.
+
+    ``thresholds`` maps metric names to the allowed relative change in the bad
+    direction (0.25 = 25% slower/larger). Returns one entry per compared metric
+    with a ``regression`` flag; scenarios missing from either side are skipped.
+    """
+    thresholds = {**BENCHMARK_THRESHOLDS, **(thresholds or {})}
+    comparisons = []
+
+    for scenario, current in report.get("scenarios", {}).items():
+        reference = baseline.get("scenarios", {}).get(scenario)
+        if not reference or "error" in current or "error" in reference:
+            continue
+
+        for group, metric, value, reference_value in _metric_pairs(current, reference):
+            if not reference_value:
+                continue
+            change = (value - reference_value) / reference_value
+            worse = change if COMPARED_METRICS[metric] else -change
+            comparisons.append({
+                "scenario": scenario,
+                "group": group,
+                "metric": metric,
+                "baseline": reference_value,
+                "current": value,
+                "change": round(change, 4),
+                "threshold": thresholds.get(metric),
+                "regression": metric in thresholds and worse > thresholds[metric],
+            })
+
+    return comparisons
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Child entry point: run one scenario and print its report as one JSON line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--child", required=True, choices=sorted(SCENARIOS))
+    parser.add_argument("--corpora", required=True, help="JSON object: corpus name -> list of PDF paths")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--launched-at", type=float, default=None)
+    parser.add_argument("--cpu-split", default=None, help="WORKERS:THREADS or auto (default: CPU_SPLIT)")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    result = run_scenario(args.child, json.loads(args.corpora), args.iterations, args.launched_at, args.cpu_split)
+    sys.stdout.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,665 @@
+"""
+Synthetic PDF generator for load, scaling and accuracy tests.
+
+Documents are written with PyMuPDF's TextWriter from a ``SyntheticSpec`` and
+come with the outline they were built from, in the Round 1A output format
+(``{"title": ..., "outline": [{"level", "text", "page"}]}``), so extraction
+accuracy can be measured without any real (customer) PDFs.
+"""
+import re
+import json
+import random
+import logging
+import unicodedata
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+
+import fitz  # PyMuPDF
+
+from config.cultural_patterns import CULTURAL_PATTERNS
+
+
+logger = logging.getLogger(__name__)
+
+MIN_PAGES = 1
+MAX_PAGES = 5000
+MAX_COLUMNS = 3
+MAX_HEADING_DEPTH = 4
+
+PAGE_WIDTH, PAGE_HEIGHT = fitz.paper_size("a4")
+MARGIN = 56
+COLUMN_GAP = 18
+BODY_SIZE = 10
+LINE_SPACING = 1.4
+HEADING_SIZES = {1: 18, 2: 14, 3: 12, 4: 11}
+TITLE_SIZE = 24
+RUNNING_SIZE = 8
+
+
+# ---------------------------------------------------------------------------
+# Numbering styles
+# ---------------------------------------------------------------------------
+
+_DEVANAGARI_DIGITS = str.maketrans("0123456789", "०१२३४५६७८९")
+_ARABIC_INDIC_DIGITS = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
+_CJK_DIGITS = "〇一二三四五六七八九"
+_ARABIC_ORDINALS = ["الأول", "الثاني", "الثالث", "الرابع", "الخامس",
+                    "السادس", "السابع", "الثامن", "التاسع", "العاشر"]
+_KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノ"
+
+
+def _roman(n: int) -> str:
+    numerals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+    result = ""
+    for value, numeral in numerals:
+        count, n = divmod(n, value)
+        result += numeral * count
+    return result
+
+
+def _letter(n: int) -> str:
+    return chr(ord("A") + (n - 1) % 26)
+
+
+def _cjk_number(n: int) -> str:
+    """Chinese/Japanese numeral (一, 十二, 三百五) without 零, as in 第N章 headings."""
+    result = ""
+    for value, unit in ((1000, "千"), (100, "百"), (10, "十")):
+        digit, n = divmod(n, value)
+        if digit:
+            result += ("" if digit == 1 and value == 10 and not result else _CJK_DIGITS[digit]) + unit
+    if n:
+        result += _CJK_DIGITS[n]
+    return result
+
+
+def _dotted(counters: Tuple[int, ...]) -> str:
+    return ".".join(str(c) for c in counters)
+
+
+def _arabic_chapter(n: int) -> str:
+    ordinal = _ARABIC_ORDINALS[n - 1] if n <= len(_ARABIC_ORDINALS) else str(n).translate(_ARABIC_INDIC_DIGITS)
+    return f"الفصل {ordinal}"
+
+
+# Marker writers for the numbering patterns of config/cultural_patterns.py. A
+# writer gets the counters of all levels down to its own (e.g. (2, 1) for the
+# first H2 of chapter 2)
+NumberFormatter = Callable[[Tuple[int, ...]], str]
+_PATTERN_MARKERS: Dict[str, NumberFormatter] = {
+    r'^\d+\.': lambda c: f"{c[-1]}.",
+    r'^\d+\.\d+': _dotted,
+    r'^[IVXLC]+\.': lambda c: f"{_roman(c[-1])}.",
+    r'^[A-Z]\.': lambda c: f"{_letter(c[-1])}.",
+    r'^第\d+章': lambda c: f"第{c[-1]}章",
+    r'^第[一二三四五六七八九十]+章': lambda c: f"第{_cjk_number(c[-1])}章",
+    r'^第[一二三四五六七八九十百千]+章': lambda c: f"第{_cjk_number(c[-1])}章",
+    r'^第[一二三四五六七八九十]+节': lambda c: f"第{_cjk_number(c[-1])}节",
+    r'^[一二三四五六七八九十]+、': lambda c: f"{_cjk_number(c[-1])}、",
+    r'^（\d+）': lambda c: f"（{c[-1]}）",
+    r'^[\u30A1-\u30FA]+、': lambda c: f"{_KATAKANA[(c[-1] - 1) % len(_KATAKANA)]}、",
+    r'^अध्याय\s+[१२३४५६७८९०\d]+': lambda c: f"अध्याय {str(c[-1]).translate(_DEVANAGARI_DIGITS)}",
+    r'^खंड\s+[१२३४५६७८९०\d]+': lambda c: f"खंड {_dotted(c).translate(_DEVANAGARI_DIGITS)}",
+    r'^[१२३४५६७८९०]+[.]?': lambda c: _dotted(c).translate(_DEVANAGARI_DIGITS),
+    r'^[(]?\d+[)]?': lambda c: f"({c[-1]})",
+    r'^الفصل\s+\w+': lambda c: _arabic_chapter(c[-1]),
+    r'^[\u0660-\u0669]+[.]': lambda c: f"{_dotted(c).translate(_ARABIC_INDIC_DIGITS)}.",
+    r'^قسم\s+\d+': lambda c: f"قسم {_dotted(c)}",
+}
+
+# Numbering styles: one pattern of the language's numbering_patterns per heading
+# level, or (pattern, writer) where the level writes its marker differently.
+# Every language also gets "decimal", from the default numbering patterns, and "none"
+_STYLE_PATTERNS: Dict[str, Dict[str, list]] = {
+    "english": {
+        "roman": [r'^[IVXLC]+\.', r'^[A-Z]\.', r'^\d+\.', (r'^\d+\.\d+', lambda c: _dotted(c[2:]))],
+    },
+    "japanese": {
+        "chapter": [r'^第\d+章', r'^\d+\.\d+', r'^（\d+）', r'^[\u30A1-\u30FA]+、'],
+        "kanji": [r'^第[一二三四五六七八九十]+章', r'^\d+\.\d+', r'^[一二三四五六七八九十]+、', r'^（\d+）'],
+    },
+    "chinese": {
+        "chapter": [r'^第[一二三四五六七八九十百千]+章', r'^第[一二三四五六七八九十]+节', r'^\d+\.\d+', r'^（\d+）'],
+    },
+    "hindi": {
+        "chapter": [r'^अध्याय\s+[१२३४५६७८९०\d]+', r'^खंड\s+[१२३४५६७८९०\d]+',
+                    r'^[१२३४५६७८९०]+[.]?', r'^[(]?\d+[)]?'],
+    },
+    "arabic": {
+        "chapter": [r'^الفصل\s+\w+', r'^[\u0660-\u0669]+[.]', r'^قسم\s+\d+', r'^[\u0660-\u0669]+[.]'],
+    },
+}
+_DECIMAL_PATTERNS = [r'^\d+\.'] + [r'^\d+\.\d+'] * (MAX_HEADING_DEPTH - 1)
+
+
+def _numbering_styles() -> Dict[str, Dict[str, List[NumberFormatter]]]:
+    """
+    Build language -> style -> one marker formatter per heading level.
+
+    Each level's pattern must be one of the language's numbering patterns in
+    config/cultural_patterns.py (or a default one), and every marker is checked
+    against it, so generated headings use only numbering the extractor knows.
+    Right-to-left languages write Arabic-Indic digits: the PDF writer reorders
+    runs of European digits inside right-to-left text, so the extracted text
+    would no longer match the ground truth.
+    """
+    default_patterns = CULTURAL_PATTERNS["default"]["numbering_patterns"]
+    styles: Dict[str, Dict[str, List[NumberFormatter]]] = {}
+    for language, language_styles in _STYLE_PATTERNS.items():
+        patterns = CULTURAL_PATTERNS[language]
+        known = set(patterns["numbering_patterns"]) | set(default_patterns)
+        right_to_left = patterns.get("text_direction") == "right-to-left"
+
+        styles[language] = {}
+        for style, levels in {**language_styles, "decimal": _DECIMAL_PATTERNS}.items():
+            formatters = []
+            for depth, level in enumerate(levels, start=1):
+                pattern, writer = level if isinstance(level, tuple) else (level, _PATTERN_MARKERS[level])
+                if pattern not in known:
+                    raise ValueError(f"{language} numbering style '{style}' uses {pattern!r}, "
+                                     f"which is not in its numbering patterns")
+                if right_to_left:
+                    writer = (lambda w: lambda c: w(c).translate(_ARABIC_INDIC_DIGITS))(writer)
+                for counters in ((1,) * depth, (12,) * depth):
+                    if not re.match(pattern, writer(counters)):
+                        raise ValueError(f"{language} numbering style '{style}' writes "
+                                         f"{writer(counters)!r}, which {pattern!r} does not match")
+                formatters.append(writer)
+            styles[language][style] = formatters
+        styles[language]["none"] = []
+    return styles
+
+
+NUMBERING_STYLES = _numbering_styles()
+
+
+def default_numbering(language: str) -> str:
+    """The language's own numbering style (e.g. 第1章 for Japanese)."""
+    return "decimal" if language == "english" else next(iter(NUMBERING_STYLES[language]))
+
+
+# ---------------------------------------------------------------------------
+# Vocabulary
+# ---------------------------------------------------------------------------
+
+_VOCABULARY = {
+    "english": {
+        "nouns": ["System", "Data", "Network", "Security", "Storage", "Model", "Process",
+                  "Interface", "Policy", "Market", "Energy", "Learning", "Service", "Quality"],
+        "topics": ["Overview", "Architecture", "Design", "Evaluation", "Requirements",
+                   "Implementation", "Analysis", "Results", "Limitations", "Operations"],
+        "sentences": [
+            "The results in this section were collected over a period of twelve months.",
+            "Each component is described together with its inputs, outputs and failure modes.",
+            "Performance depends mostly on the size of the working set and on the access pattern.",
+            "We summarize the main findings and refer to the appendix for the full tables.",
+            "Costs are reported per unit and include maintenance, licensing and support.",
+            "The proposed approach reduces latency while keeping the memory footprint constant.",
+            "Earlier versions of the process required manual review at every stage.",
+            "Measurements were repeated three times and the median value is reported.",
+        ],
+        "table_words": ["Item", "Value", "Unit", "Total", "Q1", "Q2", "Q3", "Q4"],
+    },
+    "japanese": {
+        "nouns": ["システム", "データ", "ネットワーク", "セキュリティ", "品質", "運用", "市場", "教育"],
+        "topics": ["概要", "設計", "評価", "実装", "分析", "結果", "課題", "方法"],
+        "sentences": [
+            "本章では、システムの全体構成と各部の役割について説明する。",
+            "測定は三回繰り返し、その中央値を結果として示した。",
+            "この手法により、処理時間を大幅に短縮することができた。",
+            "詳細な数値は付録の表にまとめてある。",
+            "従来の方法では、各段階で人手による確認が必要であった。",
+        ],
+        "table_words": ["項目", "値", "単位", "合計", "第一期", "第二期"],
+    },
+    "chinese": {
+        "nouns": ["系统", "数据", "网络", "安全", "质量", "运营", "市场", "教育"],
+        "topics": ["概述", "设计", "评估", "实现", "分析", "结果", "问题", "方法"],
+        "sentences": [
+            "本章介绍系统的总体结构以及各个部分的作用。",
+            "每项测量重复三次，结果取中位数。",
+            "该方法显著缩短了处理时间，同时保持了内存占用不变。",
+            "详细数据见附录中的表格。",
+            "在以前的流程中，每个阶段都需要人工审核。",
+        ],
+        "table_words": ["项目", "数值", "单位", "合计", "第一季度", "第二季度"],
+    },
+    "hindi": {
+        "nouns": ["प्रणाली", "डेटा", "नेटवर्क", "सुरक्षा", "शिक्षा", "बाजार", "ऊर्जा", "सेवा"],
+        "topics": ["परिचय", "विश्लेषण", "संरचना", "मूल्यांकन", "परिणाम", "पद्धति", "निष्कर्ष"],
+        "sentences": [
+            "इस अध्याय में प्रणाली की संरचना और उसके भागों का वर्णन किया गया है।",
+            "प्रत्येक माप तीन बार दोहराया गया और मध्य मान दिया गया है।",
+            "इस पद्धति से प्रसंस्करण का समय काफी कम हो गया।",
+            "पूरी तालिकाएँ परिशिष्ट में दी गई हैं।",
+        ],
+        "table_words": ["मद", "मान", "इकाई", "कुल", "पहला", "दूसरा"],
+    },
+    "arabic": {
+        "nouns": ["النظام", "البيانات", "الشبكة", "الأمن", "التعليم", "السوق", "الطاقة", "الخدمة"],
+        "topics": ["مقدمة", "تحليل", "تصميم", "تقييم", "نتائج", "منهجية", "مراجعة"],
+        "sentences": [
+            "يصف هذا الفصل بنية النظام ودور كل جزء من أجزائه.",
+            "تم تكرار كل قياس ثلاث مرات وتم عرض القيمة الوسطى.",
+            "أدت هذه الطريقة إلى تقليل وقت المعالجة بشكل كبير.",
+            "ترد الجداول الكاملة في الملحق.",
+        ],
+        "table_words": ["البند", "القيمة", "الوحدة", "المجموع", "الأول", "الثاني"],
+    },
+}
+
+# Scripts written without spaces between words are wrapped per character
+_CHARACTER_WRAPPED = {"japanese", "chinese"}
+
+
+def _fonts(language: str) -> Tuple[fitz.Font, fitz.Font]:
+    """(body font, heading font) able to render the language's script."""
+    if language == "english":
+        return fitz.Font("helv"), fitz.Font("hebo")
+    if language in _CHARACTER_WRAPPED:
+        font = fitz.Font("japan" if language == "japanese" else "china-s")
+        return font, font
+    script = fitz.mupdf.UCDN_SCRIPT_DEVANAGARI if language == "hindi" else fitz.mupdf.UCDN_SCRIPT_ARABIC
+    font = fitz.Font(script=script)
+    return font, font
+
+
+# ---------------------------------------------------------------------------
+# Specification
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SyntheticSpec:
+    """Parameters of one generated document."""
+    pages: int = 50
+    columns: int = 1
+    heading_depth: int = 3
+    language: str = "english"
+    numbering: Optional[str] = None  # style in NUMBERING_STYLES; None = the language's default
+    running_headers: bool = True
+    toc: bool = True
+    table_ratio: float = 0.1  # fraction of pages starting with a table
+    headings_per_page: float = 1.5
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.numbering is None and self.language in NUMBERING_STYLES:
+            self.numbering = default_numbering(self.language)
+
+    def validate(self) -> None:
+        if not MIN_PAGES <= self.pages <= MAX_PAGES:
+            raise ValueError(f"pages must be between {MIN_PAGES} and {MAX_PAGES}, got {self.pages}")
+        if not 1 <= self.columns <= MAX_COLUMNS:
+            raise ValueError(f"columns must be between 1 and {MAX_COLUMNS}, got {self.columns}")
+        if not 1 <= self.heading_depth <= MAX_HEADING_DEPTH:
+            raise ValueError(f"heading_depth must be between 1 and {MAX_HEADING_DEPTH}, got {self.heading_depth}")
+        if self.language not in NUMBERING_STYLES:
+            raise ValueError(f"Unsupported language '{self.language}' (supported: {', '.join(NUMBERING_STYLES)})")
+        if self.numbering not in NUMBERING_STYLES[self.language]:
+            raise ValueError(f"Unknown numbering style '{self.numbering}' for {self.language} "
+                             f"(available: {', '.join(NUMBERING_STYLES[self.language])})")
+        if not 0 <= self.table_ratio <= 1:
+            raise ValueError(f"table_ratio must be between 0 and 1, got {self.table_ratio}")
+        if self.headings_per_page <= 0:
+            raise ValueError(f"headings_per_page must be positive, got {self.headings_per_page}")
+
+    @property
+    def name(self) -> str:
+        """File stem that encodes the parameters (stable across runs)."""
+        flags = ("_toc" if self.toc else "") + ("_rh" if self.running_headers else "")
+        return (f"synthetic_{self.language}_{self.pages}p_{self.columns}col_h{self.heading_depth}"
+                f"_{self.numbering}_t{int(self.table_ratio * 100)}{flags}_s{self.seed}")
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+class _DocumentWriter:
+    """Flows headings, paragraphs and tables into columns and pages."""
+
+    def __init__(self, spec: SyntheticSpec, title: str):
+        self.spec = spec
+        self.title = title
+        self.rng = random.Random(spec.seed)
+        self.doc = fitz.open()
+        self.body_font, self.heading_font = _fonts(spec.language)
+        self.running_font = fitz.Font("helv")
+        self.right_to_left = CULTURAL_PATTERNS.get(spec.language, {}).get("text_direction") == "right-to-left"
+        self.character_wrapped = spec.language in _CHARACTER_WRAPPED
+        self._advances: Dict[int, Dict[str, float]] = {}
+
+        usable_width = PAGE_WIDTH - 2 * MARGIN - (spec.columns - 1) * COLUMN_GAP
+        self.column_width = usable_width / spec.columns
+        self.top = MARGIN + (12 if spec.running_headers else 0)
+        self.bottom = PAGE_HEIGHT - MARGIN - (12 if spec.running_headers else 0)
+
+        self.page: Optional[fitz.Page] = None
+        self.writer: Optional[fitz.TextWriter] = None
+        self.column = 0
+        self.y = 0.0
+
+    @property
+    def page_number(self) -> int:
+        return len(self.doc)
+
+    @property
+    def full(self) -> bool:
+        """True once the last requested page has no room left."""
+        return self.page_number >= self.spec.pages and self.page is None
+
+    def _column_x(self) -> float:
+        return MARGIN + self.column * (self.column_width + COLUMN_GAP)
+
+    def new_page(self) -> bool:
+        """Finish the current page and start the next; False if the page budget is used up."""
+        self.finish_page()
+        if self.page_number >= self.spec.pages:
+            return False
+        self.page = self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        self.writer = fitz.TextWriter(self.page.rect)
+        self.column = 0
+        self.y = self.top
+        if self.spec.running_headers:
+            self._running_header_footer()
+        return True
+
+    def finish_page(self) -> None:
+        if self.page is not None:
+            self.writer.write_text(self.page)
+            self.page = None
+            self.writer = None
+
+    def ensure_space(self, height: float) -> bool:
+        """Move to the next column or page unless ``height`` fits; False when out of pages."""
+        if self.page is not None and self.y + height <= self.bottom:
+            return True
+        if self.page is not None and self.column + 1 < self.spec.columns:
+            self.column += 1
+            self.y = self.top
+            return True
+        return self.new_page()
+
+    def _running_header_footer(self) -> None:
+        header_font = self.body_font if self.spec.language != "english" else self.running_font
+        x = MARGIN
+        if self.right_to_left:
+            x = PAGE_WIDTH - MARGIN - self.text_width(self.title, header_font, RUNNING_SIZE)
+        self.writer.append((x, MARGIN - 4), self.title, font=header_font, fontsize=RUNNING_SIZE,
+                           right_to_left=self.right_to_left)
+        footer = f"Page {self.page_number} of {self.spec.pages}"
+        width = self.text_width(footer, self.running_font, RUNNING_SIZE)
+        self.writer.append(((PAGE_WIDTH - width) / 2, PAGE_HEIGHT - MARGIN + 14), footer,
+                           font=self.running_font, fontsize=RUNNING_SIZE)
+        self.page.draw_line((MARGIN, MARGIN), (PAGE_WIDTH - MARGIN, MARGIN), width=0.5)
+
+    def text_width(self, text: str, font: fitz.Font, size: float) -> float:
+        """Unkerned text width from cached glyph advances (Font.text_length is slow per call)."""
+        advances = self._advances.setdefault(id(font), {})
+        width = 0.0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = font.text_length(char, fontsize=1)
+            width += advance
+        return width * size
+
+    def wrap(self, text: str, font: fitz.Font, size: float, width: float) -> List[str]:
+        units = list(text) if self.character_wrapped else text.split(" ")
+        joiner = "" if self.character_wrapped else " "
+        space = self.text_width(joiner, font, size)
+        lines, current, current_width = [], [], 0.0
+        for unit in units:
+            unit_width = self.text_width(unit, font, size)
+            if current and current_width + space + unit_width > width:
+                lines.append(joiner.join(current))
+                current, current_width = [unit], unit_width
+            else:
+                current_width += unit_width + (space if current else 0.0)
+                current.append(unit)
+        if current:
+            lines.append(joiner.join(current))
+        return lines
+
+    def write_line(self, text: str, font: fitz.Font, size: float, x: float, width: float) -> None:
+        """Write one line at the cursor (right-aligned for right-to-left scripts)."""
+        if self.right_to_left:
+            x += width - self.text_width(text, font, size)
+        self.writer.append((x, self.y + size), text, font=font, fontsize=size,
+                           right_to_left=self.right_to_left)
+        self.y += size * LINE_SPACING
+
+    def write_title(self) -> None:
+        self.new_page()
+        width = PAGE_WIDTH - 2 * MARGIN
+        for line in self.wrap(self.title, self.heading_font, TITLE_SIZE, width):
+            self.write_line(line, self.heading_font, TITLE_SIZE, MARGIN, width)
+        self.y += TITLE_SIZE
+
+    def write_heading(self, text: str, level: int) -> Optional[int]:
+        """Write a heading; returns its page number, or None if the document is full."""
+        size = HEADING_SIZES[level]
+        lines = self.wrap(text, self.heading_font, size, self.column_width)
+        # Keep the heading together with the first two lines of its section
+        needed = size * 0.8 + len(lines) * size * LINE_SPACING + 2 * BODY_SIZE * LINE_SPACING
+        if level == 1 and self.spec.heading_depth > 1 and self.page is not None and self.y > self.top + TITLE_SIZE * 3:
+            if not self.new_page():
+                return None
+        if not self.ensure_space(needed):
+            return None
+        self.y += size * 0.8
+        page_number = self.page_number
+        for line in lines:
+            self.write_line(line, self.heading_font, size, self._column_x(), self.column_width)
+        self.y += size * 0.3
+        return page_number
+
+    def write_paragraph(self, sentence_count: int) -> bool:
+        sentences = self.rng.choices(_VOCABULARY[self.spec.language]["sentences"], k=sentence_count)
+        joiner = "" if self.character_wrapped else " "
+        line_height = BODY_SIZE * LINE_SPACING
+        for line in self.wrap(joiner.join(sentences), self.body_font, BODY_SIZE, self.column_width):
+            if not self.ensure_space(line_height):
+                return False
+            self.write_line(line, self.body_font, BODY_SIZE, self._column_x(), self.column_width)
+        self.y += BODY_SIZE * 0.6
+        return True
+
+    def write_table(self) -> bool:
+        """A grid table with a bold header row (a common source of false headings)."""
+        words = _VOCABULARY[self.spec.language]["table_words"]
+        columns = self.rng.randint(3, 5)
+        rows = self.rng.randint(5, 12)
+        row_height = BODY_SIZE * 1.8
+        if not self.ensure_space((rows + 1) * row_height + BODY_SIZE):
+            return False
+
+        x0 = self._column_x()
+        cell_width = self.column_width / columns
+        header = [words[i % len(words)] for i in range(columns)]
+        for row in range(rows + 1):
+            y = self.y + row * row_height
+            for col in range(columns):
+                if row == 0:
+                    text, font = header[col], self.heading_font
+                elif col == 0:
+                    text, font = f"{words[0]} {row}", self.body_font
+                else:
+                    text, font = f"{self.rng.uniform(0, 1000):.1f}", self.running_font
+                self.writer.append((x0 + col * cell_width + 3, y + BODY_SIZE * 1.3), text,
+                                   font=font, fontsize=BODY_SIZE - 1,
+                                   right_to_left=self.right_to_left and font is not self.running_font)
+            self.page.draw_line((x0, y), (x0 + self.column_width, y), width=0.5)
+        table_bottom = self.y + (rows + 1) * row_height
+        self.page.draw_line((x0, table_bottom), (x0 + self.column_width, table_bottom), width=0.5)
+        for col in range(columns + 1):
+            x = x0 + col * cell_width
+            self.page.draw_line((x, self.y), (x, table_bottom), width=0.5)
+        self.y = table_bottom + BODY_SIZE
+        return True
+
+
+def _heading_title(rng: random.Random, language: str) -> str:
+    vocabulary = _VOCABULARY[language]
+    noun, topic = rng.choice(vocabulary["nouns"]), rng.choice(vocabulary["topics"])
+    if language in _CHARACTER_WRAPPED:
+        return f"{noun}{topic}"
+    if language in ("english", "hindi"):
+        return f"{noun} {topic}"
+    return f"{topic} {noun}"
+
+
+def _next_level(rng: random.Random, level: int, depth: int) -> int:
+    """Random walk over heading levels: go one deeper, stay, or climb back up."""
+    choices = [lvl for lvl in range(1, depth + 1) if lvl <= level + 1]
+    weights = [3 if lvl == level + 1 else 2 if lvl == level else 1 for lvl in choices]
+    return rng.choices(choices, weights=weights)[0]
+
+
+def generate_document(spec: SyntheticSpec, output_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Write one synthetic PDF and return its ground truth.
+
+    The ground truth has the Round 1A shape (title plus H1-H4 outline with
+    1-based page numbers); heading texts include their numbering.
+    """
+    spec.validate()
+    rng = random.Random(spec.seed)
+    vocabulary = _VOCABULARY[spec.language]
+    formatters = NUMBERING_STYLES[spec.language][spec.numbering]
+
+    title = f"{rng.choice(vocabulary['nouns'])} {rng.choice(vocabulary['topics'])}"
+    writer = _DocumentWriter(spec, title)
+    writer.write_title()
+
+    # Text lines that fit on a page, spread over the requested heading density
+    lines_per_page = (writer.bottom - writer.top) / (BODY_SIZE * LINE_SPACING) * spec.columns
+    sentences_per_section = max(1, int(lines_per_page / spec.headings_per_page / 2))
+
+    outline = []
+    counters = [0] * MAX_HEADING_DEPTH
+    level = 0
+    table_pages = set()
+    while True:
+        level = _next_level(rng, level, spec.heading_depth) if level else 1
+        counters[level - 1] += 1
+        counters[level:] = [0] * (MAX_HEADING_DEPTH - level)
+        heading_title = _heading_title(rng, spec.language)
+        if formatters:
+            heading_title = f"{formatters[level - 1](tuple(counters[:level]))} {heading_title}"
+
+        page_number = writer.write_heading(heading_title, level)
+        if page_number is None:
+            break
+        outline.append({"level": f"H{level}", "text": heading_title, "page": page_number})
+
+        if writer.page_number not in table_pages and rng.random() < spec.table_ratio:
+            table_pages.add(writer.page_number)
+            if not writer.write_table():
+                break
+
+        remaining = sentences_per_section
+        while remaining > 0:
+            count = min(remaining, rng.randint(2, 6))
+            if not writer.write_paragraph(count):
+                break
+            remaining -= count
+        if writer.full:
+            break
+
+    writer.finish_page()
+    # Pad when the content ran out before the page budget (tiny headings_per_page)
+    while len(writer.doc) < spec.pages:
+        writer.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+
+    if spec.toc:
+        writer.doc.set_toc([[int(item["level"][1:]), item["text"], item["page"]] for item in outline])
+    writer.doc.set_metadata({"title": title, "creator": "synthetic corpus generator"})
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so an interrupted run leaves no partial file
+    tmp_path = output_path.with_suffix(".tmp")
+    try:
+        writer.doc.save(str(tmp_path), garbage=3, deflate=True)
+    finally:
+        writer.doc.close()
+    tmp_path.replace(output_path)
+
+    return {"title": title, "outline": outline}
+
+
+def generate_corpus(specs: List[SyntheticSpec], output_dir: Union[str, Path]) -> List[str]:
+    """
+    Generate documents (``<spec.name>.pdf``) with ground truth next to them
+    (``<spec.name>.json``, including the spec). Existing documents are reused.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for spec in specs:
+        spec.validate()
+        pdf_path = output_dir / f"{spec.name}.pdf"
+        truth_path = ground_truth_path(pdf_path)
+        if not (pdf_path.exists() and truth_path.exists()):
+            logger.info(f"Generating synthetic document: {pdf_path.name}")
+            truth = generate_document(spec, pdf_path)
+            truth["spec"] = asdict(spec)
+            truth_path.write_text(json.dumps(truth, ensure_ascii=False, indent=2), encoding="utf-8")
+        paths.append(str(pdf_path))
+    return paths
+
+
+def ground_truth_path(pdf_path: Union[str, Path]) -> Path:
+    return Path(pdf_path).with_suffix(".json")
+
+
+def load_ground_truth(pdf_path: Union[str, Path]) -> Dict[str, Any]:
+    return json.loads(ground_truth_path(pdf_path).read_text(encoding="utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Accuracy
+# ---------------------------------------------------------------------------
+
+def _normalize_heading(text: str) -> str:
+    # NFKC folds Arabic presentation forms (as extracted from shaped text) back to letters
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+def evaluate_outline(predicted: List[Dict[str, Any]], truth: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Precision, recall and F1 of extracted outline items against the ground truth.
+
+    An item matches when its normalized text and page are equal; ``level_accuracy``
+    is the share of matched items that also got the right level.
+    """
+    remaining: Dict[Tuple[str, int], List[str]] = {}
+    for item in truth:
+        remaining.setdefault((_normalize_heading(item["text"]), item["page"]), []).append(item["level"])
+
+    matched = correct_level = 0
+    for item in predicted:
+        levels = remaining.get((_normalize_heading(item.get("text", "")), item.get("page")))
+        if levels:
+            matched += 1
+            if item.get("level") in levels:
+                levels.remove(item.get("level"))
+                correct_level += 1
+            else:
+                levels.pop()
+
+    precision = matched / len(predicted) if predicted else 0.0
+    recall = matched / len(truth) if truth else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "level_accuracy": round(correct_level / matched, 4) if matched else 0.0,
+        "predicted": len(predicted),
+        "expected": len(truth),
+    }
@@ -1,14 +1,15 @@
 try:
     from src.core.pdf_processor import PDFProcessor
+    from src.core.batch_engine import BatchEngine, BatchJobResult
     from src.core.candidate_generator import CandidateGenerator, HeadingCandidate
-    from src.core.semantic_filter import SemanticFilter
     from src.core.hierarchy_assigner import HierarchyAssigner, HierarchyNode
     from src.core.output_formatter import OutputFormatter
-    from src.models.embedding_model import EmbeddingModel
     from src.models.font_analyzer import FontAnalyzer, FontInfo, FontStatistics
     
     __all__ = [
         "PDFProcessor",
+        "BatchEngine",
+        "BatchJobResult",
         "CandidateGenerator", 
         "HeadingCandidate",
         "SemanticFilter",
@@ -27,6 +28,18 @@ except ImportError as e:
     logging.getLogger(__name__).warning(f"Some core modules not available: {e}")
     __all__ = []
 
+
+def __getattr__(name):
+    # The semantic stage needs torch and sentence-transformers; import it only
+    # when asked for, so fast mode never loads the ML stack
+    if name == "SemanticFilter":
+        from src.core.semantic_filter import SemanticFilter
+        return SemanticFilter
+    if name == "EmbeddingModel":
+        from src.models.embedding_model import EmbeddingModel
+        return EmbeddingModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Version info
 __version__ = "1.0.0"
 
@@ -36,6 +49,7 @@ Core processing pipeline for PDF heading extraction.
 
 Main Components:
     PDFProcessor: Central orchestrator with Adobe-style intelligence
+    BatchEngine: Multi-process batch runner with warm workers
     CandidateGenerator: Fast font and layout-based detection  
     SemanticFilter: Smart semantic verification using embeddings
     HierarchyAssigner: Multi-strategy hierarchy level assignment
@@ -0,0 +1,267 @@
+import os
+import time
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Iterator
+
+from src.core.pdf_processor import PDFProcessor
+from src.utils import tracing
+from src.utils.cpu_scheduler import CoreSplit, plan_cores, apply_thread_limits, preserved_thread_limits
+
+
+# Embedding model preloaded once per process: by the parent for in-process
+# batches, by each worker's initializer otherwise
+_shared_embedding_model = None
+
+# Per-worker job options, set by _init_worker
+_worker_options: Dict[str, Any] = {}
+
+
+@dataclass
+class BatchJobResult:
+    """Outcome of one document in a batch run."""
+    pdf_path: str
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    processing_time: float
+    trace_events: Optional[List[Dict[str, Any]]] = None  # spans recorded in a worker process
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Worker initializer: store job options, split CPU threads and preload the model."""
+    global _worker_options, _shared_embedding_model
+    _worker_options = options
+
+    # The forkserver keeps the environment of the batch that started it; jobs
+    # run with the current caller's (FAST_MODE, RESULT_CACHE, ...)
+    os.environ.clear()
+    os.environ.update(options["environ"])
+
+    # Events recorded by the forkserver before this worker started are not ours
+    tracing.drain_events()
+
+    # Keep torch and BLAS from spawning one thread per core in every worker
+    apply_thread_limits(CoreSplit(**options["cpu_split"]))
+
+    if options.get("embedding_model"):
+        _shared_embedding_model = _preload_embedding_model(**options["embedding_model"])
+
+
+def _preload_embedding_model(model_name: Optional[str] = None, backend: Optional[str] = None,
+                             embedding_model=None):
+    """Load the embedding model into this process, or None if it cannot be loaded."""
+    logger = logging.getLogger(__name__)
+    try:
+        if embedding_model is None:
+            from src.models.embedding_model import EmbeddingModel
+            embedding_model = EmbeddingModel(model_name=model_name, backend=backend)
+
+        if not embedding_model.preload_model():
+            logger.warning("Embedding model preload failed - it will be loaded on demand")
+        return embedding_model
+
+    except Exception as e:
+        logger.warning(f"Failed to preload embedding model: {e}")
+        return None
+
+
+def _run_job(pdf_path: str) -> BatchJobResult:
+    """Process one document with a fresh PDFProcessor (no state shared between jobs)."""
+    options = _worker_options
+    start_time = time.time()
+
+    try:
+        processor = PDFProcessor(
+            language=options.get("language", "auto"),
+            debug=options.get("debug", False),
+            embedding_model=_shared_embedding_model,
+            page_workers=options["cpu_split"]["page_workers"]  # this worker's share of the cores
+        )
+
+        if options.get("round1a"):
+            result = processor.process_for_round1a(pdf_path)
+        else:
+            result = processor.process(pdf_path, include_metadata=options.get("include_metadata", False))
+
+        return BatchJobResult(pdf_path, result, None, time.time() - start_time, _worker_trace_events())
+
+    except Exception as e:
+        return BatchJobResult(pdf_path, None, str(e), time.time() - start_time, _worker_trace_events())
+
+
+def _worker_trace_events() -> Optional[List[Dict[str, Any]]]:
+    """Spans recorded for the last job, when running in a worker process with tracing on."""
+    if not tracing.is_enabled() or os.getpid() == _worker_options.get("parent_pid"):
+        return None
+    return tracing.drain_events()
+
+
+class BatchEngine:
+    """
+    Multi-process batch engine for PDF heading extraction.
+
+    - Warm workers: workers start from a forkserver that has already imported
+      the pipeline (and torch in semantic mode) and load the model once in
+      their initializer, instead of on their first semantic job
+    - Isolation: every job gets its own PDFProcessor, so stats and detected
+      language never leak between documents
+    - Bounded submission: only a few jobs per worker are in flight, so very large
+      batches do not queue every path up front
+
+    - Core split: worker processes, torch threads and page shards per worker
+      come from the CPU scheduler, so together they stay within the cores
+
+    Workers are never forked from the caller: it may have loaded torch or run
+    other threads, whose locks would stay held forever in a forked child. On
+    platforms without ``forkserver`` the pool uses spawn.
+    """
+
+    def __init__(self, workers: Optional[int] = None, language: str = 'auto',
+                 debug: bool = False, include_metadata: bool = False,
+                 round1a: bool = False, embedding_model=None, cpu_split: Optional[str] = None):
+        self.workers = workers  # None: planned by the CPU scheduler
+        self.cpu_split = cpu_split  # "auto" or "WORKERS:THREADS" (default CPU_SPLIT)
+        self.last_split: Optional[CoreSplit] = None
+        self.language = language
+        self.debug = debug
+        self.include_metadata = include_metadata
+        self.round1a = round1a
+        self.embedding_model = embedding_model
+        self.logger = logging.getLogger(__name__)
+
+        # Jobs kept in flight per worker
+        self.queue_depth = 4
+
+    def _is_fast_mode(self) -> bool:
+        """Check if running in fast mode (skip semantic filtering)."""
+        return os.getenv("FAST_MODE", "false").lower() == "true"
+
+    def plan(self, jobs: int) -> CoreSplit:
+        """Core split for a batch of ``jobs`` documents."""
+        return plan_cores(jobs=jobs, fast_mode=self._is_fast_mode(), split=self.cpu_split, workers=self.workers)
+
+    def _job_options(self, split: CoreSplit) -> Dict[str, Any]:
+        return {
+            "language": self.language,
+            "debug": self.debug,
+            "include_metadata": self.include_metadata,
+            "round1a": self.round1a,
+            "parent_pid": os.getpid(),
+            "environ": dict(os.environ),
+            "cpu_split": split.to_dict(),
+            "embedding_model": self._embedding_model_spec()
+        }
+
+    def _embedding_model_spec(self) -> Optional[Dict[str, Any]]:
+        """Which model workers preload (the caller's model instance cannot be sent to them)."""
+        if self._is_fast_mode():
+            return None
+        if self.embedding_model is None:
+            return {}  # the defaults from settings
+        return {"model_name": self.embedding_model.model_name, "backend": self.embedding_model.backend}
+
+    def _preload_model(self):
+        """Load the embedding model into this process for in-process batches."""
+        if self._is_fast_mode():
+            return None
+
+        self.embedding_model = _preload_embedding_model(embedding_model=self.embedding_model)
+        return self.embedding_model
+
+    def _get_mp_context(self):
+        """
+        Forkserver whose server preloads the pipeline modules, or spawn.
+        
+        Workers forked from the caller would inherit torch's and OpenMP's thread
+        pools (and any lock other threads hold) in a broken state. The server
+        imports the modules once, single-threaded and without running torch, and
+        starts each worker from that clean state.
+        """
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            preload = [__name__]
+            if not self._is_fast_mode():
+                preload.append("src.models.embedding_model")
+            context.set_forkserver_preload(preload)
+            return context
+        return multiprocessing.get_context("spawn")
+
+    def iter_results(self, pdf_paths: List[str]) -> Iterator[BatchJobResult]:
+        """Process documents and yield results as they complete (completion order)."""
+        global _shared_embedding_model, _worker_options
+
+        pdf_paths = list(pdf_paths)
+        if not pdf_paths:
+            return
+
+        split = self.last_split = self.plan(len(pdf_paths))
+        self.logger.info(f"CPU split: {split}")
+        workers = split.workers
+
+        if workers == 1:
+            # No pool needed: run in-process with the same per-job isolation. The
+            # split's thread limits last for this batch, not for the caller.
+            self.logger.info(f"Processing {len(pdf_paths)} files in-process")
+            _worker_options = self._job_options(split)
+            with preserved_thread_limits():
+                apply_thread_limits(split)
+                _shared_embedding_model = self._preload_model()
+                for pdf_path in pdf_paths:
+                    yield _run_job(pdf_path)
+            return
+
+        mp_context = self._get_mp_context()
+        self.logger.info(
+            f"Processing {len(pdf_paths)} files with {workers} worker processes "
+            f"(start method: {mp_context.get_start_method()})"
+        )
+
+        pending_paths = deque(pdf_paths)
+        in_flight = {}
+        max_in_flight = workers * self.queue_depth
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(self._job_options(split),)) as executor:
+            while pending_paths or in_flight:
+                try:
+                    while pending_paths and len(in_flight) < max_in_flight:
+                        pdf_path = pending_paths.popleft()
+                        in_flight[executor.submit(_run_job, pdf_path)] = pdf_path
+                except BrokenProcessPool as e:
+                    # The pool cannot take new work; fail what was not submitted
+                    self.logger.error(f"Worker pool broke: {e}")
+                    for pdf_path in [pdf_path, *pending_paths]:
+                        yield BatchJobResult(pdf_path, None, f"Worker pool failed: {e}", 0.0)
+                    pending_paths.clear()
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_path = in_flight.pop(future)
+                    try:
+                        job = future.result()
+                    except Exception as e:
+                        # Worker crashed (e.g. killed by the OOM killer)
+                        yield BatchJobResult(pdf_path, None, f"Worker failed: {e}", 0.0)
+                        continue
+
+                    if job.trace_events:
+                        tracing.add_events(job.trace_events)
+                    yield job
+
+    def run(self, pdf_paths: List[str]) -> Dict[str, Any]:
+        """Process documents and collect results and failures keyed by path."""
+        results = {}
+        failed = {}
+
+        for job in self.iter_results(pdf_paths):
+            if job.error is None:
+                results[job.pdf_path] = job.result
+            else:
+                failed[job.pdf_path] = job.error
+
+        return {"results": results, "failed": failed}
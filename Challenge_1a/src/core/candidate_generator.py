@@ -1,14 +1,19 @@
 import re
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+import multiprocessing
+from typing import List, Dict, Any, Tuple, Optional, Generator
 from collections import defaultdict
+from itertools import repeat
+from operator import attrgetter
+from pathlib import Path
 from dataclasses import dataclass
 import fitz  # PyMuPDF
 import numpy as np
 from config.settings import (
     FONT_SIZE_THRESHOLD_RATIO, BOLD_WEIGHT_THRESHOLD,
     MIN_HEADING_LENGTH, MAX_HEADING_LENGTH,
-    TITLE_POSITION_THRESHOLD, CENTER_ALIGNMENT_TOLERANCE
+    TITLE_POSITION_THRESHOLD, CENTER_ALIGNMENT_TOLERANCE,
+    PAGE_SHARD_WORKERS, PAGE_SHARD_MIN_PAGES, CANDIDATE_SCORE_WEIGHTS
 )
 from config.cultural_patterns import CULTURAL_PATTERNS, HEADING_CONFIDENCE_BOOSTERS
 from src.utils.text_utils import (
@@ -18,6 +23,40 @@ from src.utils.text_utils import (
     clean_text,
     detect_language
 )
+from src.utils.document_cache import DocumentCache
+from src.utils.deadline import Deadline
+from src.utils.cpu_scheduler import available_cores
+from src.utils import tracing
+from src.utils.span_table import SpanTable, ALIGNMENT_NAMES, BOLD_FLAG, ITALIC_FLAG
+from src.utils.pattern_engine import PatternEngine, get_pattern_engine
+
+
+# Characters counted as meaningful when filtering CJK candidates
+CJK_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff\u3041-\u3096\u30A1-\u30FA]')
+
+
+def _feature_matrix(candidates: List['HeadingCandidate'], attributes: Tuple[str, ...],
+                    features: Tuple[str, ...] = ()) -> Dict[str, np.ndarray]:
+    """
+    Feature matrix of the candidates, one row per candidate, as named columns.
+
+    Columns are the requested candidate ``attributes`` followed by entries of
+    the ``features`` dicts; booleans become 0/1 and missing features are 0.
+    """
+    count = len(candidates)
+    names = attributes + features
+    matrix = np.empty((count, len(names)), dtype=np.float64)
+    
+    # Filled column by column: map() over C-level getters is much faster than
+    # building a tuple per candidate
+    for j, attribute in enumerate(attributes):
+        matrix[:, j] = np.fromiter(map(attrgetter(attribute), candidates), dtype=np.float64, count=count)
+    feature_dicts = [c.features for c in candidates]
+    for j, feature in enumerate(features, start=len(attributes)):
+        matrix[:, j] = np.fromiter(map(dict.get, feature_dicts, repeat(feature), repeat(0)),
+                                   dtype=np.float64, count=count)
+    
+    return dict(zip(names, matrix.T))
 
 
 @dataclass
@@ -44,10 +83,56 @@ class HeadingCandidate:
             self.features = {}
 
 
+# In-memory PDF buffer of the document being sharded. Handed to each worker once
+# by the pool initializer, so workers need not reopen a file that does not exist.
+_shard_buffer: Optional[bytes] = None
+
+
+def _init_shard_worker(buffer: Optional[bytes]) -> None:
+    """Pool initializer: keep the in-memory document (if any) for every shard of this worker."""
+    global _shard_buffer
+    _shard_buffer = buffer
+
+
+def _shard_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for shard workers.
+    
+    Workers are never forked from the calling process: a forked child gets only
+    the calling thread, and locks held at that moment by other threads (logging,
+    the allocator, torch's and OpenMP's thread pools) stay locked in it forever.
+    A forkserver starts clean workers from a single-threaded server that has
+    imported this module but not torch; spawn is used where it is unavailable.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _extract_shard_candidates(pdf_path: str, page_numbers: List[int], language: str,
+                              detected_language: Optional[str], document_stats: Dict[str, Any],
+                              debug: bool = False) -> Tuple[List['HeadingCandidate'], List[Tuple[str, int, float]]]:
+    """Worker entry point: extract candidates for one shard of pages with its own document handle."""
+    generator = CandidateGenerator(language=language, debug=debug, page_workers=1)
+    generator.detected_language = detected_language
+    generator.document_stats = document_stats
+    
+    candidates = []
+    text_occurrences = []
+    with DocumentCache(pdf_path, data=_shard_buffer) as document:
+        for page_num in page_numbers:
+            candidates.extend(generator._extract_page_candidates(document, page_num, text_occurrences))
+    
+    return candidates, text_occurrences
+
+
 class CandidateGenerator:
     """Fast candidate generation using font and layout heuristics with advanced multilingual support."""
     
-    def __init__(self, language: str = 'auto', debug: bool = False):
+    def __init__(self, language: str = 'auto', debug: bool = False,
+                 page_workers: Optional[int] = None):
         self.language = language
         self.debug = debug
         self.logger = logging.getLogger(__name__)
@@ -55,61 +140,191 @@ class CandidateGenerator:
         self.document_stats = {}
         self.detected_language = None
         
-    def generate_candidates(self, pdf_path: str) -> List[HeadingCandidate]:
-        """Generate heading candidates from PDF using fast heuristics with multilingual support."""
+        # Worker processes for page-sharded extraction of long documents (1 = serial)
+        self.page_workers = max(1, page_workers or PAGE_SHARD_WORKERS or available_cores())
+        
+    def generate_candidates(self, pdf_path: str,
+                            document: Optional[DocumentCache] = None,
+                            deadline: Optional[Deadline] = None) -> List[HeadingCandidate]:
+        """Generate heading candidates from PDF using fast heuristics with multilingual support.
+        
+        When a shared DocumentCache is passed, page dictionaries already parsed by
+        earlier stages are reused instead of re-extracting them. When the deadline
+        runs out, pages not parsed yet are skipped and the candidates found so far
+        are returned.
+        """
         self.logger.info(f"Generating candidates for: {pdf_path}")
         
-        doc = fitz.open(pdf_path)
+        owns_document = document is None
+        if owns_document:
+            document = DocumentCache(pdf_path)
         all_candidates = []
+        # (text, page, position_ratio) of every heading-like line, before font filtering
+        text_occurrences = []
         
         try:
-            self._analyze_document_stats(doc)
-            page_count = len(doc)
+            with tracing.span("document_stats", cat="candidates"):
+                self._analyze_document_stats(document)
+            page_count = document.page_count
             
             start_page = 1 if page_count > 1 else 0
+            page_numbers = list(range(start_page, page_count))
 
-            for page_num in range(start_page, page_count):
-                page = doc.load_page(page_num)
-                page_candidates = self._extract_page_candidates(page, page_num)
-                all_candidates.extend(page_candidates)
+            if self._should_shard(document, len(page_numbers)):
+                all_candidates, text_occurrences = self._extract_sharded_candidates(
+                    document, page_numbers, deadline
+                )
+            else:
+                for page_num in page_numbers:
+                    if deadline is not None and deadline.exhausted():
+                        self.logger.warning(f"Deadline reached - stopped parsing at page {page_num + 1} of {page_count}")
+                        deadline.cut("candidate_generation", f"stopped at page {page_num + 1} of {page_count}")
+                        break
+                    page_candidates = self._extract_page_candidates(
+                        document, page_num, text_occurrences
+                    )
+                    all_candidates.extend(page_candidates)
                 
         finally:
-            doc.close()
+            if owns_document:
+                document.close()
             
-        running_elements = self._identify_running_elements(all_candidates)
+        running_elements = self._identify_running_elements(text_occurrences)
         candidates = [cand for cand in all_candidates if cand.text.strip() not in running_elements]
             
         # Filter and score candidates
-        filtered_candidates = self._filter_candidates(candidates)
-        scored_candidates = self._score_candidates(filtered_candidates)
+        with tracing.span("filter_candidates", cat="candidates", candidates_in=len(candidates)) as trace_span:
+            filtered_candidates = self._filter_candidates(candidates)
+            trace_span.set(candidates_out=len(filtered_candidates))
+        with tracing.span("score_candidates", cat="candidates", candidates=len(filtered_candidates)):
+            scored_candidates = self._score_candidates(filtered_candidates)
         
         self.logger.info(f"Generated {len(scored_candidates)} candidates for language: {self.detected_language}")
         return scored_candidates
     
-    def _analyze_document_stats(self, doc: fitz.Document) -> None:
+    def iter_page_candidates(self, pdf_path: str, document: Optional[DocumentCache] = None,
+                             release_pages: bool = True
+                             ) -> Generator[Tuple[int, List[HeadingCandidate]], None, List[HeadingCandidate]]:
+        """Stream candidates page by page.
+        
+        Yields (page, candidates) with each page's candidates already filtered and
+        scored, as soon as the page is parsed. Filtering and scoring are
+        per-candidate, so the list returned when the generator finishes (running
+        headers/footers removed, sorted by confidence) is identical to
+        generate_candidates(). With release_pages, parsed page data is dropped
+        from the document cache after use so memory does not grow with page count.
+        """
+        self.logger.info(f"Streaming candidates for: {pdf_path}")
+        
+        owns_document = document is None
+        if owns_document:
+            document = DocumentCache(pdf_path)
+        filtered_candidates = []
+        text_occurrences = []
+        
+        try:
+            with tracing.span("document_stats", cat="candidates"):
+                self._analyze_document_stats(document)
+            page_count = document.page_count
+            
+            start_page = 1 if page_count > 1 else 0
+            
+            for page_num in range(start_page, page_count):
+                page_candidates = self._extract_page_candidates(document, page_num, text_occurrences)
+                if release_pages:
+                    document.release_page(page_num)
+                
+                page_filtered = self._filter_candidates(page_candidates)
+                filtered_candidates.extend(page_filtered)
+                
+                yield page_num + 1, self._score_candidates(list(page_filtered))
+                
+        finally:
+            if owns_document:
+                document.close()
+        
+        running_elements = self._identify_running_elements(text_occurrences)
+        candidates = [cand for cand in filtered_candidates if cand.text.strip() not in running_elements]
+        candidates.sort(key=lambda x: x.confidence_score, reverse=True)
+        
+        self.logger.info(f"Generated {len(candidates)} candidates for language: {self.detected_language}")
+        return candidates
+    
+    def _should_shard(self, document: DocumentCache, page_count: int) -> bool:
+        """Shard only long documents that workers can reopen (from disk or a copy of the buffer)."""
+        return (self.page_workers > 1
+                and page_count >= PAGE_SHARD_MIN_PAGES
+                and (document.is_in_memory or Path(document.pdf_path).is_file()))
+    
+    def _extract_sharded_candidates(self, document: DocumentCache, page_numbers: List[int],
+                                    deadline: Optional[Deadline] = None
+                                    ) -> Tuple[List[HeadingCandidate], List[Tuple[str, int, float]]]:
+        """
+        Extract page candidates in parallel over contiguous page shards.
+        
+        Each shard is processed by a separate process with its own document handle.
+        Shard outputs are concatenated in page order, so running-element detection,
+        filtering and scoring afterwards see exactly what serial extraction produces.
+        If the deadline runs out, the shards received so far are kept and the
+        worker processes are terminated, so no CPU is spent past the deadline.
+        """
+        pdf_path = document.pdf_path
+        
+        workers = min(self.page_workers, len(page_numbers))
+        shard_count = workers * 2  # smaller shards balance uneven pages
+        shard_size = -(-len(page_numbers) // shard_count)
+        shards = [page_numbers[i:i + shard_size] for i in range(0, len(page_numbers), shard_size)]
+        
+        self.logger.info(f"Extracting {len(page_numbers)} pages in {len(shards)} shards "
+                         f"with {workers} worker processes")
+        
+        all_candidates = []
+        text_occurrences = []
+        buffer = document.data.tobytes() if document.is_in_memory else None
+        pool = _shard_context().Pool(processes=workers, initializer=_init_shard_worker,
+                                     initargs=(buffer,))
+        try:
+            pending = [
+                pool.apply_async(_extract_shard_candidates,
+                                 (pdf_path, shard, self.language, self.detected_language,
+                                  self.document_stats, self.debug))
+                for shard in shards
+            ]
+            pool.close()
+            
+            # Merge in shard (page) order
+            for shard, async_result in zip(shards, pending):
+                timeout = max(0.0, deadline.remaining() - deadline.reserve) if deadline is not None else None
+                try:
+                    shard_candidates, shard_occurrences = async_result.get(timeout=timeout)
+                except multiprocessing.TimeoutError:
+                    self.logger.warning(f"Deadline reached - stopped at page {shard[0] + 1} of {document.page_count}")
+                    deadline.cut("candidate_generation", f"stopped at page {shard[0] + 1} of {document.page_count}")
+                    break
+                all_candidates.extend(shard_candidates)
+                text_occurrences.extend(shard_occurrences)
+        finally:
+            # Kills workers still parsing shards past the deadline (a no-op when all are done)
+            pool.terminate()
+            pool.join()
+        
+        return all_candidates, text_occurrences
+    
+    def _analyze_document_stats(self, document: DocumentCache) -> None:
         """Analyze document to understand typical font characteristics and detect language."""
         font_sizes = []
         font_families = set()
-        text_blocks = []
         sample_text = ""
         
-        for page_num in range(min(3, len(doc))):  # Sample first 3 pages
-            page = doc.load_page(page_num)
-            blocks = page.get_text("dict")["blocks"]
-            
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_sizes.append(span["size"])
-                            font_families.add(span["font"])
-                            text_blocks.append({
-                                "text": span["text"],
-                                "size": span["size"],
-                                "flags": span["flags"]
-                            })
-                            # Collect text for language detection
-                            sample_text += span["text"] + " "
+        for page_num in range(min(3, document.page_count)):  # Sample first 3 pages
+            table = document.span_table(page_num)
+            
+            font_sizes.append(table.span_size)
+            font_families.update(table.fonts)
+            # Collect text for language detection
+            sample_text += "".join(text + " " for text in table.span_text)
+        
+        font_sizes = np.concatenate(font_sizes) if font_sizes else np.array([])
         
         # Detect language if set to auto
         if self.language == 'auto':
@@ -119,87 +334,205 @@ class CandidateGenerator:
             self.detected_language = self.language
         
         # Calculate statistics
+        has_sizes = font_sizes.size > 0
         self.document_stats = {
-            "avg_font_size": np.mean(font_sizes) if font_sizes else 12,
-            "median_font_size": np.median(font_sizes) if font_sizes else 12,
-            "max_font_size": max(font_sizes) if font_sizes else 12,
-            "min_font_size": min(font_sizes) if font_sizes else 12,
+            "avg_font_size": np.mean(font_sizes) if has_sizes else 12,
+            "median_font_size": np.median(font_sizes) if has_sizes else 12,
+            "max_font_size": float(font_sizes.max()) if has_sizes else 12,
+            "min_font_size": float(font_sizes.min()) if has_sizes else 12,
             "font_families": font_families,
-            "body_text_threshold": np.percentile(font_sizes, 75) if font_sizes else 12,
+            "body_text_threshold": np.percentile(font_sizes, 75) if has_sizes else 12,
             "detected_language": self.detected_language,
             "sample_text": sample_text[:500]  # Keep sample for further analysis
         }
         
         self.logger.debug(f"Document stats: {self.document_stats}")
     
-    def _extract_page_candidates(self, page: fitz.Page, page_num: int) -> List[HeadingCandidate]:
+    def _extract_page_candidates(self, document: DocumentCache, page_num: int,
+                                 text_occurrences: Optional[List[Tuple[str, int, float]]] = None
+                                 ) -> List[HeadingCandidate]:
         """Extract heading candidates from a single page with multilingual awareness."""
-        candidates = []
-        blocks = page.get_text("dict")["blocks"]
-        page_height = page.rect.height
+        with tracing.span("page", cat="candidates", page=page_num + 1) as trace_span:
+            candidates = self._build_page_candidates(document, page_num, text_occurrences)
+            if tracing.is_enabled():
+                table = document.span_table(page_num)
+                trace_span.set(lines=table.n_lines, spans=table.n_spans, candidates=len(candidates))
+        return candidates
+    
+    def _build_page_candidates(self, document: DocumentCache, page_num: int,
+                               text_occurrences: Optional[List[Tuple[str, int, float]]] = None
+                               ) -> List[HeadingCandidate]:
+        """Build candidates for one page.
+        
+        Works on the page's columnar SpanTable: font size, alignment, position and
+        spacing are computed as arrays for all lines at once. Lines are then
+        screened in two phases: the font-size mask and _line_rule_mask reject
+        body text with cheap checks, and only the survivors get the expensive
+        line features (tokenization, CJK and cultural analysis) and become
+        HeadingCandidate objects.
+        """
+        table = document.span_table(page_num)
+        if table.n_lines == 0:
+            return []
+        
+        page_height = table.page_height
+        page_width = table.page_width
+        
+        line_size = table.line_size()
+        line_flags = table.line_flags()
+        position_ratio = table.position_ratio()
+        spacing_before = table.spacing_before()
+        spacing_after = table.spacing_after()
+        alignment = table.alignment_codes(CENTER_ALIGNMENT_TOLERANCE)
+        
+        # Same bound as _line_rule_mask; CJK uses the lenient chapter/section
+        # factor here and the exact per-candidate bound is applied there
+        size_threshold = self.document_stats["avg_font_size"] * FONT_SIZE_THRESHOLD_RATIO
+        if self.detected_language in ['japanese', 'chinese']:
+            size_threshold *= 0.7
+        size_mask = table.has_spans() & (line_size >= size_threshold)
         
-        for block_idx, block in enumerate(blocks):
-            if "lines" not in block:
+        # First phase: the filter's per-line rules on every line that passes the size mask
+        screened = []
+        for line_id in np.flatnonzero(table.has_spans()):
+            line_text = table.line_text[line_id]
+            
+            if not self._is_potential_heading_text(line_text):
                 continue
-                
-            # Process each line in the block
-            for line_idx, line in enumerate(block["lines"]):
-                line_text = ""
-                line_bbox = line["bbox"]
-                spans = line["spans"]
-                
-                if not spans:
-                    continue
-                
-                # Combine spans in the line
-                dominant_span = max(spans, key=lambda s: (s["size"], len(s["text"])))
-                line_text = " ".join([span["text"].strip() for span in spans])
-                
-                if not self._is_potential_heading_text(line_text):
-                    continue
-                
-                # Calculate features with language awareness
-                features = self._extract_line_features(
-                    line, line_text, line_bbox, page.rect.height, page.rect.width, 
-                    block_idx, line_idx, blocks
-                )
+            
+            if text_occurrences is not None:
+                text_occurrences.append((line_text.strip(), page_num + 1, float(position_ratio[line_id])))
+            
+            if size_mask[line_id]:
+                screened.append(line_id)
+        
+        screened = np.array(screened, dtype=np.int64)
+        line_texts = [table.line_text[line_id] for line_id in screened]
+        if self.detected_language in ['japanese', 'chinese']:
+            # Same chapter/section and reject tests as the line features
+            cjk_flags = (
+                np.fromiter((self._is_cjk_chapter_heading(t) or self._is_cjk_section_heading(t) for t in line_texts),
+                            dtype=bool, count=len(line_texts)),
+                np.fromiter(map(self._has_cjk_reject_pattern, line_texts), dtype=bool, count=len(line_texts))
+            )
+        else:
+            cjk_flags = None
+        passes = self._line_rule_mask([t.strip() for t in line_texts], line_size[screened], cjk_flags)
+        
+        candidates = []
+        for line_id in screened[passes]:
+            line_text = table.line_text[line_id]
+            text = line_text.strip()
+            
+            line_bbox = table.line_bbox_tuple(line_id)
+            flags = int(line_flags[line_id])
+            dominant_span = table.line_dominant[line_id]
+            
+            # Calculate features with language awareness
+            features = self._extract_line_features(
+                line_text, line_bbox, page_height, page_width,
+                float(spacing_before[line_id]), float(spacing_after[line_id])
+            )
 
-                # Create candidate
-                candidate = HeadingCandidate(
-                    text=line_text.strip(),
-                    page=page_num + 1,
-                    bbox=line_bbox,
-                    font_size=dominant_span["size"],
-                    font_weight=self._get_font_weight(dominant_span["flags"]),
-                    font_family=dominant_span["font"],
-                    is_bold=bool(dominant_span["flags"] & 2**4),
-                    is_italic=bool(dominant_span["flags"] & 2**1),
-                    alignment=self._determine_alignment(line_bbox, page.rect.width),
-                    position_ratio=line_bbox[1] / page_height,
-                    line_spacing_before=features["spacing_before"],
-                    line_spacing_after=features["spacing_after"],
-                    text_length=len(line_text.strip()),
-                    features=features
-                )
-                
-                candidates.append(candidate)
+            # Create candidate
+            candidate = HeadingCandidate(
+                text=text,
+                page=page_num + 1,
+                bbox=line_bbox,
+                font_size=float(line_size[line_id]),
+                font_weight=self._get_font_weight(flags),
+                font_family=table.fonts[table.span_font_id[dominant_span]],
+                is_bold=bool(flags & BOLD_FLAG),
+                is_italic=bool(flags & ITALIC_FLAG),
+                alignment=ALIGNMENT_NAMES[alignment[line_id]],
+                position_ratio=float(position_ratio[line_id]),
+                line_spacing_before=features["spacing_before"],
+                line_spacing_after=features["spacing_after"],
+                text_length=len(text),
+                features=features
+            )
+            
+            candidates.append(candidate)
         
         return candidates
     
-    def _extract_line_features(self, line: Dict, text: str, bbox: Tuple,
+    def _line_rule_mask(self, texts: List[str], font_size: np.ndarray,
+                        cjk_flags: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+        """Mask of the lines that pass the per-line heading rules.
+        
+        The single definition of the size, length, character-ratio and
+        linguistic rules, used both to screen a page's lines before any
+        expensive feature is computed and by _filter_candidates. The layout
+        rules are NumPy masks over all lines at once; the text-level checks then
+        run only for the lines that passed them. On CJK documents ``cjk_flags``
+        gives each line's clear chapter/section flag and reject-pattern flag.
+        """
+        keep = np.ones(len(texts), dtype=bool)
+        if not texts:
+            return keep
+        
+        text_length = np.fromiter(map(len, texts), dtype=np.float64, count=len(texts))
+        
+        # Font size filter (adjusted for language)
+        size_threshold = self.document_stats["avg_font_size"] * FONT_SIZE_THRESHOLD_RATIO
+        
+        # Length filters (adjusted for language)
+        min_length = MIN_HEADING_LENGTH
+        max_length = MAX_HEADING_LENGTH
+        
+        is_cjk = cjk_flags is not None
+        if is_cjk:
+            clear_heading, has_reject_pattern = cjk_flags
+            
+            # Skip if has CJK reject patterns
+            keep &= ~has_reject_pattern
+            
+            # Stricter font requirements unless it's a clear chapter/section
+            size_threshold = np.where(clear_heading, size_threshold * 0.7, size_threshold * 1.1)
+            
+            # Characters convey more meaning; very short text only with clear heading markers
+            min_length = max(1, MIN_HEADING_LENGTH // 2)
+            max_length = MAX_HEADING_LENGTH * 1.5  # Slightly more restrictive
+            keep &= clear_heading | (text_length >= 3)
+        
+        keep &= font_size >= size_threshold
+        keep &= (text_length >= min_length) & (text_length <= max_length)
+        
+        # Skip if mostly punctuation (adjusted for language)
+        survivors = np.flatnonzero(keep)
+        survivor_texts = [texts[i] for i in survivors]
+        if is_cjk:
+            # For CJK, check character ratio differently
+            cjk_chars = np.fromiter((len(CJK_CHAR_PATTERN.findall(t)) for t in survivor_texts),
+                                    dtype=np.float64, count=len(survivor_texts))
+            total_chars = np.fromiter((len(t.replace(' ', '')) for t in survivor_texts),
+                                      dtype=np.float64, count=len(survivor_texts))
+            cjk_ratio = np.divide(cjk_chars, total_chars, out=np.ones_like(cjk_chars), where=total_chars > 0)
+            # Not enough meaningful characters, unless it's clearly a heading
+            keep[survivors] = (cjk_ratio >= 0.2) | clear_heading[survivors]
+        else:
+            # For non-CJK languages, use alpha ratio
+            alpha_chars = np.fromiter((sum(map(str.isalpha, t)) for t in survivor_texts),
+                                      dtype=np.float64, count=len(survivor_texts))
+            keep[survivors] = alpha_chars / text_length[survivors] >= 0.3
+        
+        # General linguistic heading detection (memoized per text, so a line
+        # screened here is a cache hit when its candidate is filtered)
+        for i in np.flatnonzero(keep):
+            if is_likely_heading(texts[i], self.detected_language)["confidence"] < 0.1:  # Very low threshold
+                keep[i] = False
+        
+        return keep
+    
+    def _extract_line_features(self, text: str, bbox: Tuple,
                            page_height: float, page_width: float,
-                           block_idx: int, line_idx: int,
-                           blocks: List) -> Dict[str, Any]:
+                           spacing_before: float, spacing_after: float) -> Dict[str, Any]:
         """Extract detailed features for a line with multilingual support."""
         features = {}
         
-        # Spacing analysis
-        features["spacing_before"] = self._calculate_spacing_before(
-            block_idx, line_idx, blocks
-        )
-        features["spacing_after"] = self._calculate_spacing_after(
-            block_idx, line_idx, blocks
-        )
+        # Spacing analysis (precomputed for the whole page by SpanTable)
+        features["spacing_before"] = spacing_before
+        features["spacing_after"] = spacing_after
         
         # Enhanced text pattern analysis with language awareness
         features["has_numbering"] = self._has_numbering_pattern(text)
@@ -216,7 +549,7 @@ class CandidateGenerator:
         
         # Multilingual tokenization for better analysis
         if self.detected_language:
-            tokens = tokenize_multilingual(text, self.detected_language)
+            tokens = tokenize_multilingual(text, self.detected_language, use_nltk=False)  # runs per line
             features["token_count"] = len(tokens)
             features["tokens"] = tokens[:10]  # Store first 10 tokens for analysis
             
@@ -241,67 +574,37 @@ class CandidateGenerator:
         
         return features
     
+    @property
+    def patterns(self) -> PatternEngine:
+        """Compiled heading patterns for the detected language."""
+        return get_pattern_engine(self.detected_language)
+    
     def _is_cjk_chapter_heading(self, text: str) -> bool:
         """Check if text is a CJK chapter heading."""
-        chapter_patterns = [
-            r'^第[一二三四五六七八九十\d]+章',  # 第一章, 第1章
-            r'^第[一二三四五六七八九十\d]+節',  # 第一節, 第1節
-            r'^Chapter\s*[一二三四五六七八九十\d]+',  # Chapter 1 (mixed)
-        ]
-        
-        for pattern in chapter_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.patterns.any(text, "cjk_chapter")
     
     def _is_cjk_section_heading(self, text: str) -> bool:
         """Check if text is a CJK section heading."""
-        section_patterns = [
-            r'^\d+\.\d+\s+[^\s]',             # 1.1 Title
-            r'^[一二三四五六七八九十]+、',        # 一、
-            r'^（[一二三四五六七八九十\d]+）',   # （一）
-        ]
-        
-        for pattern in section_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.patterns.any(text, "cjk_section")
     
     def _has_cjk_reject_pattern(self, text: str) -> bool:
         """Check if text matches CJK rejection patterns."""
-        reject_patterns = [
-            r'^[•·]\s',           # Bullets
-            r'^行\d+',            # Table rows
-            r'^ヘッダー\d+$',      # Headers
-            r'です。$',           # Japanese sentence endings
-            r'である。$',         # Japanese sentence endings
-            r'した。$',           # Japanese sentence endings
-            r'する。$',           # Japanese sentence endings
-            r'^表\d+[：:]',       # Table captions (Japanese)
-            r'^图\d+[：:]',       # Figure captions (Chinese)
-            r'^圖\d+[：:]',       # Figure captions (Traditional Chinese)
-            r'^列表\d+',          # List items (Chinese)
-            r'^リスト\d+',        # List items (Japanese)
-        ]
-        
-        for pattern in reject_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.patterns.any(text, "cjk_reject")
     
     def _is_potential_heading_text(self, text: str) -> bool:
         """Quick filter for potential heading text with enhanced CJK filtering."""
         text = text.strip()
+        patterns = self.patterns
         
         # Basic length check (adjusted for CJK)
         if self.detected_language in ['japanese', 'chinese']:
             # More lenient for CJK but reject very short unless clear heading
             if len(text) < 1:
                 return False
-            if len(text) < 3 and not re.search(r'[章節項目録]', text):
+            if len(text) < 3 and not patterns.any(text, "cjk_short_marker"):
                 return False
             # Reject very long text (likely paragraphs) unless clear chapter
-            if len(text) > 40 and not re.search(r'^第[一二三四五六七八九十\d]+章', text):
+            if len(text) > 40 and not patterns.any(text, "cjk_chapter_marker"):
                 return False
         else:
             # Original logic for non-CJK languages
@@ -309,10 +612,10 @@ class CandidateGenerator:
                 return False
         
         # Skip page numbers, footnotes, headers/footers
-        if re.match(r'^\d+$', text):  # Just numbers
+        if patterns.any(text, "digits_only"):  # Just numbers
             return False
         
-        if re.match(r'^[ivxlcdm]+$', text.lower()):  # Roman numerals only
+        if patterns.any(text, "roman_only"):  # Roman numerals only
             return False
         
         # CJK-specific rejection patterns
@@ -322,29 +625,16 @@ class CandidateGenerator:
                 return False
             
             # Reject list items
-            if re.match(r'^[•·]\s', text) or re.match(r'^\d+\.\s[^章節]', text):
-                return False
-            
-            # Check if it's just punctuation
-            if re.match(r'^[\s\.,;:!?\-\(\)\[\]{}]*$', text):
-                return False
-        else:
-            # Enhanced filtering for non-CJK languages (original logic)
-            if re.match(r'^[\s\.,;:!?\-\(\)\[\]{}]*$', text):
+            if patterns.any(text, "cjk_list_item"):
                 return False
         
-        # Skip common non-heading patterns
-        skip_patterns = [
-            r'^page \d+',
-            r'^\d+/\d+',      
-            r'^www\.',         # URLs
-            r'^http',          # URLs
-            r'@',              # Email patterns
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, text.lower()):
-                return False
+        # Check if it's just punctuation
+        if patterns.any(text, "punctuation_only"):
+            return False
+        
+        # Skip common non-heading patterns (page numbers, URLs, emails)
+        if patterns.any(text, "skip"):
+            return False
         
         return True
     
@@ -354,174 +644,54 @@ class CandidateGenerator:
             return "bold"
         return "normal"
     
-    def _determine_alignment(self, bbox: Tuple, page_width: float) -> str:
-        """Determine text alignment based on position."""
-        left_margin = bbox[0]
-        right_margin = page_width - bbox[2]
-        center_pos = (bbox[0] + bbox[2]) / 2
-        page_center = page_width / 2
-        
-        # Check if centered
-        if abs(center_pos - page_center) / page_width < CENTER_ALIGNMENT_TOLERANCE:
-            return "center"
-        
-        # Check if right-aligned
-        if right_margin < left_margin * 0.5:
-            return "right"
-        
-        return "left"
-    
-    def _calculate_spacing_before(self, block_idx: int, line_idx: int, blocks: List) -> float:
-        """Calculate spacing before current line."""
-        if block_idx == 0 and line_idx == 0:
-            return 0.0
-        
-        current_bbox = blocks[block_idx]["lines"][line_idx]["bbox"]
-        
-        # Look for previous line
-        if line_idx > 0:
-            prev_bbox = blocks[block_idx]["lines"][line_idx - 1]["bbox"]
-            return current_bbox[1] - prev_bbox[3]  # Current top - previous bottom
-        elif block_idx > 0:
-            # Previous block's last line
-            prev_block = blocks[block_idx - 1]
-            if "lines" in prev_block and prev_block["lines"]:
-                prev_bbox = prev_block["lines"][-1]["bbox"]
-                return current_bbox[1] - prev_bbox[3]
-        
-        return 0.0
-    
-    def _calculate_spacing_after(self, block_idx: int, line_idx: int, blocks: List) -> float:
-        """Calculate spacing after current line."""
-        current_block = blocks[block_idx]
-        current_bbox = current_block["lines"][line_idx]["bbox"]
-        
-        # Look for next line
-        if line_idx < len(current_block["lines"]) - 1:
-            next_bbox = current_block["lines"][line_idx + 1]["bbox"]
-            return next_bbox[1] - current_bbox[3]
-        elif block_idx < len(blocks) - 1:
-            # Next block's first line
-            for next_block in blocks[block_idx + 1:]:
-                if "lines" in next_block and next_block["lines"]:
-                    next_bbox = next_block["lines"][0]["bbox"]
-                    return next_bbox[1] - current_bbox[3]
-        
-        return 0.0
-    
     def _has_numbering_pattern(self, text: str) -> bool:
         """Check if text has numbering pattern with multilingual support."""
-        # Get language-specific patterns
-        if self.detected_language in self.cultural_patterns:
-            patterns = self.cultural_patterns[self.detected_language].get('numbering_patterns', [])
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    return True
-        
-        # Default patterns
-        default_patterns = [
-            r'^\d+\.',           # 1. 2. 3.
-            r'^\d+\.\d+',        # 1.1, 1.2
-            r'^[IVX]+\.',        # I. II. III.
-            r'^[A-Z]\.',         # A. B. C.
-            r'^Chapter \d+',     # Chapter 1
-            r'^Section \d+',     # Section 1
-            r'^\(\d+\)',         # (1) (2)
-        ]
-        
-        for pattern in default_patterns:
-            if re.search(pattern, text):
-                return True
-        
-        return False
+        # Language-specific patterns first, then the defaults
+        return self.patterns.any(text, "numbering") or self.patterns.any(text, "default_numbering")
     
     def _detect_numbering_type(self, text: str) -> Optional[str]:
         """Detect the type of numbering used with multilingual support."""
-        # Language-specific numbering detection
-        if self.detected_language == 'japanese':
-            if re.search(r'^第\d+章', text):
-                return "japanese_chapter"
-            elif re.search(r'^第[一二三四五六七八九十]+章', text):
-                return "japanese_kanji_chapter"
-            elif re.search(r'^[一二三四五六七八九十]+、', text):
-                return "japanese_kanji_list"
-        
-        elif self.detected_language == 'chinese':
-            if re.search(r'^第\d+章', text):
-                return "chinese_chapter"
-            elif re.search(r'^第[一二三四五六七八九十]+章', text):
-                return "chinese_kanji_chapter"
-        
-        elif self.detected_language == 'hindi':
-            if re.search(r'^अध्याय\s+\d+', text):
-                return "hindi_chapter"
-            elif re.search(r'^[१२३४५६७८९०]+\.', text):
-                return "hindi_devanagari"
-        
-        elif self.detected_language == 'arabic':
-            if re.search(r'^الفصل\s+\w+', text):
-                return "arabic_chapter"
-            elif re.search(r'^[\u0660-\u0669]+', text):
-                return "arabic_indic"
-        
-        # Default detection
-        if re.search(r'^\d+\.', text):
-            return "decimal"
-        elif re.search(r'^[IVX]+\.', text):
-            return "roman"
-        elif re.search(r'^[A-Z]\.', text):
-            return "alpha"
-        elif re.search(r'^Chapter', text, re.IGNORECASE):
-            return "chapter"
-        elif re.search(r'^Section', text, re.IGNORECASE):
-            return "section"
-        
-        return None
+        # Language-specific numbering types are ordered before the defaults
+        return self.patterns.first(text, "numbering_type")
     
     def _extract_cultural_features(self, text: str, language: str) -> Dict[str, Any]:
         """Extract language-specific features with enhanced pattern matching."""
         features = {}
         
         if language in self.cultural_patterns:
-            patterns = self.cultural_patterns[language]
+            patterns = get_pattern_engine(language)
             
             # Check for cultural heading styles
-            heading_styles = patterns.get('heading_styles', [])
-            for style in heading_styles:
-                if style in text:
-                    features[f"has_{language}_heading_style"] = True
-                    features[f"heading_style_type"] = style
-                    break
+            style = patterns.first(text, "heading_style")
+            if style is not None:
+                features[f"has_{language}_heading_style"] = True
+                features[f"heading_style_type"] = style
             
             # Check for cultural keywords
-            heading_keywords = patterns.get('heading_keywords', [])
-            for keyword in heading_keywords:
-                if keyword in text:
-                    features[f"has_{language}_keyword"] = True
-                    features[f"keyword_matched"] = keyword
-                    break
+            keyword = patterns.first(text, "heading_keyword")
+            if keyword is not None:
+                features[f"has_{language}_keyword"] = True
+                features[f"keyword_matched"] = keyword
             
             # Check for cultural numbering
-            numbering_patterns = patterns.get('numbering_patterns', [])
-            for pattern in numbering_patterns:
-                if re.search(pattern, text):
-                    features[f"has_{language}_numbering"] = True
-                    features[f"numbering_pattern"] = pattern
-                    break
+            numbering = patterns.first(text, "numbering")
+            if numbering is not None:
+                features[f"has_{language}_numbering"] = True
+                features[f"numbering_pattern"] = numbering
             
             # Language-specific character analysis
             if language in ['japanese', 'chinese']:
-                features["contains_cjk"] = bool(re.search(r'[\u4e00-\u9fff]', text))
+                features["contains_cjk"] = patterns.any(text, "contains_cjk")
                 if language == 'japanese':
-                    features["contains_hiragana"] = bool(re.search(r'[\u3041-\u3096]', text))
-                    features["contains_katakana"] = bool(re.search(r'[\u30A1-\u30FA]', text))
+                    features["contains_hiragana"] = patterns.any(text, "contains_hiragana")
+                    features["contains_katakana"] = patterns.any(text, "contains_katakana")
             
             elif language == 'arabic':
-                features["contains_arabic"] = bool(re.search(r'[\u0600-\u06FF]', text))
+                features["contains_arabic"] = patterns.any(text, "contains_arabic")
                 features["is_rtl"] = True
             
             elif language == 'hindi':
-                features["contains_devanagari"] = bool(re.search(r'[\u0900-\u097F]', text))
+                features["contains_devanagari"] = patterns.any(text, "contains_devanagari")
         
         return features
     
@@ -530,89 +700,43 @@ class CandidateGenerator:
         boost = 0.0
         
         if language in HEADING_CONFIDENCE_BOOSTERS:
-            boosters = HEADING_CONFIDENCE_BOOSTERS[language]
+            patterns = get_pattern_engine(language)
             
-            # Pattern-based boosts
-            for pattern, boost_value in boosters.get('patterns', []):
-                if re.search(pattern, text):
-                    boost += boost_value
-                    break  # Only apply one pattern boost
+            # Pattern-based boost: only the first matching pattern applies
+            pattern_boost = patterns.first(text, "booster_pattern")
+            if pattern_boost is not None:
+                boost += pattern_boost
             
-            # Keyword-based boosts
-            for keyword, boost_value in boosters.get('keywords', []):
-                if keyword in text:
-                    boost += boost_value
-                    break  # Only apply one keyword boost
+            # Keyword-based boost: only the first matching keyword applies
+            keyword_boost = patterns.first(text, "booster_keyword")
+            if keyword_boost is not None:
+                boost += keyword_boost
         
         return min(boost, 1.0)  # Cap at 1.0
     
     def _filter_candidates(self, candidates: List[HeadingCandidate]) -> List[HeadingCandidate]:
-        """Apply filters to remove unlikely candidates with enhanced CJK filtering."""
-        filtered = []
+        """Apply filters to remove unlikely candidates with enhanced CJK filtering.
         
-        for candidate in candidates:
-            # Skip if has CJK reject patterns (for CJK languages)
-            if (self.detected_language in ['japanese', 'chinese'] and 
-                candidate.features.get("has_cjk_reject_pattern", False)):
-                continue
-            
-            # Font size filter (adjusted for language)
-            size_threshold = self.document_stats["avg_font_size"] * FONT_SIZE_THRESHOLD_RATIO
-            
-            # More lenient threshold for CJK languages, but stricter overall
-            if self.detected_language in ['japanese', 'chinese']:
-                # Stricter font requirements unless it's a clear chapter/section
-                if (candidate.features.get("is_cjk_chapter", False) or 
-                    candidate.features.get("is_cjk_section", False)):
-                    size_threshold *= 0.7  # More lenient for clear patterns
-                else:
-                    size_threshold *= 1.1  # Stricter for general text
-            
-            if candidate.font_size < size_threshold:
-                continue
-            
-            # Length filters (adjusted for language)
-            min_length = MIN_HEADING_LENGTH
-            max_length = MAX_HEADING_LENGTH
-            
-            # Adjust for CJK languages where characters convey more meaning
-            if self.detected_language in ['japanese', 'chinese']:
-                min_length = max(1, MIN_HEADING_LENGTH // 2)
-                max_length = MAX_HEADING_LENGTH * 1.5  # Slightly more restrictive
-                
-                # Special handling for very short text
-                if candidate.text_length < 3:
-                    # Only allow if it has clear heading markers
-                    if not (candidate.features.get("is_cjk_chapter", False) or 
-                           candidate.features.get("is_cjk_section", False)):
-                        continue
-            
-            if candidate.text_length < min_length or candidate.text_length > max_length:
-                continue
-            
-            # Skip if mostly punctuation (adjusted for language)
-            if self.detected_language in ['japanese', 'chinese']:
-                # For CJK, check character ratio differently
-                cjk_chars = len(re.findall(r'[\u4e00-\u9fff\u3041-\u3096\u30A1-\u30FA]', candidate.text))
-                total_chars = len(candidate.text.replace(' ', ''))
-                if total_chars > 0 and cjk_chars / total_chars < 0.2:
-                    # Not enough meaningful characters, unless it's clearly a heading
-                    if not (candidate.features.get("is_cjk_chapter", False) or 
-                           candidate.features.get("is_cjk_section", False)):
-                        continue
-            else:
-                # For non-CJK languages, use alpha ratio
-                alpha_ratio = sum(c.isalpha() for c in candidate.text) / len(candidate.text)
-                if alpha_ratio < 0.3:
-                    continue
-            
-            # Apply general linguistic heading detection
-            heading_analysis = is_likely_heading(candidate.text, self.detected_language)
-            if heading_analysis["confidence"] < 0.1:  # Very low threshold
-                continue
+        The rules are those of _line_rule_mask, applied to all candidates at
+        once; each survivor keeps its linguistic analysis in its features.
+        """
+        if not candidates:
+            return []
+        
+        cjk_flags = None
+        if self.detected_language in ['japanese', 'chinese']:
+            columns = _feature_matrix(candidates, (), ("is_cjk_chapter", "is_cjk_section", "has_cjk_reject_pattern"))
+            cjk_flags = ((columns["is_cjk_chapter"] != 0) | (columns["is_cjk_section"] != 0),
+                         columns["has_cjk_reject_pattern"] != 0)
+        font_size = np.fromiter((c.font_size for c in candidates), dtype=np.float64, count=len(candidates))
+        keep = self._line_rule_mask([c.text for c in candidates], font_size, cjk_flags)
+        
+        filtered = []
+        for i in np.flatnonzero(keep):
+            candidate = candidates[i]
             
             # Store the linguistic analysis
-            candidate.features["linguistic_analysis"] = heading_analysis
+            candidate.features["linguistic_analysis"] = is_likely_heading(candidate.text, self.detected_language)
             
             filtered.append(candidate)
         
@@ -620,78 +744,88 @@ class CandidateGenerator:
         return filtered
     
     def _score_candidates(self, candidates: List[HeadingCandidate]) -> List[HeadingCandidate]:
-        """Score candidates based on multiple features with enhanced CJK scoring."""
-        for candidate in candidates:
-            score = 0.0
+        """Score candidates based on multiple features with enhanced CJK scoring.
+        
+        Each rule is a column of a feature matrix (one row per candidate) and
+        the score is their weighted sum, with the points taken from
+        CANDIDATE_SCORE_WEIGHTS. Columns are added in a fixed order, so the
+        floating-point result is the same as scoring one candidate at a time.
+        """
+        if candidates:
+            weights = CANDIDATE_SCORE_WEIGHTS
+            avg_font_size = self.document_stats["avg_font_size"]
+            language = self.detected_language
+            
+            columns = _feature_matrix(
+                candidates,
+                ("font_size", "position_ratio", "line_spacing_before", "line_spacing_after", "is_bold"),
+                ("is_top_of_page", "has_numbering", "title_case", "has_colon",
+                 "is_cjk_chapter", "is_cjk_section", "cjk_confidence", "contains_cjk",
+                 "confidence_boost", f"has_{language}_heading_style", f"has_{language}_numbering")
+            )
+            font_size = columns["font_size"]
+            linguistic_confidence = np.fromiter(
+                (c.features.get("linguistic_analysis", {}).get("confidence", 0.0) for c in candidates),
+                dtype=np.float64, count=len(candidates)
+            )
             
             # Font size score (0-30 points)
-            size_ratio = candidate.font_size / self.document_stats["avg_font_size"]
-            score += min(30, size_ratio * 10)
+            size_ratio = font_size / avg_font_size
+            score = np.minimum(weights["font_size_max"], size_ratio * weights["font_size_ratio"])
             
             # Bold weight (0-20 points)
-            if candidate.is_bold:
-                score += 20
+            score = score + np.where(columns["is_bold"] != 0, weights["bold"], 0)
             
-            # Position score (0-15 points)
-            if candidate.features.get("is_top_of_page", False):
-                score += 15
-            elif candidate.position_ratio < 0.3:  # Upper part of page
-                score += 10
+            # Position score (0-15 points): top of page, else upper part of page
+            score = score + np.where(columns["is_top_of_page"] != 0, weights["top_of_page"],
+                                     np.where(columns["position_ratio"] < 0.3, weights["upper_page"], 0))
             
             # Spacing score (0-15 points)
-            if candidate.line_spacing_before > 10:
-                score += 8
-            if candidate.line_spacing_after > 5:
-                score += 7
+            score = score + np.where(columns["line_spacing_before"] > 10, weights["spacing_before"], 0)
+            score = score + np.where(columns["line_spacing_after"] > 5, weights["spacing_after"], 0)
             
             # Text pattern score (0-20 points)
-            if candidate.features.get("has_numbering", False):
-                score += 15
-            if candidate.features.get("title_case", False):
-                score += 5
-            if candidate.features.get("has_colon", False):
-                score += 5
+            score = score + np.where(columns["has_numbering"] != 0, weights["numbering"], 0)
+            score = score + np.where(columns["title_case"] != 0, weights["title_case"], 0)
+            score = score + np.where(columns["has_colon"] != 0, weights["colon"], 0)
             
             # Enhanced CJK-specific scoring
-            if self.detected_language in ['japanese', 'chinese']:
-                # Stricter font size requirements unless clear heading patterns
-                if candidate.font_size < self.document_stats["avg_font_size"] * 1.2:
-                    if not (candidate.features.get("is_cjk_chapter", False) or 
-                           candidate.features.get("is_cjk_section", False)):
-                        score *= 0.3  # Heavy penalty for small font without clear patterns
+            if language in ['japanese', 'chinese']:
+                is_chapter = columns["is_cjk_chapter"] != 0
+                is_section = columns["is_cjk_section"] != 0
+                
+                # Heavy penalty for small font without clear heading patterns
+                small_font = (font_size < avg_font_size * 1.2) & ~(is_chapter | is_section)
+                score = np.where(small_font, score * weights["cjk_small_font_factor"], score)
                 
-                # Major bonus for chapter patterns
-                if candidate.features.get("is_cjk_chapter", False):
-                    score += 40  # Strong bonus for chapter headings
-                elif candidate.features.get("is_cjk_section", False):
-                    score += 25  # Good bonus for section headings
+                # Major bonus for chapter patterns, good bonus for section headings
+                score = score + np.where(is_chapter, weights["cjk_chapter"],
+                                         np.where(is_section, weights["cjk_section"], 0))
                 
                 # CJK confidence from analysis
-                cjk_confidence = candidate.features.get("cjk_confidence", 0.0)
-                score += cjk_confidence * 15
+                score = score + columns["cjk_confidence"] * weights["cjk_confidence"]
                 
                 # Bonus for containing CJK characters
-                if candidate.features.get("contains_cjk", False):
-                    score += 10
+                score = score + np.where(columns["contains_cjk"] != 0, weights["contains_cjk"], 0)
             
-            # Language-specific scoring (existing logic)
-            if self.detected_language:
+            # Language-specific scoring
+            if language:
                 # Apply confidence boost
-                boost = candidate.features.get("confidence_boost", 0.0)
-                score += boost * 20  # Convert to points
+                score = score + columns["confidence_boost"] * weights["confidence_boost"]
                 
                 # Cultural pattern bonuses
-                if candidate.features.get(f"has_{self.detected_language}_heading_style", False):
-                    score += 15
-                if candidate.features.get(f"has_{self.detected_language}_numbering", False):
-                    score += 10
+                score = score + np.where(columns[f"has_{language}_heading_style"] != 0,
+                                         weights["cultural_heading_style"], 0)
+                score = score + np.where(columns[f"has_{language}_numbering"] != 0,
+                                         weights["cultural_numbering"], 0)
             
             # Linguistic analysis bonus
-            linguistic_confidence = candidate.features.get("linguistic_analysis", {}).get("confidence", 0.0)
-            score += linguistic_confidence * 10
+            score = score + linguistic_confidence * weights["linguistic_confidence"]
             
             # Normalize score to 0-1
-            candidate.confidence_score = min(1.0, score / 100.0)
+            confidence = np.minimum(1.0, score / 100.0)
+            for candidate, value in zip(candidates, confidence.tolist()):
+                candidate.confidence_score = value
         
         # Sort by confidence score
         candidates.sort(key=lambda x: x.confidence_score, reverse=True)
@@ -708,15 +842,19 @@ class CandidateGenerator:
             "tokenization_available": self.detected_language in ['japanese', 'chinese']
         }
         
-    def _identify_running_elements(self, candidates: List[HeadingCandidate], threshold: int = 2) -> set:
-        """Identifies headers or footers based on text that repeats across multiple pages in a consistent vertical position."""
+    def _identify_running_elements(self, text_occurrences: List[Tuple[str, int, float]], threshold: int = 2) -> set:
+        """Identifies headers or footers based on text that repeats across multiple pages in a consistent vertical position.
+        
+        Takes (text, page, position_ratio) tuples for every heading-like line,
+        including lines later dropped by the font-size mask.
+        """
     
         text_positions = defaultdict(list)
-        page_count = max([c.page for c in candidates] or [1])
+        page_count = max([page for _, page, _ in text_occurrences] or [1])
 
-        # Collect text and its vertical position ratio for all candidates
-        for cand in candidates:
-            text_positions[cand.text.strip()].append(cand.position_ratio)
+        # Collect text and its vertical position ratio for all occurrences
+        for text, _, position_ratio in text_occurrences:
+            text_positions[text.strip()].append(position_ratio)
 
         running_elements = set()
         # For longer documents, require the text to appear on more pages
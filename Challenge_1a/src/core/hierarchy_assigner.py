@@ -7,6 +7,7 @@ from src.core.candidate_generator import HeadingCandidate
 import numpy as np
 from config.settings import MAX_HIERARCHY_LEVELS, TITLE_POSITION_THRESHOLD
 from config.cultural_patterns import CULTURAL_PATTERNS
+from src.utils.pattern_engine import get_pattern_engine
 
 
 @dataclass
@@ -128,78 +129,15 @@ class HierarchyAssigner:
     def _detect_heading_level_cjk(self, text: str, font_size: float, all_nodes: List[HierarchyNode]) -> int:
         """Detect heading level for CJK text with comprehensive pattern matching."""
         
+        # Chapter and major section markers (1), section markers (2),
+        # subsection markers (3) and minor subsections (4), in priority order
+        level = get_pattern_engine(self.language).first(text, "cjk_level")
+        if level is not None:
+            return level
+        
         # Calculate average font size for reference
         avg_font_size = np.mean([n.font_size for n in all_nodes]) if all_nodes else font_size
         
-        # Level 1: Chapter markers (highest priority)
-        chapter_patterns = [
-            r'^第[一二三四五六七八九十\d]+章',     # 第一章, 第1章
-            r'^Chapter\s*[一二三四五六七八九十\d]+', # Chapter 1 (mixed)
-            r'^序章',                            # Prologue chapter
-            r'^終章',                            # Final chapter
-            r'^付録[一二三四五六七八九十\d]*',      # Appendix
-        ]
-        
-        for pattern in chapter_patterns:
-            if re.search(pattern, text):
-                return 1
-        
-        # Level 1: Major section markers
-        major_section_patterns = [
-            r'^第[一二三四五六七八九十\d]+部',     # 第一部 (Part)
-            r'^第[一二三四五六七八九十\d]+編',     # 第一編 (Volume)
-            r'^はじめに$',                       # Introduction (Japanese)
-            r'^序論$',                          # Introduction (Japanese)
-            r'^結論$',                          # Conclusion (Japanese)
-            r'^まとめ$',                        # Summary (Japanese)
-            r'^引言$',                          # Introduction (Chinese)
-            r'^结论$',                          # Conclusion (Chinese)
-            r'^总结$',                          # Summary (Chinese)
-            r'^参考文献$',                       # References
-            r'^謝辞$',                          # Acknowledgments (Japanese)
-            r'^致谢$',                          # Acknowledgments (Chinese)
-        ]
-        
-        for pattern in major_section_patterns:
-            if re.search(pattern, text):
-                return 1
-        
-        # Level 2: Section markers
-        section_patterns = [
-            r'^第[一二三四五六七八九十\d]+節',     # 第一節, 第1節
-            r'^\d+\.\d+\s+[^\s]',              # 1.1 Title (with space and content)
-            r'^[一二三四五六七八九十]+、',         # 一、二、三、
-            r'^（[一二三四五六七八九十\d]+）',    # （一）（二）
-            r'^\([一二三四五六七八九十\d]+\)',    # (一)(二)
-        ]
-        
-        for pattern in section_patterns:
-            if re.search(pattern, text):
-                return 2
-        
-        # Level 3: Subsection markers
-        subsection_patterns = [
-            r'^\d+\.\d+\.\d+',                # 1.1.1
-            r'^[一二三四五六七八九十]+\.',        # 一. 二. 三.
-            r'^[abc一二三]\)',                 # a) b) c) or 一) 二)
-            r'^[\(（][abc一二三\d]+[\)）]',      # (a) (b) or （一）（二）
-        ]
-        
-        for pattern in subsection_patterns:
-            if re.search(pattern, text):
-                return 3
-        
-        # Level 4+: Minor subsections
-        minor_patterns = [
-            r'^\d+\.\d+\.\d+\.\d+',           # 1.1.1.1
-            r'^・',                           # Bullet points (Japanese)
-            r'^•',                            # Bullet points
-        ]
-        
-        for pattern in minor_patterns:
-            if re.search(pattern, text):
-                return 4
-        
         # Fallback: Use font size relative to document average
         if font_size > avg_font_size * 1.5:
             return 1
@@ -323,56 +261,16 @@ class HierarchyAssigner:
             'chinese_kanji_chapter': 1,      # 第一章
         }
         
+        patterns = get_pattern_engine(self.language)
         for node in nodes:
             text = node.text.strip()
             detected_level = None
             
-            # Enhanced CJK pattern detection
-            if self.language in ['japanese', 'chinese']:
-                if re.match(r'^第\d+章', text) or re.match(r'^第[一二三四五六七八九十]+章', text):
-                    detected_level = 1
-                    node.numbering_pattern = 'cjk_chapter'
-                elif re.match(r'^第\d+節', text) or re.match(r'^第[一二三四五六七八九十]+節', text):
-                    detected_level = 2
-                    node.numbering_pattern = 'cjk_section'
-                elif re.match(r'^\d+\.\d+\.\d+', text):  # 1.1.1
-                    detected_level = 3
-                    node.numbering_pattern = 'decimal_nested_deep'
-                elif re.match(r'^\d+\.\d+', text):  # 1.1
-                    detected_level = 2
-                    node.numbering_pattern = 'decimal_nested'
-                elif re.match(r'^\d+\.', text):  # 1.
-                    detected_level = 1
-                    node.numbering_pattern = 'decimal'
-                elif re.match(r'^[一二三四五六七八九十]+、', text):  # 一、
-                    detected_level = 2
-                    node.numbering_pattern = 'cjk_kanji_list'
-                elif re.match(r'^（[一二三四五六七八九十\d]+）', text):  # （一）
-                    detected_level = 3
-                    node.numbering_pattern = 'cjk_parenthetical'
-            else:
-                # Original English pattern detection
-                if re.match(r'^\d+\.\d+\.\d+', text):  # 1.1.1
-                    detected_level = 3
-                    node.numbering_pattern = 'decimal_nested_deep'
-                elif re.match(r'^\d+\.\d+', text):  # 1.1
-                    detected_level = 2
-                    node.numbering_pattern = 'decimal_nested'
-                elif re.match(r'^\d+\.', text):  # 1.
-                    detected_level = 1
-                    node.numbering_pattern = 'decimal'
-                elif re.match(r'^[IVX]+\.', text):  # I.
-                    detected_level = 1
-                    node.numbering_pattern = 'roman'
-                elif re.match(r'^[A-Z]\.', text):  # A.
-                    detected_level = 2
-                    node.numbering_pattern = 'alpha'
-                elif re.search(r'^Chapter \d+', text, re.IGNORECASE):
-                    detected_level = 1
-                    node.numbering_pattern = 'chapter'
-                elif re.search(r'^Section \d+', text, re.IGNORECASE):
-                    detected_level = 2
-                    node.numbering_pattern = 'section'
+            # Enhanced CJK pattern detection, or the original English patterns
+            family = "cjk_numbering_level" if self.language in ['japanese', 'chinese'] else "numbering_level"
+            match = patterns.first(text, family)
+            if match is not None:
+                detected_level, node.numbering_pattern = match
             
             if detected_level:
                 node.level = detected_level
@@ -543,6 +441,7 @@ class HierarchyAssigner:
         # Fix common issues
         fixed_nodes = []
         prev_level = 0
+        patterns = get_pattern_engine(self.language)
         
         for i, node in enumerate(nodes):
             current_level = node.level
@@ -550,9 +449,9 @@ class HierarchyAssigner:
             # For CJK languages, be more lenient with level jumps if clear patterns exist
             if self.language in ['japanese', 'chinese']:
                 # Allow level jumps for clear chapter patterns
-                if re.search(r'^第[一二三四五六七八九十\d]+章', node.text):
+                if patterns.any(node.text, "cjk_chapter_marker"):
                     current_level = 1  # Force chapters to level 1
-                elif re.search(r'^第[一二三四五六七八九十\d]+節', node.text):
+                elif patterns.any(node.text, "cjk_section_marker"):
                     current_level = min(current_level, 2)  # Force sections to level 2 or higher
                 else:
                     # Ensure we don't skip levels (max jump of 1)
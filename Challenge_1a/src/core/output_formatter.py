@@ -74,6 +74,16 @@ class OutputFormatter:
         title = self._extract_simple_title(headings, document_info)
         
         # Convert headings to simple outline format - ONLY level, text, and page
+        outline = self.format_outline(headings)
+        
+        # Return ONLY title and outline - no metadata, no extra fields
+        return {
+            "title": title,
+            "outline": outline
+        }
+    
+    def format_outline(self, headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert headings to simple outline items with only level, text and page."""
         outline = []
         for heading in headings:
             text = heading.get("text", "").strip()
@@ -91,11 +101,7 @@ class OutputFormatter:
             
             outline.append(outline_item)
         
-        # Return ONLY title and outline - no metadata, no extra fields
-        return {
-            "title": title,
-            "outline": outline
-        }
+        return outline
     
     def format_results_full(self, headings: List[Dict[str, Any]], 
                            document_info: Dict[str, Any],
@@ -129,20 +135,12 @@ class OutputFormatter:
         """Extract simple document title for clean output."""
         
         # First try document metadata
-        if document_info.get("title"):
-            doc_title = document_info["title"].strip()
-            if doc_title and doc_title != "Untitled":
-                return doc_title
+        if self._has_document_title(document_info):
+            return document_info["title"].strip()
         
         # Try filename without extension
         if document_info.get("filename"):
-            filename = document_info["filename"]
-            # Remove extension and clean up
-            title = Path(filename).stem
-            # Remove common prefixes like "Microsoft Word - "
-            if title.startswith("Microsoft Word - "):
-                title = title[17:]
-            return title
+            return self.filename_title(document_info["filename"])
         
         # Try first heading as title
         if headings:
@@ -154,6 +152,23 @@ class OutputFormatter:
         # Fallback
         return "Untitled Document"
     
+    def _has_document_title(self, document_info: Dict[str, Any]) -> bool:
+        title = (document_info.get("title") or "").strip()
+        return bool(title) and title != "Untitled"
+    
+    def uses_filename_title(self, document_info: Dict[str, Any]) -> bool:
+        """True if the simple format's title will be made from the file name."""
+        return not self._has_document_title(document_info) and bool(document_info.get("filename"))
+    
+    def filename_title(self, filename: str) -> str:
+        """Simple-format title made from a file name."""
+        # Remove extension and clean up
+        title = Path(filename).stem
+        # Remove common prefixes like "Microsoft Word - "
+        if title.startswith("Microsoft Word - "):
+            title = title[17:]
+        return title
+    
     def _determine_heading_level(self, text: str, original_level: int) -> str:
         """Determine appropriate heading level based on content and context."""
         
@@ -2,37 +2,51 @@ import os
 import re  # ADD THIS MISSING IMPORT
 import time
 import logging
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple, Iterator
 import fitz  # PyMuPDF
-import pdfplumber
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from src.core.candidate_generator import CandidateGenerator
-from src.core.semantic_filter import SemanticFilter
 from src.core.hierarchy_assigner import HierarchyAssigner
 from src.core.output_formatter import OutputFormatter
 from src.utils.validation import validate_pdf, detect_language
 from src.utils.text_utils import clean_text, normalize_whitespace
+from src.utils.document_cache import DocumentCache
+from src.utils.word_index import normalize_tokens
+from src.utils import tracing
+from src.utils.result_cache import ResultCache
+from src.utils.deadline import Deadline
 from config.settings import (
     MAX_PROCESSING_TIME, MAX_FILE_SIZE_MB, 
-    OUTPUT_DIR, INCLUDE_DEBUG_INFO
+    OUTPUT_DIR, INCLUDE_DEBUG_INFO, DEADLINE_SEMANTIC_MIN_SECONDS
 )
 
 
 class PDFProcessor:
     """Main orchestrator for PDF heading extraction using hybrid approach with accessibility support."""
     
-    def __init__(self, language: str = 'auto', debug: bool = False):
+    def __init__(self, language: str = 'auto', debug: bool = False, embedding_model=None,
+                 page_workers: Optional[int] = None):
         self.language = language
+        self.requested_language = language  # self.language is replaced by the detected language
         self.debug = debug
         self.logger = logging.getLogger(__name__)
         
         # Initialize components
-        self.candidate_generator = CandidateGenerator(language=language, debug=debug)
-        self.semantic_filter = SemanticFilter(language=language, debug=debug) if not self._is_fast_mode() else None
+        self.candidate_generator = CandidateGenerator(language=language, debug=debug, page_workers=page_workers)
+        self.semantic_filter = None
+        if not self._is_fast_mode():
+            # Imported here: it pulls in torch and sentence-transformers, which fast mode never needs
+            from src.core.semantic_filter import SemanticFilter
+            self.semantic_filter = SemanticFilter(language=language, debug=debug, embedding_model=embedding_model)
         self.hierarchy_assigner = HierarchyAssigner(language=language, debug=debug)
         self.output_formatter = OutputFormatter(debug=debug)
+        self.result_cache = ResultCache() if self._is_result_cache_enabled() else None
+        self._stage_span = None  # open trace span of the current stage
+        # "fallback" or "filename" when the current document's title was made from its file name
+        self._title_from_name: Optional[str] = None
         
         # Processing statistics
         self.stats = {
@@ -45,7 +59,29 @@ class PDFProcessor:
     
     def process(self, pdf_path: str, timeout: Optional[int] = None, 
                 include_metadata: Optional[bool] = None) -> Dict[str, Any]:
-        """Main processing pipeline with timeout protection and optional metadata inclusion."""
+        """
+        Main processing pipeline with a processing deadline and optional metadata inclusion.
+        
+        When ``timeout`` (default MAX_PROCESSING_TIME) runs out, the pipeline stops
+        where it is and returns the best outline found so far, marked ``"partial": true``.
+        """
+        return self._process_source(DocumentCache(pdf_path), timeout, include_metadata)
+    
+    def process_bytes(self, data, name: str = "document.pdf", timeout: Optional[int] = None,
+                      include_metadata: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Process a PDF held in memory, without writing it to disk.
+        
+        ``data`` may be bytes, bytearray, memoryview, mmap, io.BytesIO or a binary
+        file object (memory-mapped when it is a real file). Every stage reads the
+        same buffer; ``name`` is only used as the reported file name.
+        """
+        return self._process_source(DocumentCache.from_buffer(data, name=name), timeout, include_metadata)
+    
+    def _process_source(self, document: DocumentCache, timeout: Optional[int] = None,
+                        include_metadata: Optional[bool] = None) -> Dict[str, Any]:
+        """Run the pipeline on an unopened document under a deadline, with result caching."""
+        pdf_path = document.pdf_path
         self.stats["start_time"] = time.time()
         timeout = timeout or MAX_PROCESSING_TIME
         
@@ -58,15 +94,18 @@ class PDFProcessor:
         else:
             self.logger.info(f"Starting PDF processing in simple mode: {pdf_path}")
         
+        # Identical bytes + identical configuration: skip the whole pipeline
+        cache_key = self._result_cache_key(document, include_metadata)
+        cached_result = self._get_cached_result(cache_key, document)
+        if cached_result is not None:
+            self.logger.info(f"Result cache hit for {pdf_path} ({self.stats['processing_time']:.3f}s)")
+            return cached_result
+        
+        # The deadline is checked cooperatively by the stages in this thread, so no
+        # work is left running in the background once it passes
+        deadline = Deadline(timeout)
         try:
-            # Use ThreadPoolExecutor for timeout control
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(self._process_internal, pdf_path, include_metadata)
-                result = future.result(timeout=timeout)
-                
-        except FutureTimeoutError:
-            self.logger.error(f"Processing timeout after {timeout}s")
-            raise TimeoutError(f"PDF processing exceeded {timeout} second limit")
+            result = self._process_internal(document, include_metadata, deadline)
         except Exception as e:
             self.logger.error(f"Processing failed: {str(e)}")
             raise
@@ -74,7 +113,16 @@ class PDFProcessor:
         self.stats["end_time"] = time.time()
         self.stats["processing_time"] = self.stats["end_time"] - self.stats["start_time"]
         
+        if deadline.partial:
+            # Partial results depend on machine load, so they are never cached
+            stages = ", ".join(cut["stage"] for cut in deadline.cuts)
+            self.logger.warning(f"Processing deadline of {timeout}s reached - returning partial result "
+                                f"after {self.stats['processing_time']:.2f}s (cut: {stages})")
+            return result
+        
         self.logger.info(f"Processing completed in {self.stats['processing_time']:.2f}s")
+        
+        self._cache_result(cache_key, result)
         return result
     
     def process_for_round1a(self, pdf_path: str) -> Dict[str, Any]:
@@ -85,21 +133,101 @@ class PDFProcessor:
         result = self.process(pdf_path, include_metadata=False)
         
         # Return only the clean outline format for Round 1A
-        return {
+        round1a_result = {
             "title": result.get("title", "Document"),
             "outline": result.get("outline", [])
         }
+        if result.get("partial"):
+            round1a_result["partial"] = True
+        return round1a_result
+    
+    def iter_headings(self, pdf_path: str,
+                      include_metadata: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream extraction results while the document is being parsed.
+        
+        Yields events:
+            {"type": "provisional", "page": n, "headings": [...]}  once per parsed page,
+                with outline items whose levels are provisional (page-local)
+            {"type": "final", "result": {...}}  last, the same result process() returns
+        
+        Parsed page data is released as soon as a page is done, so memory does not
+        grow with page count. No timeout is applied; the caller controls consumption.
+        """
+        if include_metadata is None:
+            include_metadata = self._should_include_metadata()
+        
+        self.stats["start_time"] = time.time()
+        self.logger.info(f"Starting streaming PDF processing: {pdf_path}")
+        
+        document = DocumentCache(pdf_path)
+        cache_key = self._result_cache_key(document, include_metadata)
+        cached_result = self._get_cached_result(cache_key, document)
+        if cached_result is not None:
+            self.logger.info(f"Result cache hit for {pdf_path}")
+            yield {"type": "final", "result": cached_result}
+            return
+        
+        with document, tracing.document(document.name) as trace_span:
+            try:
+                for event in self._iter_pipeline(pdf_path, document, include_metadata, streaming=True):
+                    if event["type"] == "final":
+                        self._cache_result(cache_key, event["result"])
+                    yield event
+            finally:
+                self._end_stage_span()
+            trace_span.set(streaming=True)
+        
+        self.stats["end_time"] = time.time()
+        self.stats["processing_time"] = self.stats["end_time"] - self.stats["start_time"]
+        self.logger.info(f"Streaming completed in {self.stats['processing_time']:.2f}s")
     
-    def _process_internal(self, pdf_path: str, include_metadata: bool = False) -> Dict[str, Any]:
+    def _process_internal(self, document: DocumentCache, include_metadata: bool = False,
+                          deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Internal processing pipeline with optional metadata and accessibility tagging."""
         
+        # Parse the PDF once; every stage reads pages from this shared cache
+        with document, tracing.document(document.name) as trace_span:
+            try:
+                result = self._process_document(document.pdf_path, document, include_metadata, deadline)
+            finally:
+                self._end_stage_span()
+            if result.get("partial"):
+                trace_span.set(partial=True)
+            return result
+    
+    def _process_document(self, pdf_path: str, document: DocumentCache,
+                          include_metadata: bool = False,
+                          deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Run all pipeline stages against an already opened document."""
+        for event in self._iter_pipeline(pdf_path, document, include_metadata, deadline=deadline):
+            if event["type"] == "final":
+                return event["result"]
+    
+    def _iter_pipeline(self, pdf_path: str, document: DocumentCache,
+                       include_metadata: bool = False,
+                       streaming: bool = False,
+                       deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Pipeline stages as a generator; provisional events are only produced when streaming.
+        
+        Under a deadline, TOC validation and candidate generation stop early, and
+        semantic filtering is skipped or cut short; hierarchy assignment and output
+        formatting always run on what was gathered, so a result is always produced.
+        """
+        if deadline is None:
+            deadline = Deadline.unlimited()
+        self._title_from_name = None
+        
         # Stage 1: Validate and analyze PDF
         self._add_stage("pdf_validation")
-        document_info = self._analyze_pdf(pdf_path)
+        document_info = self._analyze_pdf(pdf_path, document)
+        self._stage_span.set(pages=document_info.get("total_pages", 0), file_size=document_info["file_size"])
         
         # Stage 2: Check for structured PDF tags (Adobe approach)
         self._add_stage("structure_detection")
-        structured_headings = self._extract_structured_headings(pdf_path)
+        structured_headings = self._extract_structured_headings(document, deadline)
+        self._stage_span.set(toc_headings=len(structured_headings or []))
         
         if structured_headings:
             self.logger.info("Found structured PDF tags, using native extraction")
@@ -114,11 +242,19 @@ class PDFProcessor:
         else:
             # Stage 3: Generate candidates using heuristics
             self._add_stage("candidate_generation")
-            candidates = self.candidate_generator.generate_candidates(pdf_path)
+            if streaming:
+                candidates = yield from self._iter_provisional_headings(pdf_path, document)
+            else:
+                candidates = self.candidate_generator.generate_candidates(pdf_path, document=document,
+                                                                          deadline=deadline)
+            
+            self._stage_span.set(candidates=len(candidates))
             
             if not candidates:
                 self.logger.warning("No heading candidates found")
-                return self._create_empty_result(document_info, include_metadata)
+                yield {"type": "final",
+                       "result": self._mark_partial(self._create_empty_result(document_info, include_metadata), deadline)}
+                return
             
             # NEW: Smart title extraction that compares PDF metadata with first heading
             self.logger.info("=== TITLE EXTRACTION FROM CANDIDATES ===")
@@ -132,18 +268,25 @@ class PDFProcessor:
             self.logger.info(f"Removed {removed_count} candidate(s) matching selected title from heading list")
             
             # Stage 4: Apply semantic filtering (if enabled and not in fast mode)
-            if self.semantic_filter and not self._is_fast_mode():
+            if self.semantic_filter and not self._is_fast_mode() and not deadline.allows(DEADLINE_SEMANTIC_MIN_SECONDS):
+                self.logger.warning(f"Skipping semantic filtering: {deadline.remaining():.1f}s left before the deadline")
+                deadline.cut("semantic_filtering", "skipped")
+                filtered_candidates = other_candidates
+            elif self.semantic_filter and not self._is_fast_mode():
                 self._add_stage("semantic_filtering")
                     
                 filtered_candidates = self.semantic_filter.filter_candidates(
-                    other_candidates, pdf_path
+                    other_candidates, pdf_path, document=document, deadline=deadline
                 )
+                self._stage_span.set(candidates_in=len(other_candidates),
+                                     candidates_out=len(filtered_candidates))
             else:
                 filtered_candidates = other_candidates
             
             # Stage 5: Assign hierarchy levels
             self._add_stage("hierarchy_assignment")
             headings = self.hierarchy_assigner.assign_hierarchy(filtered_candidates)
+            self._stage_span.set(candidates_in=len(filtered_candidates), headings=len(headings))
             
             # Stage 6: Generate hierarchy tree (only if metadata is requested)
             if include_metadata:
@@ -167,6 +310,7 @@ class PDFProcessor:
             }
         
         # Format final result with optional metadata
+        self._note_filename_title(document_info, include_metadata)
         result = self.output_formatter.format_results(
             headings=headings,
             document_info={**document_info, **self.stats},
@@ -185,7 +329,37 @@ class PDFProcessor:
         elif not include_metadata:
             self.logger.info(f"Simple format generated with {len(headings)} headings")
         
+        yield {"type": "final", "result": self._mark_partial(result, deadline)}
+    
+    def _mark_partial(self, result: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+        """Flag a result built after stages were cut short by the deadline."""
+        if deadline.partial:
+            result["partial"] = True
+            result["partial_stages"] = [cut["stage"] for cut in deadline.cuts]
         return result
+    
+    def _iter_provisional_headings(self, pdf_path: str, document: DocumentCache):
+        """Yield provisional per-page headings; return the final candidate list."""
+        
+        # Page-local levels come from a separate assigner so the main assigner's
+        # language detection still sees the final candidate list
+        provisional_assigner = HierarchyAssigner(language=self.language, debug=self.debug)
+        
+        page_stream = self.candidate_generator.iter_page_candidates(pdf_path, document=document)
+        while True:
+            try:
+                page, page_candidates = next(page_stream)
+            except StopIteration as stop:
+                return stop.value
+            
+            page_headings = provisional_assigner.assign_hierarchy(page_candidates) if page_candidates else []
+            page_headings.sort(key=lambda h: h["bbox"][1])  # reading order within the page
+            
+            yield {
+                "type": "provisional",
+                "page": page,
+                "headings": self.output_formatter.format_outline(page_headings)
+            }
 
     def _extract_smart_title_from_candidates(self, candidates: List, document_info: Dict[str, Any]) -> str:
         """
@@ -461,6 +635,7 @@ class PDFProcessor:
         self.logger.info(f"Original filename: '{filename}'")
         
         if filename:
+            self._title_from_name = "fallback"
             # Clean up filename
             title = Path(filename).stem
             self.logger.info(f"Filename stem: '{title}'")
@@ -483,14 +658,14 @@ class PDFProcessor:
         self.logger.info("No filename available, using default: 'Untitled Document'")
         return "Untitled Document"
     
-    def _analyze_pdf(self, pdf_path: str) -> Dict[str, Any]:
+    def _analyze_pdf(self, pdf_path: str, document: DocumentCache) -> Dict[str, Any]:
         """Analyze PDF document and extract metadata."""
         
         # Basic validation
-        if not validate_pdf(pdf_path):
+        if not validate_pdf(pdf_path, document=document):
             raise ValueError(f"Invalid PDF file: {pdf_path}")
         
-        file_size = os.path.getsize(pdf_path)
+        file_size = document.size_bytes
         if file_size > MAX_FILE_SIZE_MB * 1024 * 1024:
             self.logger.warning(f"Large file size: {file_size / (1024*1024):.1f}MB")
         
@@ -503,30 +678,29 @@ class PDFProcessor:
         
         # Extract PDF metadata using PyMuPDF
         try:
-            with fitz.open(pdf_path) as doc:
-                metadata = doc.metadata
-                document_info.update({
-                    "total_pages": len(doc),
-                    "title": metadata.get("title", ""),
-                    "author": metadata.get("author", ""),
-                    "subject": metadata.get("subject", ""),
-                    "creator": metadata.get("creator", ""),
-                    "creation_date": metadata.get("creationDate", ""),
-                    "modification_date": metadata.get("modDate", ""),
-                })
-                
-                # Detect language if set to auto
-                if self.language == 'auto':
-                    detected_lang = self._detect_document_language(doc)
-                    document_info["language"] = detected_lang
-                    self.language = detected_lang
-                else:
-                    document_info["language"] = self.language
-                
-                # Analyze document structure (only if metadata will be used)
-                if self._should_include_metadata():
-                    structure_info = self._analyze_document_structure(doc)
-                    document_info.update(structure_info)
+            metadata = document.metadata
+            document_info.update({
+                "total_pages": document.page_count,
+                "title": metadata.get("title", ""),
+                "author": metadata.get("author", ""),
+                "subject": metadata.get("subject", ""),
+                "creator": metadata.get("creator", ""),
+                "creation_date": metadata.get("creationDate", ""),
+                "modification_date": metadata.get("modDate", ""),
+            })
+            
+            # Detect language if set to auto
+            if self.language == 'auto':
+                detected_lang = self._detect_document_language(document)
+                document_info["language"] = detected_lang
+                self.language = detected_lang
+            else:
+                document_info["language"] = self.language
+            
+            # Analyze document structure (only if metadata will be used)
+            if self._should_include_metadata():
+                structure_info = self._analyze_document_structure(document)
+                document_info.update(structure_info)
                 
         except Exception as e:
             self.logger.warning(f"Failed to extract PDF metadata: {e}")
@@ -537,125 +711,110 @@ class PDFProcessor:
         
         return document_info
     
-    def _extract_structured_headings(self, pdf_path: str) -> Optional[List[Dict[str, Any]]]:
+    def _extract_structured_headings(self, document: DocumentCache,
+                                     deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Extract structured headings from PDF TOC/outline with validation against visible content.
         This method now validates that TOC entries actually exist as visible text in the document.
+        If the deadline runs out, entries of the pages not yet checked are left out.
         """
         try:
-            with fitz.open(pdf_path) as doc:
-                if not doc.is_pdf or not hasattr(doc, 'get_toc'):
-                    return None
+            toc = document.get_toc()
+            if not toc:
+                return None
+            
+            self.logger.info(f"Found structured TOC with {len(toc)} entries - validating against visible content")
+            
+            # Group entries by the page they reference: only those pages are indexed,
+            # and all entries of a page are matched against one word index
+            entries_by_page = defaultdict(list)
+            for i, (level, title, page_num) in enumerate(toc):
+                title_clean = clean_text(title).strip()
                 
-                toc = doc.get_toc()
-                if not toc:
-                    return None
+                # Skip empty or very short titles
+                if not title_clean or len(title_clean) < 2:
+                    self.logger.debug(f"Skipping empty/short TOC entry: '{title}'")
+                    continue
                 
-                self.logger.info(f"Found structured TOC with {len(toc)} entries - validating against visible content")
+                entries_by_page[page_num].append((i, level, title_clean))
+            
+            structured_headings = []
+            validated_count = 0
+            
+            pending_pages = list(entries_by_page.items())
+            for position, (page_num, entries) in enumerate(pending_pages):
+                if deadline is not None and deadline.exhausted():
+                    unchecked = sum(len(page_entries) for _, page_entries in pending_pages[position:])
+                    self.logger.warning(f"Deadline reached during TOC validation - {unchecked} entries left unchecked")
+                    deadline.cut("structure_detection", f"{unchecked} TOC entries not validated")
+                    break
                 
-                # Extract all visible text from document for validation
-                visible_text_by_page = {}
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    page_text = page.get_text().strip()
-                    visible_text_by_page[page_num + 1] = page_text.lower()
+                if not 1 <= page_num <= document.page_count:
+                    self.logger.debug(f"{len(entries)} TOC entries point to missing page {page_num} - skipping")
+                    continue
                 
-                structured_headings = []
-                validated_count = 0
+                try:
+                    word_index = document.word_index(page_num - 1)
+                except Exception as e:
+                    self.logger.warning(f"Failed to index page {page_num} for TOC validation: {e}")
+                    continue
                 
-                for i, (level, title, page_num) in enumerate(toc):
-                    try:
-                        title_clean = clean_text(title).strip()
-                        
-                        # Skip empty or very short titles
-                        if not title_clean or len(title_clean) < 2:
-                            self.logger.debug(f"Skipping empty/short TOC entry: '{title}'")
-                            continue
-                        
-                        # Validate that this heading actually exists in the visible content
-                        page_text = visible_text_by_page.get(page_num, "")
-                        title_variations = [
-                            title_clean.lower(),
-                            title_clean.lower().replace(' ', ''),  # Remove spaces
-                            title_clean.lower().replace('-', ' '),  # Replace hyphens
-                            title_clean.lower().replace('_', ' '),  # Replace underscores
-                        ]
-                        
-                        # Check if any variation of the title exists in the page text
-                        found_in_visible_text = any(variation in page_text for variation in title_variations)
-                        
-                        if not found_in_visible_text:
-                            self.logger.debug(f"TOC entry '{title_clean}' not found in visible text on page {page_num} - skipping")
-                            continue
-                        
-                        # Additional validation: try to find the text location on the page
-                        try:
-                            page = doc.load_page(page_num - 1)
-                            text_instances = page.search_for(title_clean)
-                            
-                            # If we can't find it with exact search, try partial matches
-                            if not text_instances:
-                                # Try searching for significant words (longer than 3 chars)
-                                words = [w for w in title_clean.split() if len(w) > 3]
-                                if words:
-                                    # Search for the longest word
-                                    longest_word = max(words, key=len)
-                                    text_instances = page.search_for(longest_word)
-                            
-                            if text_instances:
-                                bbox = text_instances[0]
-                            else:
-                                # If still not found, this might be a phantom TOC entry
-                                self.logger.debug(f"Could not locate TOC entry '{title_clean}' on page - might be phantom entry")
-                                bbox = [0, 0, 100, 20]  # Default bbox, but mark with low confidence
-                        except Exception as e:
-                            self.logger.debug(f"Error locating TOC entry '{title_clean}': {e}")
-                            bbox = [0, 0, 100, 20]
-                        
-                        heading = {
-                            "text": title_clean,
-                            "level": max(1, min(level, 6)),
-                            "page": page_num,
-                            "bbox": list(bbox),
-                            "font_info": {
-                                "size": 14,
-                                "weight": "bold",
-                                "family": "unknown"
-                            },
-                            "confidence": 0.9 if found_in_visible_text else 0.3,  # Lower confidence for unverified entries
-                            "features": {
-                                "source": "pdf_structure",
-                                "toc_index": i,
-                                "validated_against_content": found_in_visible_text
-                            }
-                        }
-                        
-                        structured_headings.append(heading)
-                        validated_count += 1
-                        
-                    except Exception as e:
-                        self.logger.warning(f"Failed to process TOC entry '{title}': {e}")
+                for i, level, title_clean in entries:
+                    # Validate that this heading actually exists in the visible content
+                    title_tokens = normalize_tokens(title_clean)
+                    if not word_index.contains(title_tokens):
+                        self.logger.debug(f"TOC entry '{title_clean}' not found in visible text on page {page_num} - skipping")
                         continue
-                
-                if structured_headings:
-                    self.logger.info(f"Validated {validated_count}/{len(toc)} TOC entries against visible content")
-                    return structured_headings
-                else:
-                    self.logger.info("No valid TOC entries found after content validation - falling back to text analysis")
-                    return None
                     
+                    # Locate the text on the page (full title, else its longest significant word)
+                    bbox = word_index.locate(title_tokens)
+                    if bbox is None:
+                        # Present only inside longer words - might be a phantom TOC entry
+                        self.logger.debug(f"Could not locate TOC entry '{title_clean}' on page - might be phantom entry")
+                        bbox = [0, 0, 100, 20]
+                    
+                    heading = {
+                        "text": title_clean,
+                        "level": max(1, min(level, 6)),
+                        "page": page_num,
+                        "bbox": list(bbox),
+                        "font_info": {
+                            "size": 14,
+                            "weight": "bold",
+                            "family": "unknown"
+                        },
+                        "confidence": 0.9,
+                        "features": {
+                            "source": "pdf_structure",
+                            "toc_index": i,
+                            "validated_against_content": True
+                        }
+                    }
+                    
+                    structured_headings.append(heading)
+                    validated_count += 1
+            
+            # Back to TOC order
+            structured_headings.sort(key=lambda h: h["features"]["toc_index"])
+            
+            if structured_headings:
+                self.logger.info(f"Validated {validated_count}/{len(toc)} TOC entries against visible content")
+                return structured_headings
+            else:
+                self.logger.info("No valid TOC entries found after content validation - falling back to text analysis")
+                return None
+                
         except Exception as e:
             self.logger.debug(f"Structured extraction failed: {e}")
             return None
     
-    def _detect_document_language(self, doc: fitz.Document) -> str:
+    def _detect_document_language(self, document: DocumentCache) -> str:
         """Detect document language from content."""
         
         # Sample text from first few pages
         sample_text = ""
-        for page_num in range(min(3, len(doc))):
-            page = doc.load_page(page_num)
-            page_text = page.get_text()
+        for page_num in range(min(3, document.page_count)):
+            page_text = document.page_text(page_num)
             sample_text += page_text[:1000]  # First 1000 chars per page
         
         if len(sample_text.strip()) < 100:
@@ -667,7 +826,7 @@ class PDFProcessor:
         
         return detected_language
     
-    def _analyze_document_structure(self, doc: fitz.Document) -> Dict[str, Any]:
+    def _analyze_document_structure(self, document: DocumentCache) -> Dict[str, Any]:
         """Analyze document structure and layout characteristics."""
         
         structure_info = {
@@ -686,15 +845,15 @@ class PDFProcessor:
             has_images = False
             
             # Analyze first 3 pages for structure
-            for page_num in range(min(3, len(doc))):
-                page = doc.load_page(page_num)
+            for page_num in range(min(3, document.page_count)):
+                page = document.page(page_num)
                 
                 # Check for images
                 if page.get_images():
                     has_images = True
                 
                 # Analyze text blocks
-                blocks = page.get_text("dict")["blocks"]
+                blocks = document.page_blocks(page_num)
                 for block in blocks:
                     if "lines" not in block:
                         continue
@@ -710,8 +869,8 @@ class PDFProcessor:
                             bbox = line["bbox"]
                             line_heights.append(bbox[3] - bbox[1])
                 
-                # Check for multi-column layout
-                if self._detect_multi_column_layout(page):
+                # Check for multi-column layout (gutters found by the page's line geometry index)
+                if document.span_table(page_num).geometry().column_count > 1:
                     structure_info["is_multi_column"] = True
             
             # Compile font analysis
@@ -745,37 +904,6 @@ class PDFProcessor:
         
         return structure_info
     
-    def _detect_multi_column_layout(self, page: fitz.Page) -> bool:
-        """Detect if page has multi-column layout."""
-        
-        try:
-            blocks = page.get_text("dict")["blocks"]
-            text_blocks = [b for b in blocks if "lines" in b]
-            
-            if len(text_blocks) < 4:  # Need sufficient blocks
-                return False
-            
-            # Group blocks by horizontal position
-            left_blocks = []
-            right_blocks = []
-            page_width = page.rect.width
-            middle = page_width / 2
-            
-            for block in text_blocks:
-                bbox = block["bbox"]
-                block_center = (bbox[0] + bbox[2]) / 2
-                
-                if block_center < middle * 0.8:  # Left side
-                    left_blocks.append(block)
-                elif block_center > middle * 1.2:  # Right side
-                    right_blocks.append(block)
-            
-            # Multi-column if we have blocks on both sides
-            return len(left_blocks) >= 2 and len(right_blocks) >= 2
-            
-        except Exception:
-            return False
-    
     def _build_simple_tree(self, headings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Build simple hierarchy tree for structured headings."""
         
@@ -814,6 +942,7 @@ class PDFProcessor:
         
         self.stats["warnings"].append("No headings detected in document")
         
+        self._note_filename_title(document_info, include_metadata)
         return self.output_formatter.format_results(
             headings=[],
             document_info={**document_info, **self.stats},
@@ -851,6 +980,17 @@ class PDFProcessor:
         
         self.stats["processing_stages"].append(stage_info)
         self.logger.debug(f"Starting stage: {stage_name}")
+        
+        # Stages run back to back: each one's trace span ends where the next begins
+        self._end_stage_span()
+        self._stage_span = tracing.span(stage_name, cat="stage")
+        self._stage_span.__enter__()
+    
+    def _end_stage_span(self) -> None:
+        """Close the trace span of the current stage, if any."""
+        if self._stage_span is not None:
+            self._stage_span.__exit__(None, None, None)
+            self._stage_span = None
     
     def _is_fast_mode(self) -> bool:
         """Check if running in fast mode (skip semantic filtering)."""
@@ -860,6 +1000,85 @@ class PDFProcessor:
         """Check if metadata should be included based on environment variable."""
         return os.getenv("INCLUDE_METADATA", "false").lower() == "true"
     
+    def _is_result_cache_enabled(self) -> bool:
+        """Check if the persistent result cache is enabled based on environment variable."""
+        return os.getenv("RESULT_CACHE", "true").lower() == "true"
+    
+    def _result_cache_key(self, document: DocumentCache, include_metadata: bool) -> Optional[str]:
+        """Result cache key for this document and processor configuration (None if disabled)."""
+        if self.result_cache is None:
+            return None
+        
+        flags = {
+            "language": self.requested_language,
+            "semantic_filtering": bool(self.semantic_filter) and not self._is_fast_mode(),
+            "include_metadata": include_metadata
+        }
+        if document.is_in_memory:
+            return self.result_cache.key_for_buffer(document.data, flags)
+        return self.result_cache.key_for_file(document.pdf_path, flags)
+    
+    def _note_filename_title(self, document_info: Dict[str, Any], include_metadata: bool) -> None:
+        """Record that the simple format will title the result with the file name."""
+        if not include_metadata and self._title_from_name is None and \
+                self.output_formatter.uses_filename_title(document_info):
+            self._title_from_name = "filename"
+    
+    def _cache_result(self, cache_key: Optional[str], result: Dict[str, Any]) -> None:
+        """
+        Store a finished result under its content key.
+        
+        The key ignores the file name, so a renamed copy is a hit; the entry
+        records whether the title was made from the name so a hit can redo it.
+        """
+        if cache_key:
+            self.result_cache.put(cache_key, {"result": result, "title_from_name": self._title_from_name})
+    
+    def _get_cached_result(self, cache_key: Optional[str], document: DocumentCache) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for this document, or None on a miss.
+        
+        The fields that depend on the file name or on this run (file name,
+        name-derived title, processing time, timestamps, processing stats) are
+        set for the current document and request, not taken from the stored entry.
+        """
+        entry = self.result_cache.get(cache_key) if cache_key else None
+        if entry is None:
+            return None
+        document.close()
+        self.stats["end_time"] = time.time()
+        self.stats["processing_time"] = self.stats["end_time"] - self.stats["start_time"]
+        
+        result = entry["result"]
+        now = datetime.now().isoformat()
+        name = document.name
+        title_from_name = entry.get("title_from_name")
+        if title_from_name == "fallback":
+            title = self._generate_fallback_title({"filename": name})
+        elif title_from_name == "filename":
+            title = self.output_formatter.filename_title(name)
+        if title_from_name and "title" in result:
+            result["title"] = title
+        
+        document_info = result.get("document_info")
+        if document_info is not None:
+            document_info["filename"] = name
+            if title_from_name == "fallback" and "title" in document_info:
+                document_info["title"] = title
+            document_info["processing_time"] = round(self.stats["processing_time"], 3)
+            document_info["timestamp"] = now
+        if "metadata" in result:
+            result["metadata"]["extraction_date"] = now
+        if "processing_stats" in result:
+            result["processing_stats"] = {
+                **self.stats,
+                "hierarchy_stats": result["processing_stats"].get("hierarchy_stats", {}),
+                "result_cache_hit": True
+            }
+        if "debug_info" in result:
+            result["debug_info"]["processing_stages"] = self.stats["processing_stages"]
+        return result
+    
     def save_output(self, result: Dict[str, Any], output_path: Optional[str] = None, 
            formats: Optional[List[str]] = None, 
            auto_filename: bool = True) -> Dict[str, str]:
@@ -997,10 +1216,18 @@ class PDFProcessor:
 
     def process_batch(self, pdf_paths: List[str], 
                      output_dir: Optional[str] = None,
-                     max_workers: int = 2,
+                     max_workers: Optional[int] = None,
                      include_accessibility: bool = False,
-                     include_metadata: bool = False) -> Dict[str, Any]:
-        """Process multiple PDFs in batch mode with optional metadata and accessibility support."""
+                     include_metadata: bool = False,
+                     round1a: bool = False,
+                     cpu_split: Optional[str] = None) -> Dict[str, Any]:
+        """Process multiple PDFs in batch mode with optional metadata and accessibility support.
+        
+        Documents are processed by a BatchEngine process pool; each job gets its own
+        PDFProcessor, so this processor's stats and language are left untouched.
+        ``cpu_split`` ("auto" or "WORKERS:THREADS") overrides the planned core split.
+        """
+        from src.core.batch_engine import BatchEngine
         
         output_dir = Path(output_dir) if output_dir else OUTPUT_DIR
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -1014,31 +1241,37 @@ class PDFProcessor:
         if include_accessibility:
             self.logger.info("Accessibility XML files will be generated")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all jobs
-            future_to_path = {
-                executor.submit(self.process, pdf_path, None, include_metadata): pdf_path 
-                for pdf_path in pdf_paths
-            }
+        engine = BatchEngine(
+            workers=max_workers,
+            language=self.requested_language,
+            debug=self.debug,
+            include_metadata=include_metadata,
+            round1a=round1a,
+            embedding_model=self.semantic_filter.embedding_model if self.semantic_filter else None,
+            cpu_split=cpu_split
+        )
+        
+        for job in engine.iter_results(pdf_paths):
+            pdf_path = job.pdf_path
+            if job.error is not None:
+                self.logger.error(f"Failed to process {pdf_path}: {job.error}")
+                failed[pdf_path] = job.error
+                continue
             
-            # Collect results
-            for future in future_to_path:
-                pdf_path = future_to_path[future]
-                try:
-                    result = future.result(timeout=MAX_PROCESSING_TIME)
-                    results[pdf_path] = result
-                    
-                    # Save individual result
-                    formats = ["json"]
-                    if include_accessibility:
-                        formats.append("pdf_ua_xml")
-                    
-                    output_file = output_dir / f"{Path(pdf_path).stem}_headings"
-                    self.save_output_to_custom_path(result, output_file, formats)
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to process {pdf_path}: {e}")
-                    failed[pdf_path] = str(e)
+            try:
+                results[pdf_path] = job.result
+                
+                # Save individual result
+                formats = ["json"]
+                if include_accessibility:
+                    formats.append("pdf_ua_xml")
+                
+                output_file = output_dir / f"{Path(pdf_path).stem}_headings.json"
+                self.save_output_to_custom_path(job.result, output_file, formats)
+                
+            except Exception as e:
+                self.logger.error(f"Failed to save results for {pdf_path}: {e}")
+                failed[pdf_path] = str(e)
         
         # Create batch summary with accessibility stats
         accessibility_summary = {}
@@ -1063,12 +1296,13 @@ class PDFProcessor:
             "total_files": len(pdf_paths),
             "successful": len(results),
             "failed": len(failed),
-            "success_rate": len(results) / len(pdf_paths) * 100,
+            "success_rate": len(results) / len(pdf_paths) * 100 if pdf_paths else 0.0,
             "failed_files": failed,
             "output_directory": str(output_dir),
             "metadata_included": include_metadata,
             "accessibility_included": include_accessibility,
-            "accessibility_summary": accessibility_summary
+            "accessibility_summary": accessibility_summary,
+            "cpu_split": engine.last_split.to_dict() if engine.last_split else None
         }
         
         # Save batch summary
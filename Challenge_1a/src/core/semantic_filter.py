@@ -3,57 +3,35 @@ import re
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import fitz  # PyMuPDF
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from collections import defaultdict
 
 from config.settings import (
     EMBEDDING_MODEL, SEMANTIC_SIMILARITY_THRESHOLD, 
-    CONTEXT_WINDOW, MAX_PROCESSING_TIME
+    CONTEXT_WINDOW, MAX_PROCESSING_TIME, BATCH_SIZE,
+    DEADLINE_SEMANTIC_MIN_SECONDS, DEADLINE_MODEL_LOAD_SECONDS
 )
 from config.cultural_patterns import CULTURAL_PATTERNS
 from src.utils.text_utils import clean_text, extract_sentences
 from src.models.embedding_model import EmbeddingModel
-
-#patch start
-import nltk
-from nltk.data import find
-
-#print(">>> Checking nltk punkt availability...")
-try:
-    find('tokenizers/punkt/english.pickle')
-    #print(">>> punkt found.")
-except LookupError:
-    #print(">>> punkt not found, downloading...")
-    nltk.download('punkt', quiet=True)
-    #print(">>> punkt downloaded.")
-
-# Clean, safe monkey-patch
-_old_find = nltk.data.find
-
-def patched_find(resource_name, *args, **kwargs):
-    if 'punkt_tab' in resource_name:
-        #print(f"⚠️ Suppressing missing resource '{resource_name}', substituting with 'tokenizers/punkt/english.pickle'")
-        return _old_find('tokenizers/punkt/english.pickle', *args, **kwargs)
-    return _old_find(resource_name, *args, **kwargs)
-
-nltk.data.find = patched_find
-#print(">>> Applied safe punkt_tab monkey patch.")
-
-#patch end
+from src.utils.document_cache import DocumentCache
+from src.utils.deadline import Deadline
+from src.utils import tracing
 
 
 class SemanticFilter:
     """Smart semantic filtering using embeddings to verify heading candidates with lazy loading."""
     
-    def __init__(self, language: str = 'auto', debug: bool = False):
+    def __init__(self, language: str = 'auto', debug: bool = False,
+                 embedding_model: Optional[EmbeddingModel] = None):
         self.language = language
         self.debug = debug
         self.logger = logging.getLogger(__name__)
         
         # NEW: Use enhanced EmbeddingModel with lazy loading instead of direct SentenceTransformer
-        self.embedding_model = None
-        self._load_embedding_model()
+        # (an already loaded model can be injected, e.g. one shared by batch workers)
+        self.embedding_model = embedding_model
+        if self.embedding_model is None:
+            self._load_embedding_model()
         
         # Semantic patterns and thresholds
         self.similarity_threshold = SEMANTIC_SIMILARITY_THRESHOLD
@@ -122,24 +100,55 @@ class SemanticFilter:
         
         return patterns
     
-    def filter_candidates(self, candidates: List, pdf_path: str) -> List:
-        """Filter heading candidates using semantic analysis with lazy loading."""
+    def filter_candidates(self, candidates: List, pdf_path: str,
+                          document: Optional[DocumentCache] = None,
+                          deadline: Optional[Deadline] = None) -> List:
+        """Filter heading candidates using semantic analysis with lazy loading.
+        
+        If the deadline runs out, the remaining candidates are kept as the
+        heuristic stage scored them. Filtering is skipped altogether when too
+        little time is left to load the model and embed the page contexts.
+        """
         if not self.embedding_model or not candidates:
             self.logger.warning("Semantic filtering disabled - model not loaded or no candidates")
             return candidates
         
+        if not self._has_time_for_model_work(deadline):
+            return candidates
+        
         self.logger.info(f"Applying semantic filtering to {len(candidates)} candidates")
         
         # Extract document context
-        document_context = self._extract_document_context(pdf_path)
+        with tracing.span("document_context", cat="semantic"):
+            document_context = self._extract_document_context(pdf_path, document)
         
         # Apply semantic filters
         filtered_candidates = []
-        
-        for candidate in candidates:
+        context_embeddings = None
+        context_similarities: List[float] = []
+        
+        for index, candidate in enumerate(candidates):
+            if deadline is not None and deadline.exhausted():
+                unfiltered = len(candidates) - index
+                self.logger.warning(f"Deadline reached - keeping {unfiltered} candidates without semantic filtering")
+                deadline.cut("semantic_filtering", f"{unfiltered} candidates not filtered")
+                filtered_candidates.extend(candidates[index:])
+                break
+            
+            # Context similarity is computed for BATCH_SIZE candidates at a time
+            if index == len(context_similarities):
+                if context_embeddings is None:
+                    if not self._has_time_for_model_work(deadline):
+                        filtered_candidates.extend(candidates[index:])
+                        break
+                    context_embeddings = self._encode_page_contexts(document_context)
+                context_similarities.extend(self._calculate_context_similarities(
+                    candidates[index:index + BATCH_SIZE], context_embeddings
+                ))
+            
             # Calculate semantic scores
             semantic_scores = self._calculate_semantic_scores(
-                candidate, document_context, pdf_path
+                candidate, document_context, context_similarities[index]
             )
             
             # Apply filtering decision
@@ -157,8 +166,28 @@ class SemanticFilter:
         self.logger.info(f"Semantic filtering: {len(candidates)} -> {len(filtered_candidates)} candidates")
         return filtered_candidates
     
-    def _extract_document_context(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract document context for semantic analysis."""
+    def _has_time_for_model_work(self, deadline: Optional[Deadline]) -> bool:
+        """Check the deadline before the first model call (model load and context encoding).
+        
+        Records a cut and returns False when the expected time no longer fits.
+        """
+        if deadline is None:
+            return True
+        
+        needed = DEADLINE_SEMANTIC_MIN_SECONDS
+        if not self.embedding_model.is_model_loaded():
+            needed += DEADLINE_MODEL_LOAD_SECONDS
+        if deadline.allows(needed):
+            return True
+        
+        self.logger.warning(f"Skipping semantic filtering: {deadline.remaining():.1f}s left before the deadline, "
+                            f"about {needed:.1f}s needed")
+        deadline.cut("semantic_filtering", "skipped")
+        return False
+    
+    def _extract_document_context(self, pdf_path: str,
+                                  document: Optional[DocumentCache] = None) -> Dict[str, Any]:
+        """Extract document context for semantic analysis (reusing a shared DocumentCache if given)."""
         context = {
             "all_text": "",
             "paragraphs": [],
@@ -168,35 +197,40 @@ class SemanticFilter:
             "page_contexts": {}
         }
         
+        owns_document = document is None
+        if owns_document:
+            document = DocumentCache(pdf_path)
+        
         try:
-            with fitz.open(pdf_path) as doc:
-                all_text = []
+            all_text = []
+            
+            for page_num in range(min(document.page_count, 10)):  # Analyze first 10 pages
+                page_text = document.page_text(page_num)
                 
-                for page_num in range(min(len(doc), 10)):  # Analyze first 10 pages
-                    page = doc.load_page(page_num)
-                    page_text = page.get_text()
+                if page_text.strip():
+                    all_text.append(page_text)
                     
-                    if page_text.strip():
-                        all_text.append(page_text)
-                        
-                        # Extract paragraphs and sentences
-                        paragraphs = self._extract_paragraphs(page_text)
-                        sentences = extract_sentences(page_text)
-                        
-                        context["paragraphs"].extend(paragraphs)
-                        context["sentences"].extend(sentences)
-                        context["page_contexts"][page_num + 1] = {
-                            "text": page_text,
-                            "paragraphs": paragraphs,
-                            "sentences": sentences
-                        }
-                
-                context["all_text"] = "\n".join(all_text)
-                context["document_type"] = self._detect_document_type(context["all_text"])
-                context["key_terms"] = self._extract_key_terms(context["all_text"])
-                
+                    # Extract paragraphs and sentences
+                    paragraphs = self._extract_paragraphs(page_text)
+                    sentences = extract_sentences(page_text)
+                    
+                    context["paragraphs"].extend(paragraphs)
+                    context["sentences"].extend(sentences)
+                    context["page_contexts"][page_num + 1] = {
+                        "text": page_text,
+                        "paragraphs": paragraphs,
+                        "sentences": sentences
+                    }
+            
+            context["all_text"] = "\n".join(all_text)
+            context["document_type"] = self._detect_document_type(context["all_text"])
+            context["key_terms"] = self._extract_key_terms(context["all_text"])
+            
         except Exception as e:
             self.logger.warning(f"Failed to extract document context: {e}")
+        finally:
+            if owns_document:
+                document.close()
         
         return context
     
@@ -289,16 +323,14 @@ class SemanticFilter:
         return key_terms
     
     def _calculate_semantic_scores(self, candidate, document_context: Dict[str, Any], 
-                                  pdf_path: str) -> Dict[str, float]:
+                                  context_similarity: float) -> Dict[str, float]:
         """Calculate various semantic scores for a candidate."""
         scores = {}
         
         candidate_text = candidate.text.strip()
         
-        # 1. Context similarity score
-        scores['context_similarity'] = self._calculate_context_similarity(
-            candidate, document_context, pdf_path
-        )
+        # 1. Context similarity score (batched, see _calculate_context_similarities)
+        scores['context_similarity'] = context_similarity
         
         # 2. Heading pattern score
         scores['pattern_score'] = self._calculate_pattern_score(candidate_text)
@@ -323,39 +355,72 @@ class SemanticFilter:
         
         return scores
     
-    def _calculate_context_similarity(self, candidate, document_context: Dict[str, Any], 
-                                    pdf_path: str) -> float:
-        """Calculate similarity between candidate and surrounding context."""
+    def _encode_page_contexts(self, document_context: Dict[str, Any]) -> Tuple[np.ndarray, Dict[int, slice]]:
+        """Embed the context paragraphs of all pages as one matrix.
+        
+        Each page contributes its first context_window * 2 paragraphs, skipping
+        very short ones. Returns the normalized float32 matrix and the row range
+        of each page's paragraphs in it.
+        """
+        paragraphs = []
+        page_rows = {}
+        
+        for page, page_context in document_context['page_contexts'].items():
+            page_paragraphs = [
+                paragraph for paragraph in page_context.get('paragraphs', [])[:self.context_window * 2]
+                if len(paragraph) > 20  # Skip very short paragraphs
+            ]
+            page_rows[page] = slice(len(paragraphs), len(paragraphs) + len(page_paragraphs))
+            paragraphs.extend(page_paragraphs)
+        
         try:
-            candidate_text = candidate.text.strip()
+            with tracing.span("context_embeddings", cat="semantic", paragraphs=len(paragraphs)):
+                return self.embedding_model.encode_matrix(paragraphs), page_rows
+        except Exception as e:
+            self.logger.warning(f"Context embedding failed: {e}")
+            return np.zeros((0, 0), dtype=np.float32), {}
+    
+    def _calculate_context_similarities(self, candidates: List,
+                                        context_embeddings: Tuple[np.ndarray, Dict[int, slice]]) -> List[float]:
+        """Similarity between each candidate and the paragraphs of its own page.
+        
+        All candidate x paragraph scores come from one matrix product of the
+        normalized embeddings; a page mask restricts each candidate to its page
+        before averaging.
+        """
+        paragraph_matrix, page_rows = context_embeddings
+        if len(paragraph_matrix) == 0:
+            return [0.5] * len(candidates)  # Neutral score if no context
+        
+        try:
+            with tracing.span("context_similarity", cat="semantic", candidates=len(candidates)):
+                candidate_matrix = self.embedding_model.encode_matrix(
+                    [candidate.text.strip() for candidate in candidates]
+                )
+                similarities = candidate_matrix @ paragraph_matrix.T
             
-            # Get surrounding context from the same page
-            page_context = document_context['page_contexts'].get(candidate.page, {})
-            surrounding_paragraphs = page_context.get('paragraphs', [])
+            page_mask = np.zeros(similarities.shape, dtype=bool)
+            for row, candidate in enumerate(candidates):
+                rows = page_rows.get(candidate.page)
+                if rows is not None:
+                    page_mask[row, rows] = True
             
-            if not surrounding_paragraphs:
-                return 0.5  # Neutral score if no context
+            counts = page_mask.sum(axis=1)
+            means = np.where(page_mask, similarities.astype(np.float64), 0.0).sum(axis=1) / np.maximum(counts, 1)
             
-            # NEW: Use embedding model instead of direct model access
             context_similarities = []
-            for paragraph in surrounding_paragraphs[:self.context_window * 2]:
-                if len(paragraph) > 20:  # Skip very short paragraphs
-                    # Use the embedding model's compute_similarity method
-                    similarity = self.embedding_model.compute_similarity(candidate_text, paragraph)
-                    context_similarities.append(similarity)
-            
-            if context_similarities:
-                # Return mean similarity, but penalize if too similar (might be body text)
-                mean_similarity = np.mean(context_similarities)
-                if mean_similarity > 0.7:  # Too similar to surrounding text
-                    return mean_similarity * 0.5  # Penalize
-                return mean_similarity
-            
-            return 0.5
+            for count, mean_similarity in zip(counts.tolist(), means.tolist()):
+                if count == 0:
+                    context_similarities.append(0.5)  # Neutral score if no context
+                elif mean_similarity > 0.7:  # Too similar to surrounding text (might be body text)
+                    context_similarities.append(mean_similarity * 0.5)  # Penalize
+                else:
+                    context_similarities.append(mean_similarity)
+            return context_similarities
             
         except Exception as e:
             self.logger.warning(f"Context similarity calculation failed: {e}")
-            return 0.5
+            return [0.5] * len(candidates)
     
     def _calculate_pattern_score(self, candidate_text: str) -> float:
         """Calculate score based on heading patterns."""
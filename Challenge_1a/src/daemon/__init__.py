@@ -0,0 +1,41 @@
+from src.daemon.client import (
+    DaemonUnavailable,
+    forward_extract,
+    daemon_status,
+    stop_daemon
+)
+
+__all__ = [
+    "DaemonUnavailable",
+    "forward_extract",
+    "daemon_status",
+    "stop_daemon",
+    "ExtractionDaemon"
+]
+
+
+def __getattr__(name):
+    # The server imports the pipeline when it starts; the client that forwards
+    # extract calls to it must stay light, so import the server on first access
+    if name == "ExtractionDaemon":
+        from src.daemon.server import ExtractionDaemon
+        return ExtractionDaemon
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Module documentation
+__doc__ = """
+Warm extraction daemon for per-file CLI calls.
+
+`python -m src.main daemon` imports the pipeline once, loads the embedding
+model and listens on a Unix socket (DAEMON_SOCKET). While it runs,
+`python -m src.main extract` only forwards its arguments, working directory
+and FAST_MODE/RESULT_CACHE/INCLUDE_METADATA to it and prints the streamed
+output, which is the same as an in-process run. Without a daemon, or with
+--no-daemon, extract runs in-process as before.
+
+Usage:
+    python -m src.main daemon &
+    python -m src.main extract document.pdf --round1a
+    python -m src.main daemon --status
+    python -m src.main daemon --stop
+"""
@@ -0,0 +1,109 @@
+"""
+Thin client of the extraction daemon.
+
+Only the standard library is imported here, so ``extract`` can forward a
+request without loading the pipeline when a daemon is running.
+"""
+import os
+import sys
+import json
+import socket
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+from config.settings import DAEMON_SOCKET, DAEMON_CONNECT_TIMEOUT
+
+
+# Environment variables read by the pipeline at run time; forwarded with each request
+FORWARDED_ENV_VARS = ("FAST_MODE", "RESULT_CACHE", "INCLUDE_METADATA")
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket."""
+
+
+def send_frame(stream, frame: Dict[str, Any]) -> None:
+    """Write one newline-delimited JSON frame."""
+    stream.write(json.dumps(frame, ensure_ascii=False).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def read_frames(stream) -> Iterator[Dict[str, Any]]:
+    """Newline-delimited JSON frames until the peer closes the connection."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line.decode("utf-8"))
+
+
+def _connect(socket_path: Optional[Path] = None, timeout: Optional[float] = None) -> socket.socket:
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix sockets are not supported on this platform")
+
+    path = str(socket_path or DAEMON_SOCKET)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(DAEMON_CONNECT_TIMEOUT if timeout is None else timeout)
+    try:
+        sock.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as e:
+        sock.close()
+        raise DaemonUnavailable(f"No daemon at {path}: {e}")
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(f"Cannot connect to daemon at {path}: {e}")
+    sock.settimeout(None)  # extraction may take as long as it takes
+    return sock
+
+
+def request(command: str, socket_path: Optional[Path] = None, **payload) -> Iterator[Dict[str, Any]]:
+    """
+    Send one request and yield the daemon's response frames.
+
+    Raises DaemonUnavailable if nothing is listening on the socket.
+    """
+    sock = _connect(socket_path)
+    with sock, sock.makefile("rwb") as stream:
+        send_frame(stream, dict(payload, command=command))
+        yield from read_frames(stream)
+
+
+def forward_extract(options: Dict[str, Any], socket_path: Optional[Path] = None) -> Any:
+    """
+    Run ``extract`` in the daemon, writing its stdout to ours as it arrives.
+
+    Relative paths are resolved by the daemon in this process's working
+    directory. Returns the command's return value; raises DaemonUnavailable
+    if no daemon is running (the caller then extracts in-process).
+    """
+    env = {name: os.environ.get(name) for name in FORWARDED_ENV_VARS}
+    frames = request("extract", socket_path, options=options, cwd=os.getcwd(), env=env)
+
+    for frame in frames:
+        if "stdout" in frame:
+            sys.stdout.write(frame["stdout"])
+            sys.stdout.flush()
+        elif "exit" in frame:
+            if frame.get("error"):
+                raise RuntimeError(f"Daemon error: {frame['error']}")
+            return frame["exit"]
+
+    raise RuntimeError("Daemon closed the connection before the request finished")
+
+
+def daemon_status(socket_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Status of the running daemon, or None if there is none."""
+    try:
+        for frame in request("status", socket_path):
+            return frame
+    except DaemonUnavailable:
+        return None
+    return None
+
+
+def stop_daemon(socket_path: Optional[Path] = None) -> bool:
+    """Ask the running daemon to exit; False if there is none."""
+    try:
+        for _ in request("shutdown", socket_path):
+            pass
+    except DaemonUnavailable:
+        return False
+    return True
@@ -0,0 +1,237 @@
+"""
+Long-lived extraction daemon on a Unix socket.
+
+Imports the pipeline once and keeps the embedding model loaded, so a request
+costs only the extraction itself. Requests run one at a time: the per-request
+working directory, environment, stdout, thread limits and log level are
+process-wide, and each request restores them when it ends.
+"""
+import io
+import os
+import time
+import socket
+import logging
+import threading
+import contextlib
+import socketserver
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config.settings import DAEMON_SOCKET, DAEMON_IDLE_TIMEOUT
+from src.daemon.client import FORWARDED_ENV_VARS, send_frame, read_frames, daemon_status
+
+
+class _FrameWriter(io.TextIOBase):
+    """stdout replacement that sends everything written as frames to the client."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        text = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+        if text:
+            send_frame(self._stream, {"stdout": text})
+        return len(data)
+
+
+@contextlib.contextmanager
+def _request_context(cwd: str, env: Dict[str, Optional[str]], debug: bool = False):
+    """
+    Run in the client's working directory and environment, then restore ours.
+
+    The thread limits the request applies for its CPU split and its --debug log
+    level (logged by the daemon, not the client) end with it as well.
+    """
+    from src.utils.cpu_scheduler import preserved_thread_limits
+
+    previous_cwd = os.getcwd()
+    previous_env = {name: os.environ.get(name) for name in FORWARDED_ENV_VARS}
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+    try:
+        with preserved_thread_limits():
+            os.chdir(cwd)
+            _apply_env(env)
+            if debug:
+                root_logger.setLevel(logging.DEBUG)
+            yield
+    finally:
+        root_logger.setLevel(previous_level)
+        _apply_env(previous_env)
+        os.chdir(previous_cwd)
+
+
+def _apply_env(env: Dict[str, Optional[str]]) -> None:
+    for name in FORWARDED_ENV_VARS:
+        value = env.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        daemon: ExtractionDaemon = self.server.extraction_daemon
+        for frame in read_frames(self.rfile):
+            daemon.handle(frame, self.wfile)
+            return  # one request per connection
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ExtractionDaemon:
+    """
+    Serves ``extract`` requests from ``src.main`` clients over a Unix socket.
+
+    The socket is only accessible to the user running the daemon, since requests
+    read and write files with its permissions.
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, preload: bool = True,
+                 idle_timeout: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.socket_path = Path(socket_path or DAEMON_SOCKET)
+        self.preload = preload
+        self.idle_timeout = DAEMON_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+
+        self.embedding_model = None
+        self._server: Optional[_Server] = None
+        self._request_lock = threading.Lock()  # requests change process-wide state
+        self._last_activity = time.time()
+        self.stats = {
+            "started_at": None,
+            "requests": 0,
+            "failed_requests": 0,
+            "busy_time": 0.0
+        }
+
+    def _warm_up(self) -> None:
+        """Import the pipeline and load the embedding model before the first request."""
+        start_time = time.time()
+        from src.main import run_extract  # noqa: F401  (imports the whole pipeline)
+        from src.models.embedding_model import EmbeddingModel
+
+        self.embedding_model = EmbeddingModel()
+        if self.preload:
+            self.embedding_model.preload_model()
+            self.embedding_model.warmup_model()
+        warmed = "pipeline imported and model loaded" if self.preload else "pipeline imported"
+        self.logger.info(f"Daemon warm-up ({warmed}) took {time.time() - start_time:.2f}s")
+
+    def _bind(self) -> _Server:
+        if daemon_status(self.socket_path) is not None:
+            raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+        # Nothing answers, so a leftover socket file is stale
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        previous_umask = os.umask(0o077)
+        try:
+            server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(previous_umask)
+        server.extraction_daemon = self
+        return server
+
+    def serve_forever(self) -> None:
+        """Warm up, then serve until ``shutdown`` (a request, SIGTERM or the idle timeout)."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("The extraction daemon needs Unix domain sockets")
+
+        self._warm_up()
+        self._server = self._bind()
+        self.stats["started_at"] = time.time()
+        self._last_activity = time.time()
+        if self.idle_timeout > 0:
+            threading.Thread(target=self._idle_watchdog, daemon=True).start()
+
+        self.logger.info(f"Extraction daemon listening on {self.socket_path} (pid {os.getpid()})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                self.socket_path.unlink()
+            self.logger.info("Extraction daemon stopped")
+
+    def shutdown(self) -> None:
+        """Stop serving (from another thread); a running request finishes first."""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _idle_watchdog(self) -> None:
+        while True:
+            time.sleep(min(self.idle_timeout, 5.0))
+            if self._request_lock.locked():
+                continue
+            if time.time() - self._last_activity >= self.idle_timeout:
+                self.logger.info(f"No requests for {self.idle_timeout:.0f}s, shutting down")
+                self.shutdown()
+                return
+
+    def handle(self, frame: Dict[str, Any], stream) -> None:
+        """Answer one request frame."""
+        command = frame.get("command")
+        self._last_activity = time.time()
+
+        if command == "status":
+            send_frame(stream, self.get_status())
+        elif command == "shutdown":
+            send_frame(stream, {"stopping": True})
+            self.shutdown()
+        elif command == "extract":
+            self._extract(frame, stream)
+        else:
+            send_frame(stream, {"exit": 1, "error": f"Unknown command '{command}'"})
+
+    def _extract(self, frame: Dict[str, Any], stream) -> None:
+        from src.main import run_extract
+        from src.utils import tracing
+
+        options = frame.get("options", {})
+        with self._request_lock:
+            start_time = time.time()
+            self.stats["requests"] += 1
+            try:
+                with _request_context(frame.get("cwd", os.getcwd()), frame.get("env", {}),
+                                      debug=bool(options.get("debug"))), \
+                        contextlib.redirect_stdout(_FrameWriter(stream)):
+                    exit_value = run_extract(embedding_model=self.embedding_model, **options)
+                send_frame(stream, {"exit": exit_value})
+            except (BrokenPipeError, ConnectionResetError):
+                self.stats["failed_requests"] += 1
+                self.logger.warning("Client disconnected during extraction")
+            except Exception as e:
+                self.stats["failed_requests"] += 1
+                self.logger.error(f"Extraction request failed: {e}")
+                with contextlib.suppress(OSError):
+                    send_frame(stream, {"exit": 1, "error": str(e)})
+            finally:
+                if options.get("trace_path"):
+                    # The trace belongs to this request only
+                    tracing.disable()
+                    tracing.drain_events()
+                self.stats["busy_time"] += time.time() - start_time
+                self._last_activity = time.time()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Process, uptime and request counters."""
+        started_at = self.stats["started_at"]
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.socket_path),
+            "uptime_s": round(time.time() - started_at, 1) if started_at else 0.0,
+            "requests": self.stats["requests"],
+            "failed_requests": self.stats["failed_requests"],
+            "busy_time_s": round(self.stats["busy_time"], 3),
+            "busy": self._request_lock.locked(),
+            "model_loaded": bool(self.embedding_model and
+                                 self.embedding_model.lazy_loader.is_model_loaded(self.embedding_model.model_name))
+        }
@@ -4,15 +4,37 @@ from pathlib import Path
 import logging
 import json
 import os
+import glob
+import sys
+import signal
 
-from src.core.pdf_processor import PDFProcessor
-from src.utils.validation import validate_pdf
 from config.settings import JSON_OUTPUT_DIR
 
 
+def resolve_pdf_inputs(pdf_path: str):
+    """
+    Resolve the extract argument to a list of PDF paths.
+    
+    Accepts a single file, a directory (all *.pdf files in it) or a glob pattern.
+    Returns (paths, is_batch).
+    """
+    path = Path(pdf_path)
+    
+    if path.is_dir():
+        return sorted(str(p) for p in path.iterdir() if p.suffix.lower() == '.pdf'), True
+    
+    if glob.has_magic(pdf_path):
+        return sorted(p for p in glob.glob(pdf_path, recursive=True) if Path(p).is_file()), True
+    
+    if not path.exists():
+        raise click.BadParameter(f"Path '{pdf_path}' does not exist.", param_hint="'PDF_PATH'")
+    
+    return [pdf_path], False
+
+
 @click.command()
-@click.argument('pdf_path', type=click.Path(exists=True))
-@click.option('--output', '-o', type=click.Path(), help='Output JSON file path')
+@click.argument('pdf_path', type=click.Path())
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file path (output directory for a directory/glob input)')
 @click.option('--debug', is_flag=True, help='Enable debug mode with detailed logging')
 @click.option('--language', default='auto', help='Document language (auto, en, ja, hi, ar, zh)')
 @click.option('--round1a', is_flag=True, help='Use Round 1A hackathon format')
@@ -21,10 +43,21 @@ from config.settings import JSON_OUTPUT_DIR
 @click.option('--warmup', is_flag=True, help='Warm up models before processing')
 @click.option('--accessibility', is_flag=True, help='Generate accessibility XML output')
 @click.option('--metadata', is_flag=True, help='Include full metadata in output (accessibility, document info, etc.)')
-def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup, accessibility, metadata):
+@click.option('--workers', type=int, default=None, help='Worker processes for directory/glob input (default: planned from the available cores)')
+@click.option('--cpu-split', default=None, help="Cores split as WORKERS:THREADS (worker processes x torch threads each) or 'auto' (default: CPU_SPLIT)")
+@click.option('--stream', is_flag=True, help='Print provisional headings page by page as NDJSON, then the final result')
+@click.option('--no-cache', is_flag=True, help='Bypass the persistent result cache')
+@click.option('--trace', 'trace_path', type=click.Path(), default=None, help='Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file')
+@click.option('--trace-sample-rate', type=float, default=None, help='Fraction of documents to trace (default: TRACE_SAMPLE_RATE or 1.0)')
+@click.option('--no-daemon', is_flag=True, help='Process in this process even if an extraction daemon is running')
+def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup, accessibility, metadata, workers, cpu_split,
+         stream, no_cache, trace_path, trace_sample_rate, no_daemon):
     """
     Extract headings from PDF using lazy-loaded AI models with accessibility support.
     
+    PDF_PATH may be a single PDF, a directory or a glob pattern (quote it), e.g.
+    'input/*.pdf'. Multiple files are processed by a pool of worker processes.
+    
     The system uses intelligent lazy loading for optimal performance:
     - Fast startup (models loaded only when needed)
     - Memory efficient (automatic cache management)
@@ -33,7 +66,23 @@ def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup,
     
     By default, outputs simple format with just title and outline.
     Use --metadata flag to include full metadata and accessibility information.
+    
+    Use --stream to get one JSON object per line on stdout: a "provisional"
+    event for every parsed page, then a "final" event with the full result.
+    
+    If an extraction daemon is running (see the daemon command), the request is
+    forwarded to its warm processors; the output is the same.
+    
+    Cores are split between worker processes (and page shards of long
+    documents) and torch inference threads from the cores this process may use;
+    --cpu-split fixes the split instead, e.g. 8:4 on a 32-core machine.
     """
+    from src.utils.cpu_scheduler import parse_split
+    
+    try:
+        parse_split(cpu_split)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--cpu-split'")
     
     # Setup logging
     log_level = logging.DEBUG if debug else logging.INFO
@@ -48,6 +97,11 @@ def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup,
         os.environ['FAST_MODE'] = 'true'
         logger.info("Fast mode enabled - semantic filtering disabled")
     
+    # Disable the result cache via environment variable (inherited by batch workers)
+    if no_cache:
+        os.environ['RESULT_CACHE'] = 'false'
+        logger.info("Result cache disabled")
+    
     # Set metadata mode via environment variable
     if metadata:
         os.environ['INCLUDE_METADATA'] = 'true'
@@ -56,20 +110,65 @@ def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup,
         os.environ['INCLUDE_METADATA'] = 'false'
         logger.info("Simple mode enabled - clean output with title and outline only")
     
+    options = dict(pdf_path=pdf_path, output=output, debug=debug, language=language, round1a=round1a,
+                   preload=preload, fast_mode=fast_mode, warmup=warmup, accessibility=accessibility,
+                   metadata=metadata, workers=workers, cpu_split=cpu_split, stream=stream, trace_path=trace_path,
+                   trace_sample_rate=trace_sample_rate)
+    
+    if not no_daemon:
+        from src.daemon.client import DaemonUnavailable, forward_extract
+        
+        resolve_pdf_inputs(pdf_path)  # report a missing path here, as in-process
+        try:
+            return forward_extract(options)
+        except DaemonUnavailable:
+            logger.debug("No extraction daemon running, processing in-process")
+        except RuntimeError as e:
+            click.echo(f"Error: {str(e)}")
+            return 1
+    
+    return run_extract(**options)
+
+
+def run_extract(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup, accessibility, metadata, workers,
+                stream, trace_path, trace_sample_rate, cpu_split=None, embedding_model=None):
+    """
+    Body of the extract command after option handling; also run by the daemon.
+    
+    ``embedding_model`` is a model shared across calls (the daemon's warm one).
+    """
+    from src.core.pdf_processor import PDFProcessor
+    from src.utils import tracing
+    from src.utils.cpu_scheduler import plan_cores, apply_thread_limits
+    
+    logger = logging.getLogger(__name__)
+    
+    if trace_path:
+        tracing.enable(sample_rate=trace_sample_rate)
+        logger.info(f"Tracing enabled - trace will be written to {trace_path}")
+    
     startup_time = time.time()
     
+    pdf_paths, is_batch = resolve_pdf_inputs(pdf_path)
+    if is_batch and not pdf_paths:
+        click.echo(f"Error: No PDF files found for: {pdf_path}")
+        return 1
+    
     try:
-        # Validate PDF
-        logger.info(f"Validating PDF: {pdf_path}")
-        if not validate_pdf(pdf_path):
-            click.echo(f"Error: Invalid PDF file: {pdf_path}")
-            return
+        # One document uses every core: page shards while parsing, torch threads for
+        # inference. Batches are split per worker by the batch engine.
+        split = plan_cores(jobs=1, split=cpu_split)
+        if not is_batch:
+            apply_thread_limits(split)
+            logger.info(f"CPU split: {split}")
         
+        # PDF validation happens inside the processor, on the shared parsed document
         # Initialize processor with lazy loading (fast startup)
         logger.info("Initializing PDF processor with lazy loading...")
         init_start = time.time()
         
-        processor = PDFProcessor(language=language, debug=debug)
+        processor = PDFProcessor(language=language, debug=debug, embedding_model=embedding_model,
+                                 page_workers=split.page_workers)
         
         init_time = time.time() - init_start
         logger.info(f"Processor initialized in {init_time:.3f}s (models not loaded yet)")
@@ -104,6 +203,40 @@ def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup,
             warmup_time = time.time() - warmup_start
             logger.info(f"Model warmup completed in {warmup_time:.3f}s")
         
+        if is_batch:
+            # Batch mode: worker processes, one output file per document
+            logger.info(f"Starting batch processing of {len(pdf_paths)} files...")
+            processing_start = time.time()
+            
+            batch = processor.process_batch(
+                pdf_paths,
+                output_dir=output or JSON_OUTPUT_DIR,
+                max_workers=workers,
+                include_accessibility=accessibility,
+                include_metadata=metadata,
+                round1a=round1a,
+                cpu_split=cpu_split
+            )
+            summary = batch["summary"]
+            
+            processing_time = time.time() - processing_start
+            click.echo(f"Processed {summary['successful']}/{summary['total_files']} files "
+                       f"in {processing_time:.2f}s - results saved to: {summary['output_directory']}")
+            for failed_path, error in summary["failed_files"].items():
+                click.echo(f"Failed: {failed_path}: {error}")
+            return
+        
+        if stream:
+            # Streaming mode: one JSON event per line, flushed as pages are parsed
+            for event in processor.iter_headings(pdf_path, include_metadata=metadata and not round1a):
+                if event["type"] == "final" and round1a:
+                    event["result"] = {
+                        "title": event["result"].get("title", "Document"),
+                        "outline": event["result"].get("outline", [])
+                    }
+                click.echo(json.dumps(event, ensure_ascii=False))
+            return
+        
         # Process PDF (models loaded on demand during processing)
         logger.info("Starting PDF processing...")
         processing_start = time.time()
@@ -212,6 +345,10 @@ def main(pdf_path, output, debug, language, round1a, preload, fast_mode, warmup,
             logger.error(f"Full traceback:\n{traceback.format_exc()}")
         click.echo(f"Error: {str(e)}")
         return 1
+    finally:
+        if trace_path:
+            event_count = tracing.export_chrome_trace(trace_path)
+            logger.info(f"Trace with {event_count} events written to {trace_path}")
 
 @click.command()
 @click.option('--model-info', is_flag=True, help='Show model information')
@@ -236,6 +373,8 @@ def utils(model_info, clear_cache, benchmark, accessibility_check):
         from src.models.embedding_model import EmbeddingModel
         
         model = EmbeddingModel()
+        if model.embedding_store is not None:
+            model.embedding_store.clear()
         model.clear_cache()
         click.echo("All model caches cleared")
     
@@ -309,6 +448,224 @@ def utils(model_info, clear_cache, benchmark, accessibility_check):
             click.echo(f"  - {rec}")
 
 
+@click.command()
+@click.option('--scenario', 'scenarios', multiple=True, type=click.Choice(['fast-cold', 'fast-warm', 'semantic-cold', 'semantic-warm']),
+              help='Scenario to run (repeatable, default: all)')
+@click.option('--synthetic-pages', multiple=True, type=int, help='Page counts of the scaled synthetic documents (repeatable, default: 50 and 200)')
+@click.option('--iterations', type=int, default=3, help='Timed passes over the corpus in warm scenarios')
+@click.option('--output', '-o', type=click.Path(), help='Write the JSON report to this file')
+@click.option('--baseline', type=click.Path(), default=None, help='Baseline report to compare against (default: config/benchmark_baseline.json)')
+@click.option('--threshold', 'thresholds', multiple=True, help='Override a regression threshold, e.g. p95_ms=0.5 (repeatable)')
+@click.option('--update-baseline', is_flag=True, help='Write this run as the new baseline instead of comparing')
+@click.option('--cpu-split', default=None, help="Cores split as WORKERS:THREADS or 'auto' (default: CPU_SPLIT); recorded in the report")
+def benchmark(scenarios, synthetic_pages, iterations, output, baseline, thresholds, update_baseline, cpu_split):
+    """
+    Run the performance benchmark suite and compare it with the baseline.
+    
+    Exits with status 1 if any metric regressed beyond its threshold.
+    """
+    from src.benchmarks import build_scaled_corpus, list_pdfs, run_benchmarks, compare_to_baseline
+    from src.utils.cpu_scheduler import parse_split
+    from config.settings import BENCHMARK_BASELINE_FILE, BENCHMARK_CORPUS_DIR, BASE_DIR
+    
+    try:
+        parse_split(cpu_split)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--cpu-split'")
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    sample_pdfs = list_pdfs(BASE_DIR / "sample_dataset" / "pdfs")
+    corpora = {
+        "sample_dataset": sample_pdfs,
+        "synthetic": build_scaled_corpus(sample_pdfs, BENCHMARK_CORPUS_DIR, synthetic_pages or (50, 200))
+    }
+    
+    threshold_overrides = {}
+    for item in thresholds:
+        metric, _, value = item.partition('=')
+        try:
+            threshold_overrides[metric.strip()] = float(value)
+        except ValueError:
+            raise click.BadParameter(f"Expected metric=value, got '{item}'", param_hint="'--threshold'")
+    
+    scenarios = list(scenarios) or ['fast-cold', 'fast-warm', 'semantic-cold', 'semantic-warm']
+    click.echo(f"Running {len(scenarios)} benchmark scenario(s)...", err=True)
+    report = run_benchmarks(scenarios, corpora, iterations=iterations, cpu_split=cpu_split)
+    
+    baseline_path = Path(baseline) if baseline else BENCHMARK_BASELINE_FILE
+    if update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        click.echo(f"Baseline written to: {baseline_path}", err=True)
+    elif baseline_path.exists():
+        baseline_report = json.loads(baseline_path.read_text(encoding="utf-8"))
+        report["comparison"] = compare_to_baseline(report, baseline_report, threshold_overrides)
+    else:
+        click.echo(f"No baseline at {baseline_path} - skipping comparison", err=True)
+    
+    report_json = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(report_json + "\n", encoding="utf-8")
+        click.echo(f"Report saved to: {output}", err=True)
+    else:
+        click.echo(report_json)
+    
+    for name, result in report["scenarios"].items():
+        if "error" in result:
+            click.echo(f"{name}: FAILED ({result['error']})", err=True)
+            continue
+        overall = result["overall"]
+        split = result.get("cpu_split") or {}
+        click.echo(f"{name}: p50 {overall['p50_ms']:.0f}ms, p95 {overall['p95_ms']:.0f}ms, "
+                   f"{overall['pages_per_sec']:.1f} pages/s, peak RSS {result['peak_rss_mb']:.0f}MB, "
+                   f"{split.get('torch_threads', '?')} torch thread(s), {split.get('page_workers', '?')} page shard(s)", err=True)
+    
+    regressions = [c for c in report.get("comparison", []) if c["regression"]]
+    for c in regressions:
+        click.echo(f"REGRESSION {c['scenario']}/{c['group']} {c['metric']}: "
+                   f"{c['baseline']} -> {c['current']} ({c['change']:+.1%}, allowed {c['threshold']:.0%})", err=True)
+    if regressions:
+        sys.exit(1)
+
+
+@click.command()
+@click.option('--output-dir', '-o', type=click.Path(), default=None, help='Directory for the PDFs and ground truth (default: data/benchmark_corpus/generated)')
+@click.option('--pages', multiple=True, type=int, help='Page count, 1-5000 (repeatable, default: 10, 200 and 1000)')
+@click.option('--language', 'languages', multiple=True, type=click.Choice(['english', 'japanese', 'chinese', 'hindi', 'arabic']),
+              help='Document language (repeatable, default: english)')
+@click.option('--columns', type=click.IntRange(1, 3), default=1, help='Text columns per page')
+@click.option('--heading-depth', type=click.IntRange(1, 4), default=3, help='Deepest heading level (H1-H4)')
+@click.option('--numbering', default=None, help='Numbering style: decimal, roman (English), chapter/kanji (CJK, Hindi, Arabic) or none (default: the language\'s own)')
+@click.option('--table-ratio', type=click.FloatRange(0, 1), default=0.1, help='Fraction of pages starting with a table')
+@click.option('--no-toc', is_flag=True, help='Do not embed the outline as PDF bookmarks')
+@click.option('--no-running-headers', is_flag=True, help='Omit running headers and footers')
+@click.option('--seed', type=int, default=0, help='Random seed (same parameters and seed give the same document)')
+@click.option('--evaluate', is_flag=True, help='Run the extractor on every document and report throughput and accuracy')
+def generate_corpus(output_dir, pages, languages, columns, heading_depth, numbering, table_ratio, no_toc, no_running_headers, seed, evaluate):
+    """
+    Generate synthetic PDFs with known outlines for load and accuracy tests.
+    
+    Each <name>.pdf gets a <name>.json with the ground-truth title and outline.
+    """
+    from src.benchmarks.synthetic import SyntheticSpec, generate_corpus as build_corpus, load_ground_truth, evaluate_outline
+    from src.core.pdf_processor import PDFProcessor
+    from config.settings import BENCHMARK_CORPUS_DIR, BENCHMARK_DOCUMENT_TIMEOUT
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    specs = [
+        SyntheticSpec(pages=page_count, columns=columns, heading_depth=heading_depth, language=language,
+                      numbering=numbering, running_headers=not no_running_headers, toc=not no_toc,
+                      table_ratio=table_ratio, seed=seed)
+        for language in (languages or ('english',))
+        for page_count in (pages or (10, 200, 1000))
+    ]
+    try:
+        paths = build_corpus(specs, Path(output_dir) if output_dir else BENCHMARK_CORPUS_DIR / "generated")
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    
+    for path in paths:
+        click.echo(path)
+    
+    if not evaluate:
+        return
+    
+    processor = PDFProcessor()
+    for path, spec in zip(paths, specs):
+        truth = load_ground_truth(path)
+        start_time = time.time()
+        result = processor.process(path, timeout=BENCHMARK_DOCUMENT_TIMEOUT, include_metadata=False)
+        elapsed = time.time() - start_time
+        scores = evaluate_outline(result.get("outline", []), truth["outline"])
+        click.echo(f"{Path(path).name}: {spec.pages / elapsed:.1f} pages/s, "
+                   f"precision {scores['precision']:.2f}, recall {scores['recall']:.2f}, "
+                   f"F1 {scores['f1']:.2f}, level accuracy {scores['level_accuracy']:.2f}", err=True)
+
+
+@click.command()
+@click.option('--backend', type=click.Choice(['int8']), default='int8', help='Backend compared with fp32')
+@click.option('--model', 'model_name', default=None, help='Model name or local path (default: EMBEDDING_MODEL)')
+@click.option('--repeats', type=int, default=3, help='Timed encode passes per backend (best is reported)')
+@click.option('--output', '-o', type=click.Path(), help='Write the JSON report to this file')
+def quantization_check(backend, model_name, repeats, output):
+    """
+    Compare the int8 embedding backend with fp32 on sample_dataset.
+    
+    Reports embedding cosine, similarity-score drift, outline agreement and encode speed.
+    """
+    from src.benchmarks import compare_backends, list_pdfs
+    from config.settings import BASE_DIR
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    report = compare_backends(list_pdfs(BASE_DIR / "sample_dataset" / "pdfs"), model_name=model_name,
+                              backend=backend, repeats=repeats)
+    report_json = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(report_json + "\n", encoding="utf-8")
+        click.echo(f"Report saved to: {output}", err=True)
+    else:
+        click.echo(report_json)
+    
+    similarity = report["similarity"]
+    outline = report["outline"]
+    if similarity["texts"]:
+        click.echo(f"Embeddings: cosine mean {similarity['cosine_mean']:.4f}, min {similarity['cosine_min']:.4f}; "
+                   f"similarity score drift mean {similarity['score_abs_diff_mean']:.4f}, "
+                   f"max {similarity['score_abs_diff_max']:.4f}", err=True)
+    click.echo(f"Outlines: {outline['identical']}/{outline['documents']} identical, "
+               f"F1 mean {outline['f1_mean']:.3f}, min {outline['f1_min']:.3f}", err=True)
+    for name, timing in report["timing"].items():
+        speed = f", {timing['texts_per_sec']:.0f} texts/s" if timing["texts_per_sec"] is not None else ""
+        click.echo(f"{name}: load {timing['load_s']:.2f}s, pipeline {timing['pipeline_s']:.2f}s{speed}", err=True)
+
+
+@click.command()
+@click.option('--socket', 'socket_path', type=click.Path(), default=None, help='Unix socket path (default: DAEMON_SOCKET)')
+@click.option('--no-preload', is_flag=True, help='Load the embedding model on the first request instead of at startup')
+@click.option('--idle-timeout', type=float, default=None, help='Exit after this many seconds without requests (default: DAEMON_IDLE_TIMEOUT, 0 = never)')
+@click.option('--status', is_flag=True, help='Show the status of the running daemon and exit')
+@click.option('--stop', is_flag=True, help='Stop the running daemon and exit')
+@click.option('--debug', is_flag=True, help='Enable debug logging')
+def daemon(socket_path, no_preload, idle_timeout, status, stop, debug):
+    """
+    Run the extraction daemon in the foreground.
+    
+    It keeps the pipeline imported and the embedding model loaded; while it runs,
+    extract forwards requests to it instead of starting cold.
+    """
+    from src.daemon import ExtractionDaemon, daemon_status, stop_daemon
+    
+    if status:
+        info = daemon_status(socket_path)
+        if info is None:
+            click.echo("No extraction daemon running")
+            sys.exit(1)
+        click.echo(json.dumps(info, indent=2))
+        return
+    
+    if stop:
+        if not stop_daemon(socket_path):
+            click.echo("No extraction daemon running")
+            sys.exit(1)
+        click.echo("Extraction daemon stopping")
+        return
+    
+    logging.basicConfig(level=logging.DEBUG if debug else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    server = ExtractionDaemon(socket_path=socket_path, preload=not no_preload, idle_timeout=idle_timeout)
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.shutdown())
+    try:
+        server.serve_forever()
+    except RuntimeError as e:
+        click.echo(f"Error: {str(e)}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
 # Create a multi-command CLI
 @click.group()
 def cli():
@@ -318,12 +675,14 @@ def cli():
 # Add commands to the group
 cli.add_command(main, name='extract')
 cli.add_command(utils, name='utils')
+cli.add_command(benchmark, name='benchmark')
+cli.add_command(generate_corpus, name='generate-corpus')
+cli.add_command(quantization_check, name='quantization-check')
+cli.add_command(daemon, name='daemon')
 
 if __name__ == '__main__':
     # Support both direct execution and multi-command
-    import sys
-    
-    if len(sys.argv) > 1 and sys.argv[1] in ['extract', 'utils']:
+    if len(sys.argv) > 1 and sys.argv[1] in ['extract', 'utils', 'benchmark', 'generate-corpus', 'quantization-check', 'daemon']:
         # Multi-command mode
         cli()
     else:
@@ -1,5 +1,4 @@
 import logging
-import os
 import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union, Tuple
@@ -7,31 +6,33 @@ import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-import pickle
-from threading import Lock
-import hashlib
 
-from config.settings import EMBEDDING_MODEL, MODEL_DIR
+from config.settings import (
+    EMBEDDING_MODEL, EMBEDDING_BACKEND, MODEL_DIR, ENCODE_TOKEN_BUDGET, ENCODE_MAX_BATCH_SIZE
+)
 from src.utils.text_utils import clean_text, normalize_whitespace
+from src.utils.embedding_store import EmbeddingStore
 from src.models.lazy_loader import LazyModelLoader 
+from src.utils import tracing
 
 
 class EmbeddingModel:
     """Optimized embedding model with lazy loading, caching and batch processing."""
     
-    def __init__(self, model_name: str = None, cache_embeddings: bool = True):
+    def __init__(self, model_name: str = None, cache_embeddings: bool = True, backend: str = None):
         self.model_name = model_name or EMBEDDING_MODEL
+        self.backend = backend or EMBEDDING_BACKEND  # "fp32" or "int8"
         self.cache_embeddings = cache_embeddings
         self.logger = logging.getLogger(__name__)
         
-        # NEW: Lazy model loader instead of direct model loading
-        self.lazy_loader = LazyModelLoader(cache_size_limit=1)
-        self.model = None  # Will be loaded on demand
+        # NEW: Lazy model loader instead of direct model loading. The model itself
+        # lives in the process-wide registry, shared with other EmbeddingModels
+        self.lazy_loader = LazyModelLoader(cache_size_limit=1, backend=self.backend)
+        self._model_info_loaded = False
         
-        # Embedding caching (separate from model caching)
-        self.embedding_cache = {}
-        self.cache_file = MODEL_DIR / "embedding_cache.pkl"
-        self.cache_lock = Lock()
+        # Embedding caching (separate from model caching): memory-mapped store
+        # shared with other worker processes, namespaced by model
+        self.embedding_store: Optional[EmbeddingStore] = None
         
         # Model info
         self.embedding_dim = None
@@ -43,12 +44,16 @@ class EmbeddingModel:
             "cache_hits": 0,
             "cache_misses": 0,
             "total_embeddings": 0,
-            "total_time": 0.0
+            "total_time": 0.0,
+            "duplicates_skipped": 0,
+            "encode_batches": 0,
+            "tokens": 0,
+            "padded_tokens": 0
         }
         
         # Initialize (but don't load model yet)
         self._initialize_model_info()
-        self._load_cache()
+        self._open_store()
     
     def _get_optimal_device(self) -> str:
         """Determine the best device for embeddings."""
@@ -84,61 +89,125 @@ class EmbeddingModel:
             self.logger.error(f"Failed to initialize model info: {e}")
             self.embedding_dim = 768  # Updated from 384 to 768
     
+    def is_model_loaded(self) -> bool:
+        """True if the model is loaded, so the next encode call does not pay for loading it."""
+        return self.lazy_loader.is_model_loaded(self.model_name)
+    
+    @property
+    def model(self) -> Optional[SentenceTransformer]:
+        """The loaded model, or None if it is not loaded (does not load it)."""
+        if not self.is_model_loaded():
+            return None
+        return self._get_model()
+    
     def _get_model(self) -> Optional[SentenceTransformer]:
-        """Get model using lazy loader (loads on first access)."""
-        if self.model is None:
-            self.logger.info(f"Loading model on demand: {self.model_name}")
-            self.model = self.lazy_loader.load_on_demand(self.model_name, self.device)
-            
-            # Update actual model info once loaded
-            if self.model is not None:
-                self.embedding_dim = self.model.get_sentence_embedding_dimension()
-                self.max_seq_length = self.model.max_seq_length
-                self.logger.info(f"Model loaded - Actual Dim: {self.embedding_dim}, Max Length: {self.max_seq_length}")
+        """Get model using lazy loader (loads on first access).
+        
+        Not kept on the instance: the registry may unload an idle model, and the
+        next call then reloads it.
+        """
+        if self.lazy_loader.is_model_loaded(self.model_name):
+            return self.lazy_loader.load_on_demand(self.model_name, self.device)
+        
+        self.logger.info(f"Loading model on demand: {self.model_name}")
+        with tracing.span("model.load", cat="model", model=self.model_name, device=self.device, backend=self.backend):
+            model = self.lazy_loader.load_on_demand(self.model_name, self.device)
         
-        return self.model
+        # Update actual model info once loaded
+        if model is not None and not self._model_info_loaded:
+            self.embedding_dim = model.get_sentence_embedding_dimension()
+            self.max_seq_length = model.max_seq_length
+            self._model_info_loaded = True
+            self.logger.info(f"Model loaded - Actual Dim: {self.embedding_dim}, Max Length: {self.max_seq_length}")
+        
+        return model
     
-    def _load_cache(self) -> None:
-        """Load embedding cache from disk."""
+    def _open_store(self) -> None:
+        """Open the persistent embedding store for this model."""
         if not self.cache_embeddings:
             return
         
+        # int8 vectors differ slightly from fp32 ones, so they are stored apart
+        namespace = self.model_name if self.backend == "fp32" else f"{self.model_name}-{self.backend}"
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'rb') as f:
-                    self.embedding_cache = pickle.load(f)
-                self.logger.info(f"Loaded {len(self.embedding_cache)} cached embeddings")
+            self.embedding_store = EmbeddingStore(namespace)
+            self.logger.info(f"Opened embedding store with {len(self.embedding_store)} cached embeddings")
         except Exception as e:
-            self.logger.warning(f"Failed to load embedding cache: {e}")
-            self.embedding_cache = {}
+            self.logger.warning(f"Failed to open embedding store, embeddings will not be cached: {e}")
+            self.embedding_store = None
     
-    def _save_cache(self) -> None:
-        """Save embedding cache to disk."""
-        if not self.cache_embeddings or not self.embedding_cache:
-            return
-        
+    def _get_cache_key(self, text: str) -> str:
+        """Generate cache key for text (the embedding store hashes it)."""
+        # Normalize text for consistent caching
+        return normalize_whitespace(clean_text(text))
+    
+    def _token_lengths(self, model: SentenceTransformer, texts: List[str]) -> List[int]:
+        """Tokenized length of each text, truncated the way the model truncates it."""
         try:
-            with self.cache_lock:
-                # Create directory if it doesn't exist
-                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                with open(self.cache_file, 'wb') as f:
-                    pickle.dump(self.embedding_cache, f)
-                
-                self.logger.debug(f"Saved {len(self.embedding_cache)} embeddings to cache")
+            encoded = model.tokenizer(texts, add_special_tokens=True, truncation=True,
+                                      max_length=model.max_seq_length)
+            return [len(ids) for ids in encoded["input_ids"]]
         except Exception as e:
-            self.logger.warning(f"Failed to save embedding cache: {e}")
+            self.logger.debug(f"Tokenizer unavailable for batch planning, estimating lengths: {e}")
+            return [len(text) // 4 + 2 for text in texts]
     
-    def _get_cache_key(self, text: str) -> str:
-        """Generate cache key for text."""
-        # Normalize text for consistent caching
-        normalized_text = normalize_whitespace(clean_text(text))
-        return hashlib.md5(normalized_text.encode('utf-8')).hexdigest()
+    def _plan_batches(self, lengths: List[int], max_batch_size: int) -> List[List[int]]:
+        """Group text indices into batches of similar token length.
+        
+        Indices are taken longest first and bucketed by length rounded up to a
+        power of two, so a batch never pads a text to more than twice its
+        length. Within a bucket, a batch is closed when one more text would push
+        its padded size (texts x longest) over ENCODE_TOKEN_BUDGET or it holds
+        max_batch_size texts. Short headings therefore share large batches while
+        long paragraphs go a few at a time.
+        """
+        batches = []
+        current: List[int] = []
+        for index in sorted(range(len(lengths)), key=lambda i: -lengths[i]):
+            if current and (len(current) >= max_batch_size or
+                            (lengths[index] - 1).bit_length() != (lengths[current[0]] - 1).bit_length() or
+                            (len(current) + 1) * lengths[current[0]] > ENCODE_TOKEN_BUDGET):
+                batches.append(current)
+                current = []
+            current.append(index)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _encode_uncached(self, model: SentenceTransformer, texts: List[str],
+                         batch_size: Optional[int], show_progress: bool) -> np.ndarray:
+        """Encode distinct texts in length-bucketed batches; rows follow ``texts``."""
+        lengths = self._token_lengths(model, texts)
+        batches = self._plan_batches(lengths, batch_size or ENCODE_MAX_BATCH_SIZE)
+        
+        embeddings = None
+        for batch in batches:
+            batch_embeddings = model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=show_progress,
+                convert_to_tensor=False,
+                normalize_embeddings=True  # L2 normalization for better similarity
+            )
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=batch_embeddings.dtype)
+            embeddings[batch] = batch_embeddings
+            
+            self.stats["encode_batches"] += 1
+            self.stats["tokens"] += sum(lengths[i] for i in batch)
+            self.stats["padded_tokens"] += len(batch) * lengths[batch[0]]
+        return embeddings
     
     def encode(self, texts: Union[str, List[str]], 
-               batch_size: int = 32,
+               batch_size: Optional[int] = None,
                show_progress: bool = False) -> Union[np.ndarray, List[np.ndarray]]:
-        """Encode text(s) to embeddings with lazy loading, caching and optimization."""
+        """Encode text(s) to embeddings with lazy loading, caching and optimization.
+        
+        Uncached texts are deduplicated, then encoded in batches of similar
+        token length sized against ENCODE_TOKEN_BUDGET (see _plan_batches).
+        ``batch_size`` caps the number of texts per batch (default
+        ENCODE_MAX_BATCH_SIZE).
+        """
         
         # NEW: Get model using lazy loader
         model = self._get_model()
@@ -159,16 +228,20 @@ class EmbeddingModel:
         texts_to_embed = []
         cache_indices = []
         
-        # Check cache for each text
+        # Look up all non-empty texts in the store at once
+        lookup_indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        cache_keys = [self._get_cache_key(texts[i]) for i in lookup_indices]
+        cached = self.embedding_store.get_many(cache_keys) if self.embedding_store else [None] * len(cache_keys)
+        lookups = dict(zip(lookup_indices, zip(cache_keys, cached)))
+        
         for i, text in enumerate(texts):
-            if not text or not text.strip():
+            if i not in lookups:
                 embeddings.append(np.zeros(self.embedding_dim))
                 continue
             
-            cache_key = self._get_cache_key(text)
-            
-            if self.cache_embeddings and cache_key in self.embedding_cache:
-                embeddings.append(self.embedding_cache[cache_key])
+            cache_key, embedding = lookups[i]
+            if embedding is not None:
+                embeddings.append(embedding)
                 self.stats["cache_hits"] += 1
             else:
                 embeddings.append(None)  # Placeholder
@@ -176,27 +249,23 @@ class EmbeddingModel:
                 cache_indices.append((i, cache_key))
                 self.stats["cache_misses"] += 1
         
-        # Embed uncached texts in batches
+        # Embed each distinct uncached text once
         if texts_to_embed:
+            unique_rows = {text: row for row, text in enumerate(dict.fromkeys(texts_to_embed))}
+            self.stats["duplicates_skipped"] += len(texts_to_embed) - len(unique_rows)
             try:
-                with torch.no_grad():  # Disable gradient computation for inference
-                    new_embeddings = model.encode(
-                        texts_to_embed,
-                        batch_size=batch_size,
-                        show_progress_bar=show_progress,
-                        convert_to_tensor=False,
-                        normalize_embeddings=True  # L2 normalization for better similarity
-                    )
+                with torch.no_grad(), tracing.span("model.encode_batch", cat="model",
+                                                   texts=len(texts_to_embed), unique=len(unique_rows),
+                                                   cache_hits=len(texts) - len(texts_to_embed)):  # Disable gradient computation for inference
+                    unique_embeddings = self._encode_uncached(model, list(unique_rows), batch_size, show_progress)
+                new_embeddings = unique_embeddings[[unique_rows[text] for text in texts_to_embed]]
                 
-                # Store new embeddings in cache and result array
+                # Store new embeddings in the result array and the store
                 for j, (original_idx, cache_key) in enumerate(cache_indices):
-                    embedding = new_embeddings[j]
-                    embeddings[original_idx] = embedding
-                    
-                    # Cache the embedding
-                    if self.cache_embeddings:
-                        with self.cache_lock:
-                            self.embedding_cache[cache_key] = embedding
+                    embeddings[original_idx] = new_embeddings[j]
+                
+                if self.embedding_store is not None:
+                    self.embedding_store.put_many([cache_key for _, cache_key in cache_indices], new_embeddings)
             
             except Exception as e:
                 self.logger.error(f"Failed to compute embeddings: {e}")
@@ -209,10 +278,6 @@ class EmbeddingModel:
         self.stats["total_embeddings"] += len(texts)
         self.stats["total_time"] += processing_time
         
-        # Save cache periodically
-        if len(self.embedding_cache) % 100 == 0:
-            self._save_cache()
-        
         # Return single embedding or list
         if single_input:
             return embeddings[0]
@@ -222,13 +287,14 @@ class EmbeddingModel:
     def compute_similarity(self, text1: str, text2: str) -> float:
         """Compute cosine similarity between two texts."""
         try:
-            embedding1 = self.encode(text1)
-            embedding2 = self.encode(text2)
-            
-            similarity = cosine_similarity(
-                embedding1.reshape(1, -1),
-                embedding2.reshape(1, -1)
-            )[0][0]
+            with tracing.span("model.similarity", cat="model"):
+                embedding1 = self.encode(text1)
+                embedding2 = self.encode(text2)
+                
+                similarity = cosine_similarity(
+                    embedding1.reshape(1, -1),
+                    embedding2.reshape(1, -1)
+                )[0][0]
             
             return float(similarity)
             
@@ -236,13 +302,27 @@ class EmbeddingModel:
             self.logger.warning(f"Failed to compute similarity: {e}")
             return 0.0
     
+    def encode_matrix(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Encode texts into one (len(texts), dim) float32 matrix of L2-normalized rows.
+        
+        Uncached texts are deduplicated and encoded in length-bucketed batches.
+        Empty texts give zero rows.
+        """
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        
+        matrix = np.asarray(self.encode(list(texts), batch_size=batch_size), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    
     def compute_similarity_matrix(self, texts: List[str]) -> np.ndarray:
         """Compute pairwise similarity matrix for a list of texts."""
         try:
-            embeddings = self.encode(texts)
-            embeddings_array = np.array(embeddings)
-            
-            similarity_matrix = cosine_similarity(embeddings_array)
+            with tracing.span("model.similarity_matrix", cat="model", texts=len(texts)):
+                embeddings = self.encode(texts)
+                embeddings_array = np.array(embeddings)
+                
+                similarity_matrix = cosine_similarity(embeddings_array)
             return similarity_matrix
             
         except Exception as e:
@@ -366,7 +446,8 @@ class EmbeddingModel:
             "embedding_dimension": self.embedding_dim,
             "max_sequence_length": self.max_seq_length,
             "device": self.device,
-            "embedding_cache_size": len(self.embedding_cache),
+            "backend": self.backend,
+            "embedding_cache_size": len(self.embedding_store) if self.embedding_store else 0,
             "model_loaded": self.lazy_loader.is_model_loaded(self.model_name),
             "stats": self.stats.copy()
         }
@@ -383,6 +464,7 @@ class EmbeddingModel:
         cache_hit_rate = (self.stats["cache_hits"] / total_requests * 100) if total_requests > 0 else 0
         
         avg_time_per_embedding = (self.stats["total_time"] / self.stats["total_embeddings"]) if self.stats["total_embeddings"] > 0 else 0
+        padding_efficiency = (self.stats["tokens"] / self.stats["padded_tokens"] * 100) if self.stats["padded_tokens"] > 0 else 100
         
         embedding_stats = {
             "embedding_stats": {
@@ -392,9 +474,14 @@ class EmbeddingModel:
                 "cache_misses": self.stats["cache_misses"],
                 "total_processing_time": f"{self.stats['total_time']:.2f}s",
                 "avg_time_per_embedding": f"{avg_time_per_embedding * 1000:.2f}ms",
-                "embedding_cache_size": len(self.embedding_cache)
+                "duplicates_skipped": self.stats["duplicates_skipped"],
+                "encode_batches": self.stats["encode_batches"],
+                "padding_efficiency": f"{padding_efficiency:.1f}%",
+                "embedding_cache_size": len(self.embedding_store) if self.embedding_store else 0
             }
         }
+        if self.embedding_store is not None:
+            embedding_stats["embedding_store"] = self.embedding_store.get_stats()
         
         # Add lazy loader performance stats
         loader_stats = self.lazy_loader.get_cache_stats()
@@ -407,48 +494,44 @@ class EmbeddingModel:
         return embedding_stats
     
     def clear_cache(self) -> None:
-        """Clear both embedding and model caches."""
-        with self.cache_lock:
-            self.embedding_cache.clear()
-            self.stats["cache_hits"] = 0
-            self.stats["cache_misses"] = 0
+        """Clear both embedding and model caches from memory (the embedding store stays on disk)."""
+        if self.embedding_store is not None:
+            self.embedding_store.close()
+        self.stats["cache_hits"] = 0
+        self.stats["cache_misses"] = 0
         
         # Clear model cache
         self.lazy_loader.clear_all_cache()
-        self.model = None
         
         self.logger.info("All caches cleared")
     
     def clear_model_cache_only(self) -> None:
         """Clear only the model cache, keep embedding cache."""
         self.lazy_loader.clear_all_cache()
-        self.model = None
         self.logger.info("Model cache cleared")
     
-    def precompute_embeddings(self, texts: List[str], batch_size: int = 32) -> None:
+    def precompute_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> None:
         """Precompute embeddings for a list of texts."""
         self.logger.info(f"Precomputing embeddings for {len(texts)} texts")
         
         # Filter out already cached texts
         texts_to_compute = []
         for text in texts:
-            cache_key = self._get_cache_key(text)
-            if cache_key not in self.embedding_cache:
+            if self.embedding_store is None or self._get_cache_key(text) not in self.embedding_store:
                 texts_to_compute.append(text)
         
         if texts_to_compute:
             self.logger.info(f"Computing {len(texts_to_compute)} new embeddings")
             self.encode(texts_to_compute, batch_size=batch_size, show_progress=True)
-            self._save_cache()
         else:
             self.logger.info("All embeddings already cached")
     
     def __del__(self):
         """Cleanup when object is destroyed."""
         try:
-            if hasattr(self, 'embedding_cache') and self.embedding_cache:
-                self._save_cache()
+            if getattr(self, 'embedding_store', None) is not None:
+                self.embedding_store.close()
             if hasattr(self, 'lazy_loader'):
-                self.lazy_loader.clear_all_cache()
+                self.lazy_loader.release_all()  # the model stays in the registry for other users
         except Exception:
             pass  # Ignore errors during cleanup
\ No newline at end of file
@@ -1,12 +1,346 @@
 import logging
 import gc
+import hashlib
+import os
+import re
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 from pathlib import Path
 import threading
+from collections import OrderedDict
+import torch
 from sentence_transformers import SentenceTransformer
 
-from config.settings import MODEL_DIR
+from config.settings import (
+    MODEL_DIR, EMBEDDING_BACKEND, QUANTIZED_MODEL_DIR, MODEL_MEMORY_BUDGET_MB, MODEL_IDLE_TTL
+)
+
+BACKENDS = ("fp32", "int8")
+
+# Key of the saved int8 weights holding the fingerprint of the fp32 weights they came from
+SOURCE_FINGERPRINT_KEY = "source_fingerprint"
+
+
+def _swap_linear_layers(module: torch.nn.Module) -> None:
+    """Replace every nn.Linear with an empty dynamic int8 Linear of the same shape."""
+    for name, child in module.named_children():
+        if type(child) is torch.nn.Linear:
+            setattr(module, name, torch.ao.nn.quantized.dynamic.Linear(
+                child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8
+            ))
+        else:
+            _swap_linear_layers(child)
+
+
+def _int8_weights(model: torch.nn.Module) -> Dict[str, torch.Tensor]:
+    """
+    Plain-tensor copy of the int8 Linear weights (values, scale, zero point, bias).
+    
+    Quantized tensors are not saved directly: pickling their dtype searches
+    sys.modules, which trips lazily imported transformers submodules.
+    """
+    weights = {}
+    for name, module in model.named_modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight, bias = module._weight_bias()
+            if weight.qscheme() != torch.per_tensor_affine:
+                raise ValueError(f"Unsupported quantization scheme {weight.qscheme()} in '{name}'")
+            weights[f"{name}.int_repr"] = weight.int_repr()
+            weights[f"{name}.scale"] = torch.tensor(weight.q_scale(), dtype=torch.float64)
+            weights[f"{name}.zero_point"] = torch.tensor(weight.q_zero_point())
+            if bias is not None:
+                weights[f"{name}.bias"] = bias.detach()
+    return weights
+
+
+def _weights_fingerprint(model: torch.nn.Module) -> str:
+    """SHA-256 of a model's parameters and buffers (names, dtypes, shapes and values)."""
+    digest = hashlib.sha256()
+    for name, tensor in sorted(model.state_dict().items()):
+        tensor = tensor.detach().cpu().contiguous()
+        digest.update(f"{name}:{tensor.dtype}:{tuple(tensor.shape)}".encode("utf-8"))
+        digest.update(tensor.reshape(-1).view(torch.uint8).numpy())
+    return digest.hexdigest()
+
+
+def _load_int8_weights(model: torch.nn.Module, weights: Dict[str, torch.Tensor]) -> None:
+    """Swap in int8 Linear layers and fill them from ``_int8_weights`` output."""
+    _swap_linear_layers(model)
+    for name, module in model.named_modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight = torch._make_per_tensor_quantized_tensor(
+                weights[f"{name}.int_repr"], float(weights[f"{name}.scale"]), int(weights[f"{name}.zero_point"])
+            )
+            module.set_weight_bias(weight, weights.get(f"{name}.bias"))
+
+
+ModelKey = Tuple[str, str, str]  # (model name, backend, device)
+
+
+def model_nbytes(model: torch.nn.Module) -> int:
+    """
+    Bytes held by a model's parameters and buffers.
+    
+    int8 Linear weights live in packed parameters that ``parameters()`` does
+    not list, so they are counted from the layers themselves. Tied tensors
+    are counted once.
+    """
+    seen = set()
+    total = 0
+    
+    def add(tensor: Optional[torch.Tensor]) -> None:
+        nonlocal total
+        if tensor is None:
+            return
+        key = (tensor.data_ptr(), tensor.nelement())
+        if key not in seen:
+            seen.add(key)
+            total += tensor.nelement() * tensor.element_size()
+    
+    for tensor in model.parameters():
+        add(tensor)
+    for tensor in model.buffers():
+        add(tensor)
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight, bias = module._weight_bias()
+            add(weight)
+            add(bias)
+    return total
+
+
+class _LoadedModel:
+    """A model held by the registry."""
+    __slots__ = ("model", "nbytes", "load_time", "last_used")
+    
+    def __init__(self, model: SentenceTransformer, nbytes: int, load_time: float):
+        self.model = model
+        self.nbytes = nbytes
+        self.load_time = load_time
+        self.last_used = time.time()
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded models, shared by every LazyModelLoader.
+    
+    Loaders take a reference on the models they use. When the measured size
+    of the loaded models exceeds the memory budget, models nobody references
+    are unloaded, least recently used first. Models unused for longer than the
+    idle TTL are unloaded whether referenced or not; the next use reloads them.
+    """
+    
+    def __init__(self, memory_budget_mb: float = None, idle_ttl: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.memory_budget_bytes = int((MODEL_MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb) * 1024 * 1024)
+        self.idle_ttl = MODEL_IDLE_TTL if idle_ttl is None else idle_ttl
+        
+        self._models: "OrderedDict[ModelKey, _LoadedModel]" = OrderedDict()  # least recently used first
+        self._refcounts: Dict[ModelKey, int] = {}
+        self._lock = threading.RLock()  # guards the registry state, never held while loading
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}  # one per model, held while loading it
+        self._sweeper: Optional[threading.Thread] = None
+        
+        self.stats = {
+            "loads": 0,
+            "hits": 0,
+            "budget_evictions": 0,
+            "idle_unloads": 0
+        }
+    
+    def acquire(self, key: ModelKey, load: Callable[[], SentenceTransformer]) -> SentenceTransformer:
+        """Take a reference on a model, loading it with ``load`` if needed."""
+        with self._lock:
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+        try:
+            return self.get(key, load)[0]
+        except Exception:
+            self.release(key)
+            raise
+    
+    def _hit(self, key: ModelKey) -> Optional[SentenceTransformer]:
+        """The loaded model for ``key``, marked as just used, or None. Call with the lock held."""
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        self._models.move_to_end(key)
+        entry.last_used = time.time()
+        self.stats["hits"] += 1
+        return entry.model
+    
+    def get(self, key: ModelKey, load: Callable[[], SentenceTransformer]) -> Tuple[SentenceTransformer, bool]:
+        """
+        The model for ``key`` and whether it was already loaded.
+        
+        Loads it with ``load`` if needed. Does not change its reference count.
+        Loading holds only the lock of this key: concurrent callers never load
+        the same model twice, and other models stay usable in the meantime.
+        """
+        with self._lock:
+            self.evict_idle()
+            model = self._hit(key)
+            if model is not None:
+                return model, True
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        
+        with load_lock:
+            with self._lock:
+                model = self._hit(key)  # loaded by another caller while we waited
+                if model is not None:
+                    return model, True
+            
+            start_time = time.time()
+            model = load()
+            entry = _LoadedModel(model, model_nbytes(model), time.time() - start_time)
+            
+            with self._lock:
+                self._models[key] = entry
+                self.stats["loads"] += 1
+                self.logger.info(f"Registered model {key} ({entry.nbytes / (1024 * 1024):.1f}MB)")
+                self._enforce_budget()
+                self._start_sweeper()
+            return model, False
+    
+    def release(self, key: ModelKey, unload: bool = False) -> None:
+        """
+        Drop a reference taken with ``acquire``.
+        
+        With ``unload`` the model is unloaded at once if no references remain;
+        otherwise it stays loaded until the budget or the idle TTL evicts it.
+        """
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+                return
+            self._refcounts.pop(key, None)
+            if unload:
+                self._unload(key)
+            else:
+                self._enforce_budget()
+    
+    def is_loaded(self, key: ModelKey) -> bool:
+        with self._lock:
+            return key in self._models
+    
+    def nbytes(self, key: ModelKey) -> int:
+        """Measured size of a loaded model (0 if not loaded)."""
+        with self._lock:
+            entry = self._models.get(key)
+            return entry.nbytes if entry is not None else 0
+    
+    def load_time(self, key: ModelKey) -> Optional[float]:
+        with self._lock:
+            entry = self._models.get(key)
+            return entry.load_time if entry is not None else None
+    
+    def _unload(self, key: ModelKey) -> bool:
+        entry = self._models.pop(key, None)
+        if entry is None:
+            return False
+        del entry
+        gc.collect()
+        self.logger.info(f"Unloaded model {key}")
+        return True
+    
+    def _enforce_budget(self) -> None:
+        """Unload unreferenced models, least recently used first, until under the budget."""
+        total = sum(entry.nbytes for entry in self._models.values())
+        for key in list(self._models):
+            if total <= self.memory_budget_bytes:
+                return
+            if self._refcounts.get(key):
+                continue
+            total -= self._models[key].nbytes
+            self._unload(key)
+            self.stats["budget_evictions"] += 1
+        if total > self.memory_budget_bytes:
+            self.logger.warning(
+                f"Models in use take {total / (1024 * 1024):.1f}MB, "
+                f"over the {self.memory_budget_bytes / (1024 * 1024):.0f}MB budget"
+            )
+    
+    def evict_idle(self) -> int:
+        """Unload models unused for longer than the idle TTL; returns how many."""
+        if self.idle_ttl <= 0:
+            return 0
+        with self._lock:
+            cutoff = time.time() - self.idle_ttl
+            idle = [key for key, entry in self._models.items() if entry.last_used < cutoff]
+            for key in idle:
+                self._unload(key)
+            self.stats["idle_unloads"] += len(idle)
+            return len(idle)
+    
+    def _start_sweeper(self) -> None:
+        """Unload idle models in the background, also while nothing uses the registry."""
+        if self.idle_ttl <= 0 or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        self._sweeper = threading.Thread(target=self._sweep, name="model-registry-sweeper", daemon=True)
+        self._sweeper.start()
+    
+    def _sweep(self) -> None:
+        while True:
+            time.sleep(min(self.idle_ttl, 5.0))
+            with self._lock:
+                self.evict_idle()
+                if not self._models:
+                    self._sweeper = None
+                    return
+    
+    def clear(self) -> int:
+        """Unload every model (references are kept; the next use reloads)."""
+        with self._lock:
+            keys = list(self._models)
+            for key in keys:
+                self._unload(key)
+            return len(keys)
+    
+    def _after_fork_in_child(self) -> None:
+        # The locks may have been held by another thread at fork time, and the
+        # sweeper thread does not exist in the child; the loaded models are inherited
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self._sweeper = None
+        if self._models:
+            self._start_sweeper()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                "loaded_models": [
+                    {
+                        "model": key[0],
+                        "backend": key[1],
+                        "device": key[2],
+                        "memory_mb": round(entry.nbytes / (1024 * 1024), 1),
+                        "references": self._refcounts.get(key, 0),
+                        "idle_s": round(now - entry.last_used, 1)
+                    }
+                    for key, entry in self._models.items()
+                ],
+                "memory_mb": round(sum(entry.nbytes for entry in self._models.values()) / (1024 * 1024), 1),
+                "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1),
+                "idle_ttl_s": self.idle_ttl,
+                **self.stats
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(after_in_child=_registry._after_fork_in_child)
+    return _registry
 
 
 class LazyModelLoader:
@@ -15,24 +349,32 @@ class LazyModelLoader:
     
     Features:
     - Lazy loading: Models loaded only when needed
-    - Memory management: Automatic cleanup and garbage collection
+    - Shared models: loaded models live in the process-wide ModelRegistry, so
+      every loader in the process uses the same copy
+    - Memory management: measured model sizes, memory budget and idle TTL
     - Thread-safe: Multiple threads can safely access the loader
-    - Cache management: Intelligent model caching with size limits
+    - Cache management: least recently used models released above the size limit
     - Performance tracking: Load time monitoring and statistics
+    - int8 backend: dynamically quantized Linear layers on CPU, saved to disk once
     """
     
-    def __init__(self, cache_size_limit: int = 1):
+    def __init__(self, cache_size_limit: int = 1, backend: str = None):
         """
         Initialize the lazy model loader.
         
         Args:
-            cache_size_limit: Maximum number of models to keep in memory
+            cache_size_limit: Maximum number of models this loader keeps a reference on
+            backend: "fp32" or "int8" (default: EMBEDDING_BACKEND)
         """
         self.logger = logging.getLogger(__name__)
         self.cache_size_limit = cache_size_limit
+        self.backend = backend or EMBEDDING_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend}', expected one of {BACKENDS}")
         
-        # Thread-safe model cache
-        self._models: Dict[str, SentenceTransformer] = {}
+        # Models this loader references in the shared registry, least recently used first
+        self.registry = get_model_registry()
+        self._held: "OrderedDict[str, ModelKey]" = OrderedDict()
         self._model_load_times: Dict[str, float] = {}
         self._access_count: Dict[str, int] = {}
         self._lock = threading.RLock()
@@ -50,7 +392,7 @@ class LazyModelLoader:
         self.model_dir = Path(MODEL_DIR)
         self.model_dir.mkdir(parents=True, exist_ok=True)
         
-        self.logger.info(f"LazyModelLoader initialized with cache limit: {cache_size_limit}")
+        self.logger.info(f"LazyModelLoader initialized with cache limit: {cache_size_limit}, backend: {self.backend}")
     
     def load_on_demand(self, model_name: str, device: str = "cpu") -> Optional[SentenceTransformer]:
         """
@@ -63,88 +405,167 @@ class LazyModelLoader:
         Returns:
             Loaded SentenceTransformer model or None if loading fails
         """
+        key = (model_name, self.backend, device)
         with self._lock:
-            # Check if model is already cached
-            if model_name in self._models:
-                self.stats["cache_hits"] += 1
-                self._access_count[model_name] += 1
-                self.logger.debug(f"Model '{model_name}' loaded from cache")
-                return self._models[model_name]
-            
-            # Cache miss - need to load model
-            self.stats["cache_misses"] += 1
-            self.logger.info(f"Loading model '{model_name}' on device '{device}'...")
+            if self._held.get(model_name, key) != key:
+                self._release(model_name)  # same model requested on another device
+            cached = self.registry.is_loaded(key)
             
             try:
-                start_time = time.time()
-                
-                # Check if we need to clear cache first
-                self._manage_cache_size()
-                
-                # Load the model
-                model = SentenceTransformer(model_name, device=device)
-                model.eval()  # Set to evaluation mode for inference
-                
+                if model_name in self._held:
+                    model = self.registry.get(key, lambda: self._load(model_name, device))[0]
+                    self._held.move_to_end(model_name)
+                else:
+                    # Check if we need to release a model first
+                    self._manage_cache_size()
+                    model = self.registry.acquire(key, lambda: self._load(model_name, device))
+                    self._held[model_name] = key
+                    self._access_count[model_name] = 0
+            except Exception as e:
+                self.logger.error(f"Failed to load model '{model_name}': {e}")
+                return None
+            
+            self._access_count[model_name] += 1
+            if cached:
+                self.stats["cache_hits"] += 1
+                self.logger.debug(f"Model '{model_name}' loaded from cache")
+            else:
                 # Track loading performance
-                load_time = time.time() - start_time
+                load_time = self.registry.load_time(key) or 0.0
                 self._model_load_times[model_name] = load_time
-                self._access_count[model_name] = 1
+                self.stats["cache_misses"] += 1
                 self.stats["models_loaded"] += 1
                 self.stats["total_load_time"] += load_time
-                
-                # Cache the model
-                self._models[model_name] = model
-                
-                self.logger.info(f"Model '{model_name}' loaded successfully in {load_time:.2f}s")
-                return model
-                
+            return model
+    
+    def _load(self, model_name: str, device: str) -> SentenceTransformer:
+        """Load a model from disk (called by the registry on a miss)."""
+        self.logger.info(f"Loading model '{model_name}' on device '{device}'...")
+        start_time = time.time()
+        
+        if self.backend == "int8" and device == "cpu":
+            model = self._load_quantized(model_name)
+        else:
+            if self.backend == "int8":
+                self.logger.warning(f"int8 backend is CPU only, loading fp32 model on '{device}'")
+            model = SentenceTransformer(model_name, device=device)
+        model.eval()  # Set to evaluation mode for inference
+        
+        self.logger.info(f"Model '{model_name}' loaded successfully in {time.time() - start_time:.2f}s")
+        return model
+    
+    def quantized_model_path(self, model_name: str) -> Path:
+        """
+        File of the int8 weights of a model.
+        """
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_")
+        return Path(QUANTIZED_MODEL_DIR) / f"{safe_name}-int8.pt"
+    
+    def _load_quantized(self, model_name: str) -> SentenceTransformer:
+        """
+        Load the dynamically quantized model, quantizing and saving it on first use.
+        
+        Later loads swap in empty int8 Linear layers and fill them with the saved
+        int8 values, so the weights are not re-quantized. The saved file records
+        a fingerprint of the fp32 weights it was quantized from; when the model
+        files change (a new revision under the same name), it is re-quantized.
+        Falls back to the fp32 model if quantization is not supported here.
+        """
+        model = SentenceTransformer(model_name, device="cpu")
+        model.eval()
+        fingerprint = _weights_fingerprint(model)
+        
+        path = self.quantized_model_path(model_name)
+        if path.exists():
+            try:
+                saved = torch.load(path, map_location="cpu", weights_only=True)
+                if saved.get(SOURCE_FINGERPRINT_KEY) == fingerprint:
+                    _load_int8_weights(model, saved)
+                    self.logger.info(f"Loaded int8 weights from {path}")
+                    return model
+                self.logger.info(f"int8 weights in {path} come from other fp32 weights, re-quantizing")
             except Exception as e:
-                self.logger.error(f"Failed to load model '{model_name}': {e}")
-                return None
+                self.logger.warning(f"Failed to load int8 weights from {path}, re-quantizing: {e}")
+                model = SentenceTransformer(model_name, device="cpu")
+                model.eval()
+        
+        try:
+            start_time = time.time()
+            quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.logger.info(f"Quantized '{model_name}' to int8 in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            self.logger.warning(f"int8 quantization failed, using fp32 model: {e}")
+            return model
+        
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            weights = _int8_weights(quantized)
+            weights[SOURCE_FINGERPRINT_KEY] = fingerprint
+            torch.save(weights, temp_path)
+            os.replace(temp_path, path)  # atomic, concurrent workers never see a partial file
+            self.logger.info(f"Saved int8 weights to {path}")
+        except Exception as e:
+            self.logger.warning(f"Failed to save int8 weights to {path}: {e}")
+            temp_path.unlink(missing_ok=True)
+        return quantized
     
     def _manage_cache_size(self) -> None:
-        """Manage cache size by removing least recently used models."""
-        if len(self._models) >= self.cache_size_limit:
-            # Find least recently used model
-            lru_model = min(self._access_count.items(), key=lambda x: x[1])[0]
-            self.clear_model(lru_model)
-            self.logger.info(f"Removed LRU model '{lru_model}' from cache")
+        """Release the least recently used models until there is room for one more."""
+        while self._held and len(self._held) >= self.cache_size_limit:
+            lru_model = next(iter(self._held))
+            self._release(lru_model)
+            self.logger.info(f"Released LRU model '{lru_model}'")
+    
+    def _release(self, model_name: str, unload: bool = False) -> None:
+        key = self._held.pop(model_name, None)
+        if key is None:
+            return
+        self._access_count.pop(model_name, None)
+        self._model_load_times.pop(model_name, None)
+        self.registry.release(key, unload=unload)
     
     def clear_model(self, model_name: str) -> None:
         """
         Clear a specific model from cache.
         
+        The model is unloaded unless another loader in the process still uses it.
+        
         Args:
             model_name: Name of the model to clear
         """
         with self._lock:
-            if model_name in self._models:
-                del self._models[model_name]
-                del self._access_count[model_name]
-                if model_name in self._model_load_times:
-                    del self._model_load_times[model_name]
-                
-                # Force garbage collection
-                gc.collect()
+            if model_name in self._held:
+                self._release(model_name, unload=True)
                 self.stats["memory_clears"] += 1
                 
                 self.logger.info(f"Cleared model '{model_name}' from cache")
     
     def clear_all_cache(self) -> None:
-        """Clear all models from cache and force garbage collection."""
+        """Clear all models of this loader; models other loaders still use stay loaded."""
         with self._lock:
-            model_count = len(self._models)
+            model_count = len(self._held)
             
-            self._models.clear()
-            self._access_count.clear()
-            self._model_load_times.clear()
+            for model_name in list(self._held):
+                self._release(model_name, unload=True)
             
-            # Aggressive garbage collection
-            gc.collect()
             self.stats["memory_clears"] += model_count
             
             self.logger.info(f"Cleared all {model_count} models from cache")
     
+    def release_all(self) -> None:
+        """Drop this loader's references; the registry keeps the models for other users until evicted."""
+        with self._lock:
+            for model_name in list(self._held):
+                self._release(model_name)
+    
+    def _loaded_model(self, model_name: str) -> Optional[SentenceTransformer]:
+        """The model if this loader holds it and it is loaded, without loading it."""
+        key = self._held.get(model_name)
+        if key is None or not self.registry.is_loaded(key):
+            return None
+        return self.registry.get(key, lambda: self._load(model_name, key[2]))[0]
+    
     def preload_model(self, model_name: str, device: str = "cpu") -> bool:
         """
         Preload a model for faster access later.
@@ -171,12 +592,13 @@ class LazyModelLoader:
             True if model is loaded, False otherwise
         """
         with self._lock:
-            return model_name in self._models
+            key = self._held.get(model_name)
+            return key is not None and self.registry.is_loaded(key)
     
     def get_loaded_models(self) -> list:
         """Get list of currently loaded model names."""
         with self._lock:
-            return list(self._models.keys())
+            return [model_name for model_name, key in self._held.items() if self.registry.is_loaded(key)]
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -193,9 +615,9 @@ class LazyModelLoader:
             
             return {
                 "cache_stats": {
-                    "models_currently_loaded": len(self._models),
+                    "models_currently_loaded": len(self.get_loaded_models()),
                     "cache_size_limit": self.cache_size_limit,
-                    "loaded_models": list(self._models.keys()),
+                    "loaded_models": self.get_loaded_models(),
                     "cache_hit_rate": f"{hit_rate:.1f}%",
                     "cache_hits": self.stats["cache_hits"],
                     "cache_misses": self.stats["cache_misses"],
@@ -207,7 +629,8 @@ class LazyModelLoader:
                     "avg_load_time": f"{avg_load_time:.2f}s",
                     "model_load_times": dict(self._model_load_times),
                     "access_counts": dict(self._access_count)
-                }
+                },
+                "registry_stats": self.registry.get_stats()
             }
     
     def optimize_for_inference(self, model_name: str) -> bool:
@@ -221,12 +644,12 @@ class LazyModelLoader:
             True if optimization successful, False otherwise
         """
         with self._lock:
-            if model_name not in self._models:
+            model = self._loaded_model(model_name)
+            if model is None:
                 self.logger.warning(f"Model '{model_name}' not loaded, cannot optimize")
                 return False
             
             try:
-                model = self._models[model_name]
                 
                 # Set to evaluation mode
                 model.eval()
@@ -246,16 +669,24 @@ class LazyModelLoader:
     
     def get_memory_usage(self) -> Dict[str, Any]:
         """
-        Get estimated memory usage of loaded models.
+        Get measured memory usage of loaded models (parameters and buffers).
         
         Returns:
             Dictionary with memory usage information
         """
-        memory_info = {
-            "loaded_models": len(self._models),
-            "estimated_memory_mb": len(self._models) * 80,  # Rough estimate for MiniLM
-            "cache_utilization": f"{len(self._models)}/{self.cache_size_limit}"
-        }
+        with self._lock:
+            loaded = self.get_loaded_models()
+            model_bytes = sum(self.registry.nbytes(self._held[model_name]) for model_name in loaded)
+            registry_stats = self.registry.get_stats()
+            
+            memory_info = {
+                "loaded_models": len(loaded),
+                "backend": self.backend,
+                "memory_mb": round(model_bytes / (1024 * 1024), 1),
+                "process_models_memory_mb": registry_stats["memory_mb"],
+                "memory_budget_mb": registry_stats["memory_budget_mb"],
+                "cache_utilization": f"{len(loaded)}/{self.cache_size_limit}"
+            }
         
         return memory_info
     
@@ -294,8 +725,8 @@ class LazyModelLoader:
             self.logger.warning(f"Model warmup failed: {e}")
     
     def __del__(self):
-        """Cleanup when loader is destroyed."""
+        """Drop this loader's references when it is destroyed."""
         try:
-            self.clear_all_cache()
+            self.release_all()
         except Exception:
             pass  # Ignore errors during cleanup
\ No newline at end of file
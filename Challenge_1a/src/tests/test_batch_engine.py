@@ -0,0 +1,53 @@
+"""
+Tests for the multi-process batch engine.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from src.core.batch_engine import BatchEngine
+from src.utils.cpu_scheduler import THREAD_ENV_VARS
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDFS = BASE_DIR / "sample_dataset" / "pdfs"
+
+
+@pytest.fixture
+def pdf_paths(monkeypatch):
+    monkeypatch.setenv("FAST_MODE", "true")
+    monkeypatch.setenv("RESULT_CACHE", "false")
+    return sorted(str(path) for path in SAMPLE_PDFS.glob("*.pdf"))
+
+
+def test_worker_pool_matches_in_process(pdf_paths):
+    torch = pytest.importorskip("torch")
+    # Run an intra-op parallel region first: its thread pool must not leak into workers
+    torch.ones(256, 256) @ torch.ones(256, 256)
+
+    pool_engine = BatchEngine(round1a=True, cpu_split="2:1")
+    assert pool_engine._get_mp_context().get_start_method() in ("forkserver", "spawn")
+    pooled = pool_engine.run(pdf_paths)
+    in_process = BatchEngine(round1a=True, cpu_split="1:1").run(pdf_paths)
+
+    assert pool_engine.last_split.workers == 2
+    assert not pooled["failed"] and not in_process["failed"]
+    assert pooled["results"] == in_process["results"]
+
+
+def test_in_process_batch_restores_thread_limits(pdf_paths, monkeypatch):
+    torch = pytest.importorskip("torch")
+    for name in THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "1")
+    torch_threads = torch.get_num_threads()
+
+    engine = BatchEngine(round1a=True, cpu_split="1:3")
+    assert not engine.run(pdf_paths[:1])["failed"]
+
+    assert engine.last_split.workers == 1
+    assert all(os.environ[name] == "1" for name in THREAD_ENV_VARS)
+    assert torch.get_num_threads() == torch_threads
@@ -0,0 +1,110 @@
+"""
+Tests for the benchmark report statistics and the baseline comparison.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import pytest
+
+from src.benchmarks.runner import COMPARED_METRICS, compare_to_baseline, percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([], 50, 0.0),
+    ([7.0], 95, 7.0),
+    ([1.0, 2.0, 3.0, 4.0], 0, 1.0),
+    ([1.0, 2.0, 3.0, 4.0], 100, 4.0),
+    ([4.0, 1.0, 3.0, 2.0], 50, 2.5),
+    ([1.0, 2.0, 3.0, 4.0, 5.0], 95, 4.8),
+    ([10.0, 20.0], 25, 12.5),
+])
+def test_percentile(values, pct, expected):
+    assert percentile(values, pct) == pytest.approx(expected)
+
+
+def test_percentile_matches_numpy():
+    np = pytest.importorskip("numpy")
+    values = list(np.random.default_rng(0).random(101) * 1000)
+    for pct in (1, 50, 90, 95, 99):
+        assert percentile(values, pct) == pytest.approx(np.percentile(values, pct))
+
+
+def _scenario(p50_ms=100.0, p95_ms=200.0, pages_per_sec=50.0, peak_rss_mb=1000.0):
+    group = {"p50_ms": p50_ms, "p95_ms": p95_ms, "pages_per_sec": pages_per_sec}
+    return {"peak_rss_mb": peak_rss_mb, "overall": dict(group), "corpora": {"sample_dataset": dict(group)}}
+
+
+def _report(**scenarios):
+    return {"scenarios": scenarios}
+
+
+THRESHOLDS = {"p50_ms": 0.25, "p95_ms": 0.35, "pages_per_sec": 0.25, "peak_rss_mb": 0.20}
+
+
+def _by_key(comparisons):
+    return {(c["scenario"], c["group"], c["metric"]): c for c in comparisons}
+
+
+def test_unchanged_report_has_no_regressions():
+    baseline = _report(**{"fast-cold": _scenario()})
+    comparisons = compare_to_baseline(baseline, baseline, THRESHOLDS)
+    # peak RSS per scenario, three metrics for overall and for each corpus
+    assert len(comparisons) == 7
+    assert not any(c["regression"] for c in comparisons)
+    assert all(c["change"] == 0 for c in comparisons)
+
+
+def test_regressions_follow_the_bad_direction_of_each_metric():
+    baseline = _report(**{"fast-cold": _scenario()})
+    current = _report(**{"fast-cold": _scenario(p50_ms=130.0, p95_ms=260.0, pages_per_sec=30.0, peak_rss_mb=1100.0)})
+    comparisons = _by_key(compare_to_baseline(current, baseline, THRESHOLDS))
+
+    p50 = comparisons[("fast-cold", "overall", "p50_ms")]
+    assert p50["change"] == pytest.approx(0.3) and p50["regression"]
+    assert not comparisons[("fast-cold", "overall", "p95_ms")]["regression"]  # +30% within 35%
+    throughput = comparisons[("fast-cold", "sample_dataset", "pages_per_sec")]
+    assert throughput["change"] == pytest.approx(-0.4) and throughput["regression"]
+    assert not comparisons[("fast-cold", "scenario", "peak_rss_mb")]["regression"]  # +10% within 20%
+
+
+def test_improvements_are_not_regressions():
+    baseline = _report(**{"fast-warm": _scenario()})
+    current = _report(**{"fast-warm": _scenario(p50_ms=10.0, p95_ms=20.0, pages_per_sec=500.0, peak_rss_mb=100.0)})
+    assert not any(c["regression"] for c in compare_to_baseline(current, baseline, THRESHOLDS))
+
+
+def test_threshold_overrides_merge_with_the_settings():
+    baseline = _report(**{"fast-cold": _scenario()})
+    current = _report(**{"fast-cold": _scenario(p95_ms=260.0)})
+
+    strict = _by_key(compare_to_baseline(current, baseline, {"p95_ms": 0.1}))
+    assert strict[("fast-cold", "overall", "p95_ms")]["threshold"] == 0.1
+    assert strict[("fast-cold", "overall", "p95_ms")]["regression"]
+    # Metrics the overrides leave out keep their BENCHMARK_THRESHOLDS value
+    assert all(c["threshold"] is not None for c in strict.values())
+    assert set(COMPARED_METRICS) == {metric for _, _, metric in strict}
+
+
+def test_missing_failed_and_zero_baselines_are_skipped():
+    baseline = _report(**{
+        "fast-cold": _scenario(),
+        "fast-warm": {"scenario": "fast-warm", "error": "timed out"},
+        "semantic-cold": _scenario(p50_ms=0.0),
+    })
+    current = _report(**{
+        "fast-cold": {"scenario": "fast-cold", "error": "exit code 1"},
+        "fast-warm": _scenario(p50_ms=1000.0),
+        "semantic-cold": _scenario(p50_ms=1000.0),
+        "semantic-warm": _scenario(p50_ms=1000.0),  # not in the baseline
+    })
+    comparisons = compare_to_baseline(current, baseline, THRESHOLDS)
+    assert {c["scenario"] for c in comparisons} == {"semantic-cold"}
+    assert not any(c["metric"] == "p50_ms" for c in comparisons)
+    assert not any(c["regression"] for c in comparisons)
+
+
+def test_groups_missing_from_the_baseline_are_skipped():
+    baseline = _report(**{"fast-cold": _scenario()})
+    scenario = _scenario()
+    scenario["corpora"]["synthetic"] = {"p50_ms": 1e6, "p95_ms": 1e6, "pages_per_sec": 0.1}
+    comparisons = compare_to_baseline(_report(**{"fast-cold": scenario}), baseline, THRESHOLDS)
+    assert "synthetic" not in {c["group"] for c in comparisons}
@@ -0,0 +1,72 @@
+"""
+Tests for candidate generation over page shards.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+from pathlib import Path
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from src.core import candidate_generator
+from src.core.candidate_generator import CandidateGenerator
+from src.utils.document_cache import DocumentCache
+
+PAGE_COUNT = 12
+
+
+@pytest.fixture(scope="module")
+def long_pdf(tmp_path_factory) -> Path:
+    """Chapters with numbered sections, a running header and body text on every page."""
+    path = tmp_path_factory.mktemp("shards") / "long.pdf"
+    document = fitz.open()
+    for page_num in range(PAGE_COUNT):
+        page = document.new_page()
+        page.insert_text((72, 40), "Annual Report Running Header", fontsize=8)
+        page.insert_text((72, 90), f"Chapter {page_num + 1} Overview", fontsize=18, fontname="hebo")
+        for section in range(3):
+            y = 140 + section * 200
+            page.insert_text((72, y), f"{page_num + 1}.{section + 1} Section Findings", fontsize=13,
+                             fontname="hebo")
+            for line in range(8):
+                page.insert_text((72, y + 24 + line * 14),
+                                 f"body text of section {section + 1} on page {page_num + 1}, line {line}.",
+                                 fontsize=10)
+    document.save(str(path))
+    document.close()
+    return path
+
+
+def _candidates(pdf_path: Path, page_workers: int, in_memory: bool = False):
+    generator = CandidateGenerator(language="auto", page_workers=page_workers)
+    if in_memory:
+        document = DocumentCache.from_buffer(pdf_path.read_bytes(), name=pdf_path.name)
+    else:
+        document = DocumentCache(str(pdf_path))
+    with document:
+        candidates = generator.generate_candidates(str(pdf_path), document=document)
+    return [(c.text, c.page, c.bbox, c.font_size, c.confidence_score, repr(c.features)) for c in candidates]
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_sharded_candidates_match_serial(long_pdf, monkeypatch, in_memory):
+    # Loading torch in the caller must not turn sharding off
+    pytest.importorskip("torch")
+    monkeypatch.setattr(candidate_generator, "PAGE_SHARD_MIN_PAGES", 4)
+    sharded_calls = []
+    extract_sharded = CandidateGenerator._extract_sharded_candidates
+
+    def spy(self, *args, **kwargs):
+        sharded_calls.append(args[1])
+        return extract_sharded(self, *args, **kwargs)
+
+    monkeypatch.setattr(CandidateGenerator, "_extract_sharded_candidates", spy)
+
+    serial = _candidates(long_pdf, page_workers=1, in_memory=in_memory)
+    assert not sharded_calls
+    sharded = _candidates(long_pdf, page_workers=2, in_memory=in_memory)
+
+    assert sharded_calls == [list(range(1, PAGE_COUNT))]
+    assert serial
+    assert sharded == serial
@@ -0,0 +1,141 @@
+"""
+Tests for the warm extraction daemon.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import io
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("the daemon needs Unix domain sockets", allow_module_level=True)
+
+from src.daemon import ExtractionDaemon, daemon_status, stop_daemon
+from src.daemon.client import read_frames
+from src.utils.cpu_scheduler import THREAD_ENV_VARS
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDFS = BASE_DIR / "sample_dataset" / "pdfs"
+
+
+def _extract_options(**overrides):
+    options = dict(pdf_path=str(SAMPLE_PDFS / "file03.pdf"), output=None, debug=False, language="auto",
+                   round1a=False, preload=False, fast_mode=True, warmup=False, accessibility=False,
+                   metadata=False, workers=None, cpu_split=None, stream=False, trace_path=None,
+                   trace_sample_rate=None)
+    options.update(overrides)
+    return options
+
+
+def test_request_restores_process_state(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    for name in THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "1")
+    root_logger = logging.getLogger()
+    monkeypatch.setattr(root_logger, "level", logging.WARNING)
+    torch_threads = torch.get_num_threads()
+
+    daemon = ExtractionDaemon(socket_path=tmp_path / "unused.sock", preload=False)
+    stream = io.BytesIO()
+    frame = {
+        "command": "extract",
+        "cwd": str(tmp_path),
+        "env": {"FAST_MODE": "true", "RESULT_CACHE": "false", "INCLUDE_METADATA": "false"},
+        "options": _extract_options(debug=True, cpu_split="1:3"),
+    }
+    daemon.handle(frame, stream)
+
+    stream.seek(0)
+    frames = list(read_frames(stream))
+    assert frames[-1] == {"exit": None}
+    assert _result(''.join(frame.get("stdout", "") for frame in frames))["outline"]
+    assert all(os.environ[name] == "1" for name in THREAD_ENV_VARS)
+    assert torch.get_num_threads() == torch_threads
+    assert root_logger.level == logging.WARNING
+
+
+def _result(stdout: str):
+    """The JSON result printed by extract (PyMuPDF may print a warning before it)."""
+    return json.loads(stdout[stdout.index("{"):])
+
+
+def _wait_for_daemon(socket_path: Path, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            pytest.fail(f"daemon exited with {process.returncode}")
+        status = daemon_status(socket_path)
+        if status is not None:
+            return status
+        time.sleep(0.2)
+    pytest.fail("daemon did not start")
+
+
+def test_daemon_output_matches_in_process():
+    # Unix socket paths are limited to about 100 bytes, so keep it short
+    socket_path = Path("/tmp") / f"extractd-test-{os.getpid()}.sock"
+    env = dict(os.environ, EXTRACT_DAEMON_SOCKET=str(socket_path), RESULT_CACHE="false")
+    command = [sys.executable, "-m", "src.main"]
+
+    daemon = subprocess.Popen(command + ["daemon", "--no-preload"], cwd=BASE_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_daemon(socket_path, daemon)
+        extract = command + ["extract", str(SAMPLE_PDFS / "file03.pdf"), "--fast-mode", "--round1a",
+                             "--cpu-split", "1:2"]
+        daemon_run = subprocess.run(extract, cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True)
+        assert daemon_status(socket_path)["requests"] == 1
+        in_process_run = subprocess.run(extract + ["--no-daemon"], cwd=BASE_DIR, env=env, check=True,
+                                        capture_output=True, text=True)
+        assert daemon_status(socket_path)["requests"] == 1
+    finally:
+        stop_daemon(socket_path)
+        try:
+            daemon.wait(30)
+        except subprocess.TimeoutExpired:
+            daemon.kill()
+
+    daemon_result = _result(daemon_run.stdout)
+    in_process_result = _result(in_process_run.stdout)
+    assert daemon_result["outline"]
+    assert daemon_result == in_process_result
+
+
+HEAVY_MODULES = ("fitz", "numpy", "torch")
+
+LOADED_BY_CLIENT = f"""
+import sys
+import src.daemon.client
+print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+LOADED_BEFORE_FORWARDING = f"""
+import sys
+import src.daemon.client as client
+
+def forward_extract(options):
+    print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+    return 0
+
+client.forward_extract = forward_extract
+from src.main import cli
+cli(["extract", sys.argv[1], "--fast-mode", "--cpu-split", "1:2"], standalone_mode=False)
+"""
+
+
+@pytest.mark.parametrize("script", [LOADED_BY_CLIENT, LOADED_BEFORE_FORWARDING],
+                         ids=["import", "extract"])
+def test_client_does_not_load_the_pipeline(script):
+    # A fresh interpreter: this test process has imported everything already
+    run = subprocess.run([sys.executable, "-c", script, str(SAMPLE_PDFS / "file01.pdf")], cwd=BASE_DIR,
+                         check=True, capture_output=True, text=True)
+    assert run.stdout.strip().splitlines()[-1] == "[]"
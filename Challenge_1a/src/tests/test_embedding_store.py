@@ -0,0 +1,108 @@
+"""
+Tests for the shared memory-mapped embedding store.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.utils import embedding_store
+from src.utils.embedding_store import EmbeddingStore
+
+DIM = 4
+
+
+def _vector(key: str) -> np.ndarray:
+    """Distinct, reproducible vector for a key."""
+    seed = int.from_bytes(key.encode("utf-8")[-4:].rjust(4, b"\0"), "little")
+    return np.random.default_rng(seed).random(DIM).astype(np.float32)
+
+
+def _assert_correct_or_missing(store: EmbeddingStore, keys):
+    """A lookup may miss, but must never return another key's vector."""
+    for key, value in zip(keys, store.get_many(keys)):
+        if value is not None:
+            np.testing.assert_array_equal(value, _vector(key), err_msg=f"wrong vector for {key}")
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr(embedding_store, "SHARD_ROWS", 8)
+
+
+def _put_range(store_dir: str, worker: int, count: int) -> None:
+    store = EmbeddingStore("test", store_dir=store_dir)
+    for start in range(0, count, 5):
+        keys = [f"w{worker}-{i}" for i in range(start, min(start + 5, count))] + ["shared-0", "shared-1"]
+        store.put_many(keys, [_vector(key) for key in keys])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_put_many(tmp_path, small_shards):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_put_range, args=(str(tmp_path), worker, 40)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = EmbeddingStore("test", store_dir=tmp_path)
+    keys = [f"w{worker}-{i}" for worker in range(4) for i in range(40)] + ["shared-0", "shared-1"]
+    values = store.get_many(keys)
+    assert all(value is not None for value in values)
+    for key, value in zip(keys, values):
+        np.testing.assert_array_equal(value, _vector(key))
+    assert len(store) == len(keys)  # shared keys stored once
+
+
+def test_eviction_and_reader_reload(tmp_path, small_shards):
+    writer = EmbeddingStore("test", store_dir=tmp_path, max_size_mb=0.0015)  # about 6 shards of 8 rows
+    reader = EmbeddingStore("test", store_dir=tmp_path)
+
+    first = [f"old-{i}" for i in range(16)]
+    writer.put_many(first, [_vector(key) for key in first])
+    _assert_correct_or_missing(reader, first)
+    assert all(value is not None for value in reader.get_many(first))
+
+    later = [f"new-{i}" for i in range(80)]
+    for start in range(0, len(later), 8):
+        batch = later[start:start + 8]
+        writer.put_many(batch, [_vector(key) for key in batch])
+    assert writer.stats["evictions"] > 0
+
+    # The reader picks up the rewritten index on a miss and never mixes rows up
+    assert reader.get(later[-1]) is not None
+    _assert_correct_or_missing(reader, first + later)
+    assert reader.get(first[0]) is None
+    assert len(reader) == len(writer)
+
+
+def test_clear_then_refill_invalidates_other_readers(tmp_path):
+    writer = EmbeddingStore("test", store_dir=tmp_path)
+    reader = EmbeddingStore("test", store_dir=tmp_path)
+
+    writer.put_many(["x", "y"], [_vector("x"), _vector("y")])
+    np.testing.assert_array_equal(reader.get("y"), _vector("y"))
+    reader.close()
+
+    writer.clear()
+    writer.put_many(["p", "q"], [_vector("p"), _vector("q")])
+
+    assert reader.get("y") is None
+    assert reader.get("x") is None
+    np.testing.assert_array_equal(reader.get("q"), _vector("q"))
+    np.testing.assert_array_equal(reader.get("p"), _vector("p"))
+
+
+def test_clear_never_reuses_shard_numbers(tmp_path, small_shards):
+    store = EmbeddingStore("test", store_dir=tmp_path)
+    keys = [f"k{i}" for i in range(20)]
+    store.put_many(keys, [_vector(key) for key in keys])
+    used = set(store._shard_numbers())
+
+    store.clear()
+    store.put_many(["after"], [_vector("after")])
+    assert not used & set(store._shard_numbers())
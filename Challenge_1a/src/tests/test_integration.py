@@ -0,0 +1,75 @@
+"""
+Integration tests for the extraction pipeline.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDF = BASE_DIR / "sample_dataset" / "pdfs" / "file03.pdf"
+
+# The ML stack and NLTK belong to semantic mode only
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "sklearn", "scipy", "nltk")
+FAST_IMPORT_BUDGET_S = 1.0  # importing the fast pipeline, measured in a fresh interpreter
+
+# Runs in a fresh interpreter: times the imports a fast-mode extract needs,
+# records network connections, processes one PDF and reports what got loaded
+_FAST_MODE_PROBE = """
+import sys, json, time, socket
+
+connections = []
+_connect = socket.socket.connect
+def _record_connect(self, address):
+    connections.append(str(address))
+    return _connect(self, address)
+socket.socket.connect = _record_connect
+
+start = time.perf_counter()
+import src.main
+from src.core.pdf_processor import PDFProcessor
+import_s = time.perf_counter() - start
+
+result = PDFProcessor().process(sys.argv[1], include_metadata=False)
+print(json.dumps({
+    "import_s": import_s,
+    "modules": sorted(name.split(".")[0] for name in sys.modules),
+    "connections": connections,
+    "outline": len(result.get("outline", [])),
+}))
+"""
+
+
+@pytest.fixture(scope="module")
+def fast_mode_run():
+    env = dict(os.environ, FAST_MODE="true", RESULT_CACHE="false")
+    completed = subprocess.run(
+        [sys.executable, "-c", _FAST_MODE_PROBE, str(SAMPLE_PDF)],
+        cwd=str(BASE_DIR), env=env, capture_output=True, text=True, timeout=300
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_fast_mode_never_imports_heavy_modules(fast_mode_run):
+    leaked = sorted(set(HEAVY_MODULES) & set(fast_mode_run["modules"]))
+    assert not leaked, f"fast mode imported {leaked}"
+
+
+def test_fast_mode_import_budget(fast_mode_run):
+    assert fast_mode_run["import_s"] < FAST_IMPORT_BUDGET_S, (
+        f"importing the fast pipeline took {fast_mode_run['import_s']:.2f}s "
+        f"(budget {FAST_IMPORT_BUDGET_S}s)"
+    )
+
+
+def test_fast_mode_stays_offline(fast_mode_run):
+    assert fast_mode_run["connections"] == []
+    assert fast_mode_run["outline"] > 0
@@ -0,0 +1,83 @@
+"""
+Tests for the process-wide model registry.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from src.models.lazy_loader import ModelRegistry
+
+KEY_A = ("model-a", "fp32", "cpu")
+KEY_B = ("model-b", "fp32", "cpu")
+
+
+def _registry() -> ModelRegistry:
+    return ModelRegistry(memory_budget_mb=1024, idle_ttl=0)
+
+
+def test_other_models_are_usable_while_one_loads():
+    registry = _registry()
+    loading = threading.Event()
+    finish = threading.Event()
+
+    def slow_load():
+        loading.set()
+        assert finish.wait(30)
+        return torch.nn.Linear(2, 2)
+
+    loader = threading.Thread(target=registry.acquire, args=(KEY_A, slow_load))
+    loader.start()
+    try:
+        assert loading.wait(30)
+        # None of these may wait for model A's load
+        model_b, cached = registry.get(KEY_B, lambda: torch.nn.Linear(3, 3))
+        assert not cached and registry.get(KEY_B, lambda: None) == (model_b, True)
+        assert not registry.is_loaded(KEY_A)
+        assert registry.get_stats()["loads"] == 1
+    finally:
+        finish.set()
+        loader.join(30)
+    assert registry.is_loaded(KEY_A)
+
+
+def test_concurrent_callers_load_a_model_once():
+    registry = _registry()
+    loads = []
+    barrier = threading.Barrier(4)
+
+    def load():
+        loads.append(1)
+        return torch.nn.Linear(2, 2)
+
+    results = []
+
+    def use():
+        barrier.wait()
+        results.append(registry.acquire(KEY_A, load))
+
+    threads = [threading.Thread(target=use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert len(loads) == 1
+    assert len(results) == 4 and all(model is results[0] for model in results)
+    assert registry.get_stats()["loaded_models"][0]["references"] == 4
+
+
+def test_failed_load_drops_the_reference():
+    registry = _registry()
+
+    def broken_load():
+        raise RuntimeError("no weights")
+
+    with pytest.raises(RuntimeError):
+        registry.acquire(KEY_A, broken_load)
+    assert registry.acquire(KEY_A, lambda: torch.nn.Linear(2, 2)) is not None
+    assert registry.get_stats()["loaded_models"][0]["references"] == 1
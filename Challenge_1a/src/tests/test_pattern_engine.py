@@ -0,0 +1,145 @@
+"""
+Tests for the compiled heading pattern engine.
+
+Every family is checked against the regex calls it replaced: the original
+patterns, run one by one with re.search/re.match (on text.lower() or with
+re.IGNORECASE where the original did), in list order.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import re
+from pathlib import Path
+
+import pytest
+
+from config.cultural_patterns import CULTURAL_PATTERNS, HEADING_CONFIDENCE_BOOSTERS
+from src.utils.pattern_engine import (
+    PatternEngine, SHARED_FAMILIES, LANGUAGE_NUMBERING_TYPES, LANGUAGE_SCRIPTS
+)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDFS = BASE_DIR / "sample_dataset" / "pdfs"
+
+LANGUAGES = [None, "english", "japanese", "chinese", "hindi", "arabic"]
+
+
+def _search(pattern, flags=0, lower=False):
+    return lambda text: re.search(pattern, text.lower() if lower else text, flags) is not None
+
+
+def _match(pattern, flags=0, lower=False):
+    return lambda text: re.match(pattern, text.lower() if lower else text, flags) is not None
+
+
+def _literal(keyword):
+    return lambda text: keyword in text
+
+
+# Families whose patterns were rewritten with case classes or (?i:...), as the
+# original code ran them
+REWRITTEN_FAMILIES = {
+    "roman_only": [(_match(r'^[ivxlcdm]+$', lower=True), None)],
+    "skip": [
+        (_search(pattern, lower=True), None)
+        for pattern in (r'^page \d+', r'^\d+/\d+', r'^www\.', r'^http', r'@')
+    ],
+    "heading_numbering": [
+        (_match(pattern, re.IGNORECASE), None)
+        for pattern in (r'^\d+\.', r'^\d+\.\d+', r'^[IVX]+\.', r'^[A-Z]\.', r'^Chapter \d+', r'^Section \d+')
+    ],
+    "non_heading": [
+        (_search(pattern, re.IGNORECASE), None)
+        for pattern in (r'^\d+$', r'^page \d+', r'@', r'http', r'www\.')
+    ],
+    "numbering_level": [
+        (_match(r'^\d+\.\d+\.\d+'), (3, 'decimal_nested_deep')),
+        (_match(r'^\d+\.\d+'), (2, 'decimal_nested')),
+        (_match(r'^\d+\.'), (1, 'decimal')),
+        (_match(r'^[IVX]+\.'), (1, 'roman')),
+        (_match(r'^[A-Z]\.'), (2, 'alpha')),
+        (_search(r'^Chapter \d+', re.IGNORECASE), (1, 'chapter')),
+        (_search(r'^Section \d+', re.IGNORECASE), (2, 'section')),
+    ],
+}
+
+ORIGINAL_DEFAULT_NUMBERING_TYPES = [
+    (_search(r'^\d+\.'), "decimal"),
+    (_search(r'^[IVX]+\.'), "roman"),
+    (_search(r'^[A-Z]\.'), "alpha"),
+    (_search(r'^Chapter', re.IGNORECASE), "chapter"),
+    (_search(r'^Section', re.IGNORECASE), "section"),
+]
+
+
+def original_families(language):
+    """family -> [(predicate, payload)], evaluated the way the original code did."""
+    families = {
+        family: [(_search(pattern), payload) for pattern, payload in entries]
+        for family, entries in SHARED_FAMILIES.items()
+    }
+    families.update(REWRITTEN_FAMILIES)
+
+    cultural = CULTURAL_PATTERNS.get(language, {})
+    families["numbering"] = [(_search(p), p) for p in cultural.get('numbering_patterns', [])]
+    families["heading_style"] = [(_literal(s), s) for s in cultural.get('heading_styles', [])]
+    families["heading_keyword"] = [(_literal(k), k) for k in cultural.get('heading_keywords', [])]
+
+    boosters = HEADING_CONFIDENCE_BOOSTERS.get(language, {})
+    families["booster_pattern"] = [(_search(p), boost) for p, boost in boosters.get('patterns', [])]
+    families["booster_keyword"] = [(_literal(k), boost) for k, boost in boosters.get('keywords', [])]
+
+    families["numbering_type"] = (
+        [(_search(p), name) for p, name in LANGUAGE_NUMBERING_TYPES.get(language, [])]
+        + ORIGINAL_DEFAULT_NUMBERING_TYPES
+    )
+    for feature, pattern in LANGUAGE_SCRIPTS.get(language, {}).items():
+        families[feature] = [(_search(pattern), None)]
+    return families
+
+
+HANDWRITTEN_LINES = [
+    "", " ", "1", "12", "iv", "IV", "xii", "Mix", "...", "(-)", "1.", "1. Introduction",
+    "1.1 Background", "1.1.1 Scope", "1.1.1.1 Detail", "1.1Title", "2/10", "Page 3", "PAGE 12",
+    "page 4 of 9", "www.example.com", "WWW.EXAMPLE.COM", "http://x", "HTTPS://X", "see http://x",
+    "mail@example.com", "I. Overview", "ii. minor", "A. Scope", "a. scope", "(1) First", "(a) item",
+    "a) item", "Chapter 1", "CHAPTER 2 Results", "chapter one", "Section 4", "section 5.2",
+    "Sections", "Chapter一", "Chapter 三", "• bullet", "· dot", "・ 項目", "第一章 序論", "第1章 概要",
+    "第十節", "第2節 方法", "第一部", "第三編", "第4篇", "序章", "終章", "付録", "付録二", "はじめに",
+    "序論", "結論", "まとめ", "引言", "结论", "总结", "参考文献", "謝辞", "致谢", "一、概要", "十二、",
+    "（一）背景", "（3）", "(二)方法", "一. 方法", "一)", "（a）", "(12)", "行3", "ヘッダー2",
+    "これは文です。", "それである。", "完了した。", "実行する。", "表1：結果", "图2: 结构", "圖3：架構",
+    "列表4", "リスト5", "項", "目録", "カタカナ", "ひらがな", "第1部 はじめに 結論",
+    "अध्याय 1 परिचय", "अध्याय २", "१. परिचय", "खंड 3", "भाग", "निष्कर्ष", "प्रकरण ४",
+    "الفصل الأول", "الفصل 2", "١. مقدمة", "٣", "القسم الثاني", "الباب", "خاتمة", "ﺍﻟﻔﺼﻞ",
+    "Introduction", "introduction to methods", "Summary", "Abstract", "Conclusion", "References",
+    "K", "İ", "ﬁ. ligature", "１. 全角",
+]
+
+
+def _sample_lines():
+    fitz = pytest.importorskip("fitz")
+    lines = set()
+    for path in sorted(SAMPLE_PDFS.glob("*.pdf")):
+        with fitz.open(str(path)) as document:
+            for page in document:
+                lines.update(line.strip() for line in page.get_text().splitlines())
+    return sorted(lines)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    lines = HANDWRITTEN_LINES + _sample_lines()
+    return lines + [line.upper() for line in lines] + [line.lower() for line in lines]
+
+
+@pytest.mark.parametrize("language", LANGUAGES)
+def test_engine_matches_original_regex_calls(corpus, language):
+    engine = PatternEngine(language)
+    families = original_families(language)
+    assert set(families) == set(engine._families)
+
+    for family, entries in families.items():
+        for text in corpus:
+            expected = next((payload for matches, payload in entries if matches(text)), "no match")
+            assert engine.first(text, family, "no match") == expected, (family, text)
+            assert engine.any(text, family) == any(matches(text) for matches, _ in entries), (family, text)
@@ -0,0 +1,98 @@
+"""
+Tests for the persistent result cache.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import shutil
+from pathlib import Path
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from src.core.pdf_processor import PDFProcessor
+from src.utils.result_cache import ResultCache
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDFS = BASE_DIR / "sample_dataset" / "pdfs"
+
+
+@pytest.fixture
+def make_processor(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAST_MODE", "true")
+
+    def make(cached: bool = True) -> PDFProcessor:
+        processor = PDFProcessor()
+        processor.result_cache = ResultCache(tmp_path / "cache") if cached else None
+        return processor
+
+    return make
+
+
+def _write_pdf(path: Path, heading_y=None) -> Path:
+    """One page of body text; with ``heading_y``, a bold heading too low on the page to be the title."""
+    document = fitz.open()
+    page = document.new_page()
+    for i in range(8):
+        page.insert_text((72, 100 + i * 14), f"plain body text line number {i} of the report.", fontsize=10)
+    if heading_y is not None:
+        page.insert_text((72, heading_y), "Results and Discussion", fontsize=20, fontname="hebo")
+        for i in range(8):
+            page.insert_text((72, heading_y + 30 + i * 14), f"more body text under the heading line {i}.", fontsize=10)
+    document.save(str(path))
+    document.close()
+    return path
+
+
+def _copies(source: Path, directory: Path):
+    alpha, beta = directory / "alpha_report.pdf", directory / "beta_report.pdf"
+    shutil.copyfile(source, alpha)
+    shutil.copyfile(source, beta)
+    return alpha, beta
+
+
+def test_renamed_copy_reports_its_own_file_name(tmp_path, make_processor):
+    alpha, beta = _copies(SAMPLE_PDFS / "file01.pdf", tmp_path)
+    processor = make_processor()
+
+    processor.process(str(alpha), include_metadata=True)
+    result = processor.process(str(beta), include_metadata=True)
+
+    assert processor.result_cache.stats["hits"] == 1
+    assert result["document_info"]["filename"] == "beta_report.pdf"
+    # Timings belong to this request, not the one that filled the cache
+    assert result["document_info"]["processing_time"] == round(processor.stats["processing_time"], 3)
+
+
+@pytest.mark.parametrize("heading_y, include_metadata", [
+    (500, False),   # no usable title: fallback title made from the file name
+    (500, True),
+    (None, False),  # no headings: the simple format titles it with the file name
+])
+def test_name_derived_titles_follow_the_file(tmp_path, make_processor, heading_y, include_metadata):
+    alpha, beta = _copies(_write_pdf(tmp_path / "source.pdf", heading_y), tmp_path)
+    processor = make_processor()
+
+    first = processor.process(str(alpha), include_metadata=include_metadata)
+    cached = processor.process(str(beta), include_metadata=include_metadata)
+    fresh = make_processor(cached=False).process(str(beta), include_metadata=include_metadata)
+
+    assert processor.result_cache.stats["hits"] == 1
+    if include_metadata:
+        assert first["document_info"]["title"] == "alpha report"
+        assert cached["document_info"]["title"] == fresh["document_info"]["title"] == "beta report"
+    else:
+        assert "alpha" in first["title"]
+        assert cached == fresh
+        assert "beta" in cached["title"]
+
+
+def test_streaming_hit_uses_current_file_name(tmp_path, make_processor):
+    alpha, beta = _copies(_write_pdf(tmp_path / "source.pdf", 500), tmp_path)
+    processor = make_processor()
+
+    list(processor.iter_headings(str(alpha), include_metadata=False))
+    events = list(processor.iter_headings(str(beta), include_metadata=False))
+
+    assert processor.result_cache.stats["hits"] == 1
+    assert events == [{"type": "final", "result": make_processor(cached=False).process(str(beta), include_metadata=False)}]
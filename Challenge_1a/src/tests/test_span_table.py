@@ -0,0 +1,40 @@
+"""
+Tests for the per-page text column index.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from src.benchmarks.synthetic import SyntheticSpec, generate_document
+from src.utils.document_cache import DocumentCache
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SAMPLE_PDFS = BASE_DIR / "sample_dataset" / "pdfs"
+
+
+def test_table_columns_are_not_text_columns():
+    # Page 3 of file02 is a single-column page holding a three-column revision table
+    with DocumentCache(str(SAMPLE_PDFS / "file02.pdf")) as document:
+        assert document.span_table(2).geometry().column_count == 1
+
+
+@pytest.mark.parametrize("columns", [1, 2, 3])
+def test_text_columns_are_found(tmp_path, columns):
+    path = tmp_path / "columns.pdf"
+    generate_document(SyntheticSpec(pages=4, columns=columns, table_ratio=0.0, toc=False), path)
+    with DocumentCache(str(path)) as document:
+        counts = [document.span_table(page).geometry().column_count for page in range(document.page_count)]
+        table = document.span_table(0)
+        geometry = table.geometry()
+    # Every line with text starts inside the column it is assigned to
+    lines = table.has_spans()
+    bounds = geometry.column_bounds[geometry.line_column[lines]]
+    assert ((bounds[:, 0] <= table.line_bbox[lines, 0]) & (table.line_bbox[lines, 0] < bounds[:, 1])).all()
+    assert (geometry.line_column[~lines] == -1).all()
+    # Pages whose text ends before the next column starts have fewer columns
+    assert counts[0] == columns
+    assert max(counts) == columns
@@ -0,0 +1,39 @@
+"""
+Tests for the synthetic benchmark corpus.
+
+Run from Challenge_1a with: python -m pytest src/tests
+"""
+import re
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from config.cultural_patterns import CULTURAL_PATTERNS
+from src.benchmarks.synthetic import (
+    NUMBERING_STYLES, SyntheticSpec, generate_document, evaluate_outline
+)
+
+
+@pytest.mark.parametrize("language", sorted(NUMBERING_STYLES))
+def test_numbering_matches_cultural_patterns(language):
+    known = CULTURAL_PATTERNS[language]["numbering_patterns"] + CULTURAL_PATTERNS["default"]["numbering_patterns"]
+    for style, formatters in NUMBERING_STYLES[language].items():
+        for depth, formatter in enumerate(formatters, start=1):
+            marker = formatter((3,) * depth)
+            assert any(re.match(pattern, marker) for pattern in known), (style, marker)
+
+
+@pytest.mark.parametrize("language", sorted(NUMBERING_STYLES))
+def test_ground_truth_matches_extraction(tmp_path, monkeypatch, language):
+    monkeypatch.setenv("FAST_MODE", "true")
+    from src.core.pdf_processor import PDFProcessor
+
+    path = tmp_path / f"{language}.pdf"
+    truth = generate_document(SyntheticSpec(language=language, pages=6, seed=7), path)
+    processor = PDFProcessor()
+    processor.result_cache = None
+    result = processor.process(str(path), include_metadata=False)
+
+    scores = evaluate_outline(result["outline"], truth["outline"])
+    assert scores["f1"] == 1.0, scores
@@ -1,71 +1,50 @@
-try:
-    from src.utils.validation import (
-        validate_pdf, 
-        validate_extraction_result,
-        get_pdf_info,
-        get_result_validation,
-        PDFValidator,
-        ResultValidator,
-        ValidationError
-    )
+# Utilities are imported on first access, so light entry points (the CPU
+# scheduler used by the extract client of a running daemon) do not load
+# PyMuPDF, NumPy and the text stack just by importing a utils module
+_EXPORTS = {
+    # Validation utilities
+    "validate_pdf": "src.utils.validation",
+    "validate_extraction_result": "src.utils.validation",
+    "get_pdf_info": "src.utils.validation",
+    "get_result_validation": "src.utils.validation",
+    "PDFValidator": "src.utils.validation",
+    "ResultValidator": "src.utils.validation",
+    "ValidationError": "src.utils.validation",
     
-    from src.utils.text_utils import (
-        clean_text,
-        normalize_whitespace,
-        extract_sentences,
-        extract_words,
-        detect_language,
-        is_likely_heading,
-        extract_key_phrases,
-        calculate_text_similarity,
-        get_text_statistics,
-        contains_url_or_email,
-        is_mostly_numeric
-    )
+    # Text processing utilities
+    "clean_text": "src.utils.text_utils",
+    "normalize_whitespace": "src.utils.text_utils",
+    "extract_sentences": "src.utils.text_utils",
+    "extract_words": "src.utils.text_utils",
+    "detect_language": "src.utils.text_utils",
+    "is_likely_heading": "src.utils.text_utils",
+    "extract_key_phrases": "src.utils.text_utils",
+    "calculate_text_similarity": "src.utils.text_utils",
+    "get_text_statistics": "src.utils.text_utils",
+    "contains_url_or_email": "src.utils.text_utils",
+    "is_mostly_numeric": "src.utils.text_utils",
     
-    from src.utils.layout_utils import (
-        LayoutUtils,
-        LayoutRegion,
-        ColumnInfo, 
-        LayoutStructure,
-        Position
-    )
+    # Parsed document cache
+    "DocumentCache": "src.utils.document_cache",
+    "SpanTable": "src.utils.span_table",
+    "LineGeometry": "src.utils.span_table",
     
-    __all__ = [
-        # Validation utilities
-        "validate_pdf",
-        "validate_extraction_result", 
-        "get_pdf_info",
-        "get_result_validation",
-        "PDFValidator",
-        "ResultValidator",
-        "ValidationError",
-        
-        # Text processing utilities
-        "clean_text",
-        "normalize_whitespace",
-        "extract_sentences",
-        "extract_words", 
-        "detect_language",
-        "is_likely_heading",
-        "extract_key_phrases",
-        "calculate_text_similarity",
-        "get_text_statistics",
-        "contains_url_or_email",
-        "is_mostly_numeric",
-        
-        # Layout analysis utilities
-        "LayoutUtils",
-        "LayoutRegion",
-        "ColumnInfo",
-        "LayoutStructure", 
-        "Position"
-    ]
-    
-except ImportError as e:
-    import logging
-    logging.getLogger(__name__).warning(f"Some utility modules not available: {e}")
-    __all__ = []
+    # Layout analysis utilities
+    "LayoutUtils": "src.utils.layout_utils",
+    "LayoutRegion": "src.utils.layout_utils",
+    "ColumnInfo": "src.utils.layout_utils",
+    "LayoutStructure": "src.utils.layout_utils",
+    "Position": "src.utils.layout_utils"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Version info
 __version__ = "1.0.0"
@@ -78,6 +57,15 @@ Key Modules:
     validation: Comprehensive PDF and result validation
     text_utils: Multilingual text processing and analysis
     layout_utils: Advanced spatial layout analysis
+    document_cache: Parse-once PDF page cache shared across pipeline stages
+    span_table: Columnar NumPy view of a page's spans and lines, with a text column index
+    word_index: Normalized per-page word index used for TOC validation
+    result_cache: Content-addressed persistent cache of pipeline results
+    embedding_store: Memory-mapped embedding store shared across processes and projects
+    tracing: Sampled span tracing with Chrome trace export
+    deadline: Cooperative per-document time budget for partial results
+    pattern_engine: Per-language heading regexes compiled into one pass per line
+    cpu_scheduler: Core split between PDF worker processes and torch inference threads
     
 Usage:
     from src.utils import validate_pdf, clean_text, LayoutUtils
@@ -0,0 +1,221 @@
+"""
+Splits the available cores between PDF parsing and embedding inference.
+
+Parsing scales with processes (batch workers, page shards), inference with
+torch intra-op threads. Left alone, every worker process starts one torch and
+one BLAS thread per core, so N workers on a C-core machine run N x C threads.
+``plan_cores`` chooses the worker processes and the threads each may use so
+that their product stays within the cores this process is allowed to run on;
+``apply_thread_limits`` pins a process to its share, and
+``preserved_thread_limits`` undoes it after a request in a long-lived process.
+
+Only the standard library is imported here, so fast mode stays light.
+"""
+import os
+import sys
+import logging
+import contextlib
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from config.settings import CPU_SPLIT, CPU_CORES, BATCH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Read by OpenMP, MKL, OpenBLAS and numexpr when their thread pools start
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class CoreSplit:
+    """How a run uses the cores: worker processes and threads per worker."""
+    cores: int            # cores available to the run
+    workers: int          # document-level worker processes
+    page_workers: int     # page-shard processes per document
+    torch_threads: int    # torch intra-op (and BLAS) threads per worker
+    interop_threads: int  # torch inter-op threads per worker
+    mode: str             # "fast" or "semantic"
+    source: str           # "auto", or "manual" for an explicit WORKERS:THREADS split
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return (f"{self.workers} worker(s) x {self.torch_threads} torch thread(s), "
+                f"{self.page_workers} page shard(s) per document on {self.cores} core(s) "
+                f"({self.mode} mode, {self.source})")
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of the container in cores (cgroup v2 or v1), or None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+@lru_cache(maxsize=1)
+def available_cores() -> int:
+    """
+    Cores this process may use: its CPU affinity, capped by a cgroup CPU quota.
+
+    ``os.cpu_count()`` reports every core of the host, which oversubscribes
+    containers started with a CPU limit.
+    """
+    if CPU_CORES > 0:
+        return CPU_CORES
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):  # not available on macOS and Windows
+        cores = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    if quota is not None:
+        cores = min(cores, int(quota))
+    return max(1, cores)
+
+
+def parse_split(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a split option: None for "auto", else (workers, torch threads).
+
+    Raises ValueError for anything other than "auto" or "WORKERS:THREADS".
+    """
+    if value is None or value.strip().lower() in ("", "auto"):
+        return None
+    try:
+        workers, threads = (int(part) for part in value.split(":"))
+    except ValueError:
+        raise ValueError(f"Expected 'auto' or WORKERS:THREADS (e.g. 4:2), got '{value}'")
+    if workers < 1 or threads < 1:
+        raise ValueError(f"Workers and threads must be at least 1, got '{value}'")
+    return workers, threads
+
+
+def plan_cores(jobs: int = 1, fast_mode: Optional[bool] = None, split: Optional[str] = None,
+               workers: Optional[int] = None, cores: Optional[int] = None) -> CoreSplit:
+    """
+    Plan the cores of a run of ``jobs`` documents.
+
+    Documents parse independently and scale best across processes, so there is
+    one worker per core up to the number of documents (or ``workers``, or
+    BATCH_WORKERS). In semantic mode each worker then gets an equal share of the
+    cores as torch threads for its inference; fast mode never runs the model
+    and keeps one. Page sharding, which runs before inference in the same
+    worker, gets the same share.
+
+    ``split`` ("WORKERS:THREADS", default CPU_SPLIT) fixes the parsing
+    processes and the torch threads of each worker instead: a batch runs
+    WORKERS documents at once, a single document WORKERS page shards.
+    """
+    if fast_mode is None:
+        fast_mode = os.getenv("FAST_MODE", "false").lower() == "true"
+    cores = max(1, cores or available_cores())
+    jobs = max(1, jobs)
+    manual = parse_split(CPU_SPLIT if split is None else split)
+
+    if manual is not None:
+        parse_processes, torch_threads = manual
+        worker_count = min(parse_processes, jobs)
+        page_workers = max(1, parse_processes // worker_count)
+    else:
+        worker_count = max(1, min(workers or BATCH_WORKERS or cores, jobs))
+        torch_threads = 1 if fast_mode else max(1, cores // worker_count)
+        page_workers = max(1, cores // worker_count)
+
+    if worker_count * torch_threads > cores:
+        logger.warning(f"CPU split {worker_count}x{torch_threads} oversubscribes {cores} core(s)")
+
+    return CoreSplit(
+        cores=cores,
+        workers=worker_count,
+        page_workers=page_workers,
+        torch_threads=torch_threads,
+        interop_threads=1,  # one model runs one forward pass at a time
+        mode="fast" if fast_mode else "semantic",
+        source="manual" if manual is not None else "auto"
+    )
+
+
+def apply_thread_limits(split: CoreSplit) -> None:
+    """
+    Limit this process's torch and BLAS thread pools to ``split.torch_threads``.
+
+    Libraries imported later read the environment variables; torch and numpy's
+    BLAS, if already loaded (e.g. inherited by a forked worker), are resized.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(split.torch_threads)
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        try:
+            torch.set_num_threads(split.torch_threads)
+        except Exception as e:
+            logger.debug(f"Could not set torch threads: {e}")
+        try:
+            torch.set_num_interop_threads(split.interop_threads)
+        except RuntimeError:
+            pass  # only settable before the first inter-op parallel work in this process
+
+    if "numpy" in sys.modules and split.mode == "semantic":
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=split.torch_threads, user_api="blas")
+        except ImportError:
+            pass  # optional; BLAS pools started before this keep their size
+        except Exception as e:
+            logger.debug(f"Could not limit BLAS threads: {e}")
+
+
+@contextlib.contextmanager
+def preserved_thread_limits() -> Iterator[None]:
+    """
+    Restore this process's thread limits on exit.
+
+    For long-lived processes that run ``apply_thread_limits`` per request (the
+    extraction daemon): the environment variables, torch's intra-op threads and
+    the BLAS/OpenMP pools go back to what they were on entry. torch's inter-op
+    threads are fixed after first use and are always 1 here, so they are left.
+    """
+    previous_env = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    torch = sys.modules.get("torch")
+    previous_torch_threads = torch.get_num_threads() if torch is not None else None
+    try:
+        from threadpoolctl import threadpool_limits
+        blas_limits = threadpool_limits(limits=None)  # records the current sizes only
+    except ImportError:
+        blas_limits = None
+    try:
+        yield
+    finally:
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        # A torch first imported inside the block keeps the size it started with
+        if previous_torch_threads is not None:
+            try:
+                torch.set_num_threads(previous_torch_threads)
+            except Exception as e:
+                logger.debug(f"Could not restore torch threads: {e}")
+        if blas_limits is not None:
+            try:
+                blas_limits.restore_original_limits()
+            except Exception as e:
+                logger.debug(f"Could not restore BLAS threads: {e}")
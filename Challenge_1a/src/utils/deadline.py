@@ -0,0 +1,57 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+from config.settings import DEADLINE_FINISH_RESERVE
+
+
+class Deadline:
+    """
+    Cooperative time budget for one document.
+
+    Passed down through the pipeline stages instead of running the pipeline in a
+    watched thread: long loops check ``exhausted()`` between units of work
+    (pages, TOC pages, candidates) and stop early, and optional stages ask
+    ``allows(seconds)`` before they start. A stage that stops early records what
+    it skipped with ``cut()``; any cut makes the result partial.
+
+    ``reserve`` seconds are kept for the stages that turn the work done so far
+    into a result (hierarchy assignment and output formatting), so the result is
+    ready close to the deadline rather than after it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, reserve: Optional[float] = None):
+        self.seconds = seconds
+        self.start = time.monotonic()
+        self.expires_at = self.start + seconds if seconds else math.inf
+        if reserve is None:
+            reserve = min(DEADLINE_FINISH_RESERVE, 0.1 * seconds) if seconds else 0.0
+        self.reserve = reserve
+        self.cuts: List[Dict[str, str]] = []
+
+    @classmethod
+    def unlimited(cls) -> 'Deadline':
+        return cls(None)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (inf without a deadline)."""
+        return self.expires_at - time.monotonic()
+
+    def exhausted(self) -> bool:
+        """True once only the finishing reserve is left: stop gathering more work."""
+        return self.remaining() <= self.reserve
+
+    def allows(self, seconds: float) -> bool:
+        """True if a stage expected to take ``seconds`` fits before the reserve."""
+        return self.remaining() - self.reserve >= seconds
+
+    def cut(self, stage: str, detail: str = "") -> None:
+        """Record that ``stage`` was skipped or stopped early because of the deadline."""
+        self.cuts.append({"stage": stage, "detail": detail})
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.cuts)
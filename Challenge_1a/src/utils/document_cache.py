@@ -0,0 +1,234 @@
+import io
+import mmap
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+import fitz  # PyMuPDF
+
+from src.utils.span_table import SpanTable
+from src.utils.word_index import PageWordIndex
+from src.utils import tracing
+
+
+class DocumentCache:
+    """
+    Parse-once view of a PDF shared by every pipeline stage.
+
+    Opens a single document handle and builds, lazily and at most once per page,
+    the MuPDF TextPage plus the derived ``get_text("dict")`` and plain-text results.
+    All stages (validation, metadata analysis, TOC validation, candidate generation
+    and semantic context extraction) read from the same cache instead of calling
+    ``fitz.open`` and ``page.get_text`` themselves.
+
+    With ``data`` the document is opened from an in-memory buffer (see
+    ``from_buffer``) and ``pdf_path`` is only a display name; nothing touches disk.
+    """
+
+    def __init__(self, pdf_path: Union[str, Path], data: Optional[memoryview] = None):
+        self.pdf_path = str(pdf_path)
+        self.data = data
+        self.logger = logging.getLogger(__name__)
+
+        # mmap owned by this cache (file objects opened via from_buffer)
+        self._mmap: Optional[mmap.mmap] = None
+
+        self._doc: Optional[fitz.Document] = None
+        self._pages: Dict[int, fitz.Page] = {}
+        self._textpages: Dict[int, Any] = {}
+        self._page_dicts: Dict[int, Dict[str, Any]] = {}
+        self._page_texts: Dict[int, str] = {}
+        self._span_tables: Dict[int, SpanTable] = {}
+        self._word_indexes: Dict[int, PageWordIndex] = {}
+
+        # Extraction statistics (useful to verify the parse-once behaviour)
+        self.stats = {
+            "textpages_built": 0,
+            "dict_extractions": 0,
+            "text_extractions": 0,
+            "word_extractions": 0
+        }
+
+    @classmethod
+    def from_buffer(cls, source: Any, name: str = "document.pdf") -> 'DocumentCache':
+        """
+        Cache over an in-memory PDF without copying it.
+
+        Accepts bytes, bytearray, memoryview, mmap, io.BytesIO or any binary
+        file object. Real files are memory-mapped (pages are read on demand by
+        the OS); other file-like objects are read once.
+        """
+        owned_mmap = None
+
+        if isinstance(source, io.BytesIO):
+            data = source.getbuffer()
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            data = memoryview(source)
+        elif hasattr(source, "read"):
+            try:
+                owned_mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+                data = memoryview(owned_mmap)
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                data = memoryview(source.read())
+
+            source_name = getattr(source, "name", None)
+            if isinstance(source_name, str):
+                name = Path(source_name).name
+        else:
+            raise TypeError(f"Unsupported PDF source type: {type(source).__name__}")
+
+        cache = cls(name, data=data)
+        cache._mmap = owned_mmap
+        return cache
+
+    @property
+    def is_in_memory(self) -> bool:
+        """True if the document was opened from a buffer rather than a file path."""
+        return self.data is not None
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the PDF in bytes."""
+        if self.data is not None:
+            return self.data.nbytes
+        return Path(self.pdf_path).stat().st_size
+
+    @property
+    def doc(self) -> fitz.Document:
+        """Underlying document handle, opened on first access."""
+        if self._doc is None:
+            if self.data is not None:
+                self._doc = fitz.open(stream=self.data, filetype="pdf")
+            else:
+                self._doc = fitz.open(self.pdf_path)
+        return self._doc
+
+    @property
+    def name(self) -> str:
+        """File name of the document."""
+        return Path(self.pdf_path).name
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.doc.metadata or {}
+
+    def get_toc(self) -> List[List[Any]]:
+        """Document outline (bookmarks) as returned by PyMuPDF."""
+        if not self.doc.is_pdf or not hasattr(self.doc, 'get_toc'):
+            return []
+        return self.doc.get_toc()
+
+    def page(self, page_num: int) -> fitz.Page:
+        """Loaded page object (0-based page number)."""
+        page = self._pages.get(page_num)
+        if page is None:
+            page = self.doc.load_page(page_num)
+            self._pages[page_num] = page
+        return page
+
+    def textpage(self, page_num: int):
+        """MuPDF TextPage for a page, built once and reused by every extraction."""
+        textpage = self._textpages.get(page_num)
+        if textpage is None:
+            with tracing.span("mupdf.textpage", cat="mupdf", page=page_num + 1):
+                textpage = self.page(page_num).get_textpage(flags=fitz.TEXTFLAGS_DICT)
+            self._textpages[page_num] = textpage
+            self.stats["textpages_built"] += 1
+        return textpage
+
+    def page_dict(self, page_num: int) -> Dict[str, Any]:
+        """Cached ``get_text("dict")`` result for a page."""
+        page_dict = self._page_dicts.get(page_num)
+        if page_dict is None:
+            textpage = self.textpage(page_num)
+            with tracing.span("mupdf.dict", cat="mupdf", page=page_num + 1) as trace_span:
+                page_dict = self.page(page_num).get_text("dict", textpage=textpage)
+                trace_span.set(blocks=len(page_dict["blocks"]))
+            self._page_dicts[page_num] = page_dict
+            self.stats["dict_extractions"] += 1
+        return page_dict
+
+    def page_blocks(self, page_num: int) -> List[Dict[str, Any]]:
+        """Blocks of the cached page dictionary."""
+        return self.page_dict(page_num)["blocks"]
+
+    def span_table(self, page_num: int) -> SpanTable:
+        """Cached columnar span/line table built from the page dictionary."""
+        table = self._span_tables.get(page_num)
+        if table is None:
+            rect = self.page(page_num).rect
+            blocks = self.page_blocks(page_num)
+            with tracing.span("span_table", cat="layout", page=page_num + 1) as trace_span:
+                table = SpanTable.from_blocks(blocks, rect.width, rect.height)
+                trace_span.set(lines=table.n_lines, spans=table.n_spans)
+            self._span_tables[page_num] = table
+        return table
+
+    def page_text(self, page_num: int) -> str:
+        """Cached plain text of a page."""
+        page_text = self._page_texts.get(page_num)
+        if page_text is None:
+            textpage = self.textpage(page_num)
+            with tracing.span("mupdf.text", cat="mupdf", page=page_num + 1):
+                page_text = self.page(page_num).get_text("text", textpage=textpage)
+            self._page_texts[page_num] = page_text
+            self.stats["text_extractions"] += 1
+        return page_text
+
+    def word_index(self, page_num: int) -> PageWordIndex:
+        """Cached normalized word index of a page (built from ``get_text("words")``)."""
+        index = self._word_indexes.get(page_num)
+        if index is None:
+            textpage = self.textpage(page_num)
+            with tracing.span("mupdf.words", cat="mupdf", page=page_num + 1) as trace_span:
+                words = self.page(page_num).get_text("words", textpage=textpage)
+                index = PageWordIndex.from_words(words)
+                trace_span.set(tokens=len(index.tokens))
+            self._word_indexes[page_num] = index
+            self.stats["word_extractions"] += 1
+        return index
+
+    def search_for(self, page_num: int, needle: str) -> List[fitz.Rect]:
+        """Search a page for text, reusing the cached TextPage."""
+        return self.page(page_num).search_for(needle, textpage=self.textpage(page_num))
+
+    def release_page(self, page_num: int) -> None:
+        """Drop everything cached for one page (used by streaming to bound memory)."""
+        self._span_tables.pop(page_num, None)
+        self._word_indexes.pop(page_num, None)
+        self._page_dicts.pop(page_num, None)
+        self._page_texts.pop(page_num, None)
+        self._textpages.pop(page_num, None)
+        self._pages.pop(page_num, None)
+
+    def close(self) -> None:
+        """Release all cached pages and close the document handle."""
+        self._span_tables.clear()
+        self._word_indexes.clear()
+        self._page_dicts.clear()
+        self._page_texts.clear()
+        self._textpages.clear()
+        self._pages.clear()
+
+        if self._doc is not None:
+            try:
+                self._doc.close()
+            except Exception as e:
+                self.logger.debug(f"Failed to close document cleanly: {e}")
+            self._doc = None
+
+        # The buffer must be released before the mmap behind it can be closed
+        if self._mmap is not None:
+            self.data.release()
+            self.data = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> 'DocumentCache':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,444 @@
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+from pathlib import Path
+from threading import RLock
+from typing import Dict, List, Optional, Sequence, Union, Any
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+from config.settings import EMBEDDING_STORE_DIR, EMBEDDING_STORE_MAX_MB, EMBEDDING_STORE_DTYPE
+
+
+# Rows per shard file; eviction drops whole shards, oldest first
+SHARD_ROWS = 4096
+
+# One index record per stored embedding: 64-bit text hash -> (shard, row)
+INDEX_RECORD = np.dtype([("key", "<u8"), ("shard", "<u4"), ("row", "<u4")])
+
+# Entries read from the index log since the last merge into the sorted arrays
+RECENT_MERGE_THRESHOLD = 4096
+
+
+def _key_hash(key: str) -> int:
+    """64-bit hash of a cache key."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EmbeddingStore:
+    """
+    Persistent, memory-mapped store of text embeddings shared by processes.
+
+    Each namespace (model name and dtype) is a directory of append-only shard
+    files holding SHARD_ROWS raw float16/float32 rows each, plus an append-only
+    index log of fixed-size (hash, shard, row) records. Shards are read through
+    read-only memory maps and the index is held as sorted NumPy arrays, so
+    opening the store costs one read of the index and a lookup is a binary
+    search.
+
+    Appends take an exclusive file lock, write the rows before their index
+    records, and pick up other processes' records first, so worker processes
+    can share a namespace. Above the size cap the oldest shards are deleted and
+    the index is rewritten; readers notice the new index file and reload it.
+
+    ``clear`` starts a new generation, recorded in meta.json, and shard numbers
+    are never reused; a reader checks the generation on every lookup and drops
+    its index when it changed, so it never reads another text's row.
+    """
+
+    def __init__(self, namespace: str, store_dir: Optional[Union[str, Path]] = None,
+                 max_size_mb: Optional[float] = None, dtype: Optional[str] = None):
+        self.namespace = namespace
+        self.dtype = np.dtype(dtype or EMBEDDING_STORE_DTYPE)
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", namespace)
+        self.directory = Path(store_dir or EMBEDDING_STORE_DIR) / f"{safe_name}-{self.dtype.name}"
+        self.max_bytes = int((max_size_mb if max_size_mb is not None else EMBEDDING_STORE_MAX_MB) * 1024 * 1024)
+        self.logger = logging.getLogger(__name__)
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        self._lock = RLock()
+        self._index_file = self.directory / "index.bin"
+        self._lock_file = self.directory / ".lock"
+        self._meta_file = self.directory / "meta.json"
+
+        # Index: sorted hashes with packed (shard << 32 | row) locations, plus recent entries
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._locations = np.empty(0, dtype=np.uint64)
+        self._recent: Dict[int, int] = {}
+        self._index_offset = 0
+        self._index_inode = None
+
+        # Generation of the store contents this index belongs to (see clear)
+        self._generation: Optional[str] = None
+        self._meta_stamp = None
+
+        self._shards: Dict[int, np.memmap] = {}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = None
+        self._check_generation()
+        self._refresh_index()
+
+    # Index
+
+    def _refresh_index(self) -> None:
+        """Read index records appended since the last refresh (reloading after a rewrite)."""
+        try:
+            stat = self._index_file.stat()
+        except FileNotFoundError:
+            if self._index_inode is not None:
+                self._reset_index()
+            return
+
+        if stat.st_ino != self._index_inode or stat.st_size < self._index_offset:
+            self._reset_index()
+            self._index_inode = stat.st_ino
+
+        available = (stat.st_size - self._index_offset) // INDEX_RECORD.itemsize * INDEX_RECORD.itemsize
+        if available <= 0:
+            return
+
+        with open(self._index_file, "rb") as f:
+            f.seek(self._index_offset)
+            records = np.frombuffer(f.read(available), dtype=INDEX_RECORD)
+        self._index_offset += len(records) * INDEX_RECORD.itemsize
+
+        locations = (records["shard"].astype(np.uint64) << np.uint64(32)) | records["row"].astype(np.uint64)
+        if len(self._keys) == 0 and not self._recent:
+            self._keys, self._locations = self._sorted_index(records["key"], locations)
+        else:
+            self._recent.update(zip(records["key"].tolist(), locations.tolist()))
+            if len(self._recent) > RECENT_MERGE_THRESHOLD:
+                self._merge_recent()
+
+    def _reset_index(self) -> None:
+        self._shards.clear()
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._locations = np.empty(0, dtype=np.uint64)
+        self._recent.clear()
+        self._index_offset = 0
+        self._index_inode = None
+
+    @staticmethod
+    def _sorted_index(keys: np.ndarray, locations: np.ndarray):
+        """Sorted unique keys and their locations; the last record of a key wins."""
+        reversed_keys = keys[::-1]
+        unique_keys, first = np.unique(reversed_keys, return_index=True)
+        return unique_keys, locations[::-1][first]
+
+    def _merge_recent(self) -> None:
+        keys = np.concatenate([self._keys, np.fromiter(self._recent.keys(), dtype=np.uint64, count=len(self._recent))])
+        locations = np.concatenate([self._locations, np.fromiter(self._recent.values(), dtype=np.uint64, count=len(self._recent))])
+        self._keys, self._locations = self._sorted_index(keys, locations)
+        self._recent.clear()
+
+    def _locate(self, hashes: np.ndarray) -> np.ndarray:
+        """Packed location of each hash, -1 where it is not in the local index."""
+        found = np.full(len(hashes), -1, dtype=np.int64)
+        if len(self._keys):
+            positions = np.minimum(np.searchsorted(self._keys, hashes), len(self._keys) - 1)
+            hit = self._keys[positions] == hashes
+            found[hit] = self._locations[positions[hit]].astype(np.int64)
+        if self._recent:
+            for i in np.flatnonzero(found < 0).tolist():
+                location = self._recent.get(int(hashes[i]))
+                if location is not None:
+                    found[i] = location
+        return found
+
+    # Shards
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.directory / f"shard_{shard:06d}.bin"
+
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def _shard_view(self, shard: int, row: int) -> Optional[np.memmap]:
+        """Memory map of a shard that covers ``row``, remapped if the file has grown."""
+        view = self._shards.get(shard)
+        if view is not None and row < len(view):
+            return view
+
+        try:
+            rows = self._shard_path(shard).stat().st_size // self._row_bytes()
+        except FileNotFoundError:
+            return None  # evicted by another process
+        if row >= rows:
+            return None
+
+        view = np.memmap(self._shard_path(shard), dtype=self.dtype, mode="r", shape=(rows, self.dim))
+        self._shards[shard] = view
+        return view
+
+    def _shard_numbers(self) -> List[int]:
+        return sorted(int(path.stem.split("_")[1]) for path in self.directory.glob("shard_*.bin"))
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self._meta_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_dim(self) -> Optional[int]:
+        try:
+            return int(self._read_meta()["dim"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _write_meta(self, **updates) -> None:
+        """Replace meta.json atomically, keeping the fields not updated."""
+        meta = {"namespace": self.namespace, "dtype": self.dtype.name, **self._read_meta(), **updates}
+        meta.setdefault("generation", uuid.uuid4().hex)
+        tmp_file = self._meta_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, self._meta_file)
+
+    def _check_generation(self) -> None:
+        """Drop the local index if the store was cleared since it was read (one stat when unchanged)."""
+        try:
+            stat = self._meta_file.stat()
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._meta_stamp:
+            return
+        first_read = self._meta_stamp is None
+        self._meta_stamp = stamp
+
+        meta = self._read_meta()
+        generation = meta.get("generation")
+        if not first_read and generation != self._generation:
+            self.logger.debug(f"Embedding store {self.directory.name} was cleared, reloading its index")
+            self._reset_index()
+        self._generation = generation
+        if meta.get("dim") is not None:
+            self.dim = int(meta["dim"])
+
+    # Public API
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Stored embedding for a key (as float32), or None on a miss."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Stored embeddings for several keys, None for each miss."""
+        if not keys:
+            return []
+
+        hashes = np.fromiter(map(_key_hash, keys), dtype=np.uint64, count=len(keys))
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+
+        with self._lock:
+            self._check_generation()
+            locations = self._locate(hashes)
+            if (locations < 0).any():
+                # Other processes may have stored them since the last refresh
+                self._refresh_index()
+                locations = self._locate(hashes)
+
+            if self.dim is None and (locations >= 0).any():
+                self.dim = self._read_dim()
+
+            for i, location in enumerate(locations.tolist()):
+                if location < 0 or self.dim is None:
+                    continue
+                shard, row = location >> 32, location & 0xFFFFFFFF
+                view = self._shard_view(shard, row)
+                if view is not None:
+                    results[i] = np.array(view[row], dtype=np.float32)
+
+        hits = sum(result is not None for result in results)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+        return results
+
+    def put(self, key: str, embedding: np.ndarray) -> bool:
+        """Store one embedding; returns False if it could not be stored."""
+        return self.put_many([key], [embedding])
+
+    def put_many(self, keys: Sequence[str], embeddings: Sequence[np.ndarray]) -> bool:
+        """Append embeddings for keys not stored yet; returns False if they could not be stored."""
+        if not keys:
+            return True
+
+        try:
+            matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(keys), -1)
+        except ValueError as e:
+            self.logger.warning(f"Embeddings do not form a matrix, not storing: {e}")
+            return False
+
+        try:
+            with self._lock, self._file_lock():
+                self._check_generation()
+                if self.dim is None:
+                    self.dim = matrix.shape[1]
+                    self._write_meta(dim=self.dim)
+                    self._check_generation()
+                if matrix.shape[1] != self.dim:
+                    self.logger.warning(f"Embedding dimension {matrix.shape[1]} does not match store "
+                                        f"dimension {self.dim}, not storing")
+                    return False
+
+                # Skip keys stored already (by us, another process or earlier in this batch)
+                self._refresh_index()
+                hashes = np.fromiter(map(_key_hash, keys), dtype=np.uint64, count=len(keys))
+                unique_hashes, first = np.unique(hashes, return_index=True)
+                new = first[self._locate(unique_hashes) < 0]
+                if len(new) == 0:
+                    return True
+                new.sort()
+
+                self._append(hashes[new], matrix[new].astype(self.dtype))
+                self.stats["stores"] += len(new)
+                self._evict()
+                self._refresh_index()
+            return True
+
+        except OSError as e:
+            self.logger.warning(f"Failed to write embedding store: {e}")
+            return False
+
+    def _append(self, hashes: np.ndarray, rows: np.ndarray) -> None:
+        """Write rows to the current shard (starting new ones as they fill), then their index records."""
+        row_bytes = self._row_bytes()
+        shards = self._shard_numbers()
+        # After a clear, numbering continues where the previous generation stopped
+        shard = shards[-1] if shards else int(self._read_meta().get("next_shard", 0))
+        shard_rows = self._shard_path(shard).stat().st_size // row_bytes if shards else 0
+
+        records = np.empty(len(rows), dtype=INDEX_RECORD)
+        records["key"] = hashes
+        written = 0
+        while written < len(rows):
+            if shard_rows >= SHARD_ROWS:
+                shard, shard_rows = shard + 1, 0
+            count = min(SHARD_ROWS - shard_rows, len(rows) - written)
+            with open(self._shard_path(shard), "ab") as f:
+                f.seek(shard_rows * row_bytes)
+                f.truncate()  # drop a partial row left by an interrupted writer
+                f.write(rows[written:written + count].tobytes())
+            records["shard"][written:written + count] = shard
+            records["row"][written:written + count] = np.arange(shard_rows, shard_rows + count)
+            written += count
+            shard_rows += count
+
+        with open(self._index_file, "ab") as f:
+            f.truncate(f.tell() // INDEX_RECORD.itemsize * INDEX_RECORD.itemsize)
+            f.write(records.tobytes())
+
+    def _evict(self) -> None:
+        """Delete the oldest shards until the store fits the size cap, then rewrite the index."""
+        shards = self._shard_numbers()
+        sizes = {shard: self._shard_path(shard).stat().st_size for shard in shards}
+        total_size = sum(sizes.values()) + self._index_file.stat().st_size
+        if total_size <= self.max_bytes:
+            return
+
+        evicted = []
+        for shard in shards[:-1]:  # never the shard being filled
+            if total_size <= self.max_bytes:
+                break
+            self._shard_path(shard).unlink()
+            self._shards.pop(shard, None)
+            total_size -= sizes[shard]
+            evicted.append(shard)
+        if not evicted:
+            return
+
+        records = np.fromfile(self._index_file, dtype=INDEX_RECORD)
+        kept = records[~np.isin(records["shard"], evicted)]
+        tmp_file = self._index_file.with_suffix(f".{os.getpid()}.tmp")
+        kept.tofile(tmp_file)
+        os.replace(tmp_file, self._index_file)
+
+        self.stats["evictions"] += len(records) - len(kept)
+        self.logger.debug(f"Evicted {len(evicted)} embedding shards from {self.directory.name}")
+
+    def _file_lock(self):
+        return _FileLock(self._lock_file)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._keys) + len(self._recent)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            hashes = np.array([_key_hash(key)], dtype=np.uint64)
+            if self._locate(hashes)[0] < 0:
+                self._refresh_index()
+            return bool(self._locate(hashes)[0] >= 0)
+
+    def size_bytes(self) -> int:
+        """Bytes on disk used by the namespace."""
+        return sum(path.stat().st_size for path in self.directory.glob("*.bin"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self),
+            "size_mb": round(self.size_bytes() / (1024 * 1024), 2),
+            "dtype": self.dtype.name,
+            "namespace": self.namespace
+        }
+
+    def close(self) -> None:
+        """Release the memory maps (the stored embeddings stay on disk)."""
+        with self._lock:
+            self._shards.clear()
+
+    def clear(self) -> None:
+        """
+        Delete every embedding of the namespace.
+
+        Starts a new generation, so other processes drop their index on their
+        next lookup instead of reading new rows at old positions.
+        """
+        with self._lock, self._file_lock():
+            shards = self._shard_numbers()
+            next_shard = max(shards[-1] + 1 if shards else 0, int(self._read_meta().get("next_shard", 0)))
+            self._shards.clear()
+            for path in self.directory.glob("*.bin"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # already removed by another process
+            self._write_meta(generation=uuid.uuid4().hex, next_shard=next_shard)
+            self._reset_index()
+            self._check_generation()
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, held for a ``with`` block (no-op without fcntl)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._handle = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._handle = open(self.path, "a")
+            fcntl.flock(self._handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._handle is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
@@ -0,0 +1,362 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from config.cultural_patterns import CULTURAL_PATTERNS, HEADING_CONFIDENCE_BOOSTERS
+
+
+# Pattern families shared by every language. Each family is an ordered list of
+# (pattern, payload); queries that need "the first match" follow list order.
+# Patterns that used to run on text.lower() or with re.IGNORECASE use explicit
+# case classes or an inline (?i:...) group, which match exactly the same lines.
+SHARED_FAMILIES: Dict[str, List[Tuple[str, Any]]] = {
+    # CandidateGenerator quick filter
+    "digits_only": [(r'^\d+$', None)],
+    "roman_only": [(r'^[ivxlcdmIVXLCDM]+$', None)],
+    "punctuation_only": [(r'^[\s\.,;:!?\-\(\)\[\]{}]*$', None)],
+    "skip": [
+        (r'^[pP][aA][gG][eE] \d+', None),     # Page numbers
+        (r'^\d+/\d+', None),
+        (r'^[wW][wW][wW]\.', None),           # URLs
+        (r'^[hH][tT][tT][pP]', None),         # URLs
+        (r'@', None),                         # Email patterns
+    ],
+    "cjk_short_marker": [(r'[章節項目録]', None)],
+    "cjk_list_item": [
+        (r'^[•·]\s', None),
+        (r'^\d+\.\s[^章節]', None),
+    ],
+
+    # Numbering shared by all languages
+    "default_numbering": [
+        (r'^\d+\.', None),           # 1. 2. 3.
+        (r'^\d+\.\d+', None),        # 1.1, 1.2
+        (r'^[IVX]+\.', None),        # I. II. III.
+        (r'^[A-Z]\.', None),         # A. B. C.
+        (r'^Chapter \d+', None),     # Chapter 1
+        (r'^Section \d+', None),     # Section 1
+        (r'^\(\d+\)', None),         # (1) (2)
+    ],
+
+    # CJK candidate features
+    "cjk_chapter": [
+        (r'^第[一二三四五六七八九十\d]+章', None),        # 第一章, 第1章
+        (r'^第[一二三四五六七八九十\d]+節', None),        # 第一節, 第1節
+        (r'^Chapter\s*[一二三四五六七八九十\d]+', None),  # Chapter 1 (mixed)
+    ],
+    "cjk_section": [
+        (r'^\d+\.\d+\s+[^\s]', None),           # 1.1 Title
+        (r'^[一二三四五六七八九十]+、', None),     # 一、
+        (r'^（[一二三四五六七八九十\d]+）', None),  # （一）
+    ],
+    "cjk_reject": [
+        (r'^[•·]\s', None),           # Bullets
+        (r'^行\d+', None),            # Table rows
+        (r'^ヘッダー\d+$', None),      # Headers
+        (r'です。$', None),           # Japanese sentence endings
+        (r'である。$', None),         # Japanese sentence endings
+        (r'した。$', None),           # Japanese sentence endings
+        (r'する。$', None),           # Japanese sentence endings
+        (r'^表\d+[：:]', None),       # Table captions (Japanese)
+        (r'^图\d+[：:]', None),       # Figure captions (Chinese)
+        (r'^圖\d+[：:]', None),       # Figure captions (Traditional Chinese)
+        (r'^列表\d+', None),          # List items (Chinese)
+        (r'^リスト\d+', None),        # List items (Japanese)
+    ],
+    "cjk_chapter_marker": [(r'^第[一二三四五六七八九十\d]+章', None)],
+    "cjk_section_marker": [(r'^第[一二三四五六七八九十\d]+節', None)],
+    "cjk_numbered_chapter": [(r'第[一二三四五六七八九十\d]+[章節部篇]', None)],
+
+    # text_utils.is_likely_heading
+    "heading_numbering": [
+        (r'(?i:^\d+\.)', None),          # 1. 2. 3.
+        (r'(?i:^\d+\.\d+)', None),       # 1.1 1.2
+        (r'(?i:^[IVX]+\.)', None),       # I. II. III.
+        (r'(?i:^[A-Z]\.)', None),        # A. B. C.
+        (r'(?i:^Chapter \d+)', None),    # Chapter 1
+        (r'(?i:^Section \d+)', None),    # Section 1
+    ],
+    "non_heading": [
+        (r'(?i:^\d+$)', None),           # Just numbers
+        (r'(?i:^page \d+)', None),       # Page numbers
+        (r'@', None),                    # Email addresses
+        (r'(?i:http)', None),            # URLs
+        (r'(?i:www\.)', None),           # URLs
+    ],
+
+    # HierarchyAssigner CJK levels; payload is the level
+    "cjk_level": [
+        # Level 1: Chapter markers (highest priority)
+        (r'^第[一二三四五六七八九十\d]+章', 1),     # 第一章, 第1章
+        (r'^Chapter\s*[一二三四五六七八九十\d]+', 1), # Chapter 1 (mixed)
+        (r'^序章', 1),                            # Prologue chapter
+        (r'^終章', 1),                            # Final chapter
+        (r'^付録[一二三四五六七八九十\d]*', 1),      # Appendix
+        # Level 1: Major section markers
+        (r'^第[一二三四五六七八九十\d]+部', 1),     # 第一部 (Part)
+        (r'^第[一二三四五六七八九十\d]+編', 1),     # 第一編 (Volume)
+        (r'^はじめに$', 1),                       # Introduction (Japanese)
+        (r'^序論$', 1),                          # Introduction (Japanese)
+        (r'^結論$', 1),                          # Conclusion (Japanese)
+        (r'^まとめ$', 1),                        # Summary (Japanese)
+        (r'^引言$', 1),                          # Introduction (Chinese)
+        (r'^结论$', 1),                          # Conclusion (Chinese)
+        (r'^总结$', 1),                          # Summary (Chinese)
+        (r'^参考文献$', 1),                       # References
+        (r'^謝辞$', 1),                          # Acknowledgments (Japanese)
+        (r'^致谢$', 1),                          # Acknowledgments (Chinese)
+        # Level 2: Section markers
+        (r'^第[一二三四五六七八九十\d]+節', 2),     # 第一節, 第1節
+        (r'^\d+\.\d+\s+[^\s]', 2),              # 1.1 Title (with space and content)
+        (r'^[一二三四五六七八九十]+、', 2),         # 一、二、三、
+        (r'^（[一二三四五六七八九十\d]+）', 2),    # （一）（二）
+        (r'^\([一二三四五六七八九十\d]+\)', 2),    # (一)(二)
+        # Level 3: Subsection markers
+        (r'^\d+\.\d+\.\d+', 3),                # 1.1.1
+        (r'^[一二三四五六七八九十]+\.', 3),        # 一. 二. 三.
+        (r'^[abc一二三]\)', 3),                 # a) b) c) or 一) 二)
+        (r'^[\(（][abc一二三\d]+[\)）]', 3),      # (a) (b) or （一）（二）
+        # Level 4+: Minor subsections
+        (r'^\d+\.\d+\.\d+\.\d+', 4),           # 1.1.1.1
+        (r'^・', 4),                           # Bullet points (Japanese)
+        (r'^•', 4),                            # Bullet points
+    ],
+
+    # HierarchyAssigner numbering strategy; payload is (level, numbering pattern)
+    "cjk_numbering_level": [
+        (r'^第\d+章', (1, 'cjk_chapter')),
+        (r'^第[一二三四五六七八九十]+章', (1, 'cjk_chapter')),
+        (r'^第\d+節', (2, 'cjk_section')),
+        (r'^第[一二三四五六七八九十]+節', (2, 'cjk_section')),
+        (r'^\d+\.\d+\.\d+', (3, 'decimal_nested_deep')),          # 1.1.1
+        (r'^\d+\.\d+', (2, 'decimal_nested')),                    # 1.1
+        (r'^\d+\.', (1, 'decimal')),                              # 1.
+        (r'^[一二三四五六七八九十]+、', (2, 'cjk_kanji_list')),      # 一、
+        (r'^（[一二三四五六七八九十\d]+）', (3, 'cjk_parenthetical')),  # （一）
+    ],
+    "numbering_level": [
+        (r'^\d+\.\d+\.\d+', (3, 'decimal_nested_deep')),  # 1.1.1
+        (r'^\d+\.\d+', (2, 'decimal_nested')),            # 1.1
+        (r'^\d+\.', (1, 'decimal')),                      # 1.
+        (r'^[IVX]+\.', (1, 'roman')),                     # I.
+        (r'^[A-Z]\.', (2, 'alpha')),                      # A.
+        (r'(?i:^Chapter \d+)', (1, 'chapter')),
+        (r'(?i:^Section \d+)', (2, 'section')),
+    ],
+}
+
+# Families are scanned in one pass per pipeline stage, so the quick line filter
+# does not pay for the hierarchy patterns and vice versa. Families not listed
+# here (including every language family) belong to the "features" stage.
+FAMILY_STAGES: Dict[str, List[str]] = {
+    "filter": [
+        "digits_only", "roman_only", "punctuation_only", "skip", "cjk_short_marker",
+        "cjk_list_item", "cjk_reject", "cjk_chapter_marker",
+    ],
+    "heading": ["heading_numbering", "non_heading", "cjk_numbered_chapter"],
+    "hierarchy": ["cjk_level", "cjk_numbering_level", "numbering_level", "cjk_section_marker"],
+}
+
+# Numbering type names checked before the defaults, per language
+LANGUAGE_NUMBERING_TYPES: Dict[str, List[Tuple[str, str]]] = {
+    'japanese': [
+        (r'^第\d+章', "japanese_chapter"),
+        (r'^第[一二三四五六七八九十]+章', "japanese_kanji_chapter"),
+        (r'^[一二三四五六七八九十]+、', "japanese_kanji_list"),
+    ],
+    'chinese': [
+        (r'^第\d+章', "chinese_chapter"),
+        (r'^第[一二三四五六七八九十]+章', "chinese_kanji_chapter"),
+    ],
+    'hindi': [
+        (r'^अध्याय\s+\d+', "hindi_chapter"),
+        (r'^[१२३४५६७८९०]+\.', "hindi_devanagari"),
+    ],
+    'arabic': [
+        (r'^الفصل\s+\w+', "arabic_chapter"),
+        (r'^[\u0660-\u0669]+', "arabic_indic"),
+    ],
+}
+
+DEFAULT_NUMBERING_TYPES: List[Tuple[str, str]] = [
+    (r'^\d+\.', "decimal"),
+    (r'^[IVX]+\.', "roman"),
+    (r'^[A-Z]\.', "alpha"),
+    (r'(?i:^Chapter)', "chapter"),
+    (r'(?i:^Section)', "section"),
+]
+
+# Script detection used by the cultural features, per language
+LANGUAGE_SCRIPTS: Dict[str, Dict[str, str]] = {
+    'japanese': {
+        "contains_cjk": r'[\u4e00-\u9fff]',
+        "contains_hiragana": r'[\u3041-\u3096]',
+        "contains_katakana": r'[\u30A1-\u30FA]',
+    },
+    'chinese': {"contains_cjk": r'[\u4e00-\u9fff]'},
+    'arabic': {"contains_arabic": r'[\u0600-\u06FF]'},
+    'hindi': {"contains_devanagari": r'[\u0900-\u097F]'},
+}
+
+
+def _is_anchored(pattern: str) -> bool:
+    """True if the pattern starts with '^' and has no top-level alternation."""
+    if not pattern.startswith('^'):
+        return False
+
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+    return True
+
+
+# How a family entry is evaluated
+ANCHORED, SEARCH, LITERAL = 0, 1, 2
+
+
+class PatternEngine:
+    """
+    All heading patterns of one language, compiled once.
+
+    Patterns anchored at the start of the line (the large majority) are
+    combined into one regex per stage: each becomes a named group inside a
+    zero-width lookahead, ``(?:(?=(?P<pN>^...))|)``, so a single ``match()``
+    evaluates all of them and the match's group spans tell which ones matched.
+    Unanchored patterns are precompiled on their own and searched only when a
+    query needs them; folding them into the combined regex would force a
+    character-by-character scan and lose the C-level prefix search. Keywords
+    are plain substring tests.
+
+    Families are ordered lists of entries; ``first()`` returns the payload of
+    the first matching entry, which keeps the first-match-wins order of the
+    original if/elif chains and pattern loops. The last scanned line of each
+    stage is kept, so the feature methods that each ask about the same line
+    share one pass.
+    """
+
+    def __init__(self, language: Optional[str] = None):
+        self.language = language
+        self._stage_of = {family: stage for stage, families in FAMILY_STAGES.items() for family in families}
+        self._anchored: Dict[str, Dict[str, str]] = {}  # stage -> pattern -> group name
+        self._searches: Dict[str, Pattern] = {}
+        self._families: Dict[str, Tuple[str, List[Tuple[int, Any, Any]]]] = {}
+
+        for family, entries in SHARED_FAMILIES.items():
+            self._add_family(family, entries)
+
+        cultural = CULTURAL_PATTERNS.get(language, {})
+        self._add_family("numbering", [(p, p) for p in cultural.get('numbering_patterns', [])])
+        self._add_family("heading_style", [(s, s) for s in cultural.get('heading_styles', [])], literal=True)
+        self._add_family("heading_keyword", [(k, k) for k in cultural.get('heading_keywords', [])], literal=True)
+
+        boosters = HEADING_CONFIDENCE_BOOSTERS.get(language, {})
+        self._add_family("booster_pattern", boosters.get('patterns', []))
+        self._add_family("booster_keyword", boosters.get('keywords', []), literal=True)
+
+        self._add_family("numbering_type",
+                         LANGUAGE_NUMBERING_TYPES.get(language, []) + DEFAULT_NUMBERING_TYPES)
+        for feature, pattern in LANGUAGE_SCRIPTS.get(language, {}).items():
+            self._add_family(feature, [(pattern, None)])
+
+        self.regexes: Dict[str, Pattern] = {
+            stage: re.compile(''.join(f'(?:(?=(?P<{name}>{pattern}))|)' for pattern, name in groups.items()))
+            for stage, groups in self._anchored.items()
+        }
+
+        # Anchored entries refer to their group by index into match.regs
+        for family, (stage, entries) in self._families.items():
+            self._families[family] = (stage, [
+                (kind, self.regexes[stage].groupindex[key] if kind == ANCHORED else key, payload)
+                for kind, key, payload in entries
+            ])
+
+        # stage -> (text, group spans of the combined match, memoized searches)
+        self._last: Dict[str, Tuple[Optional[str], tuple, Dict[str, bool]]] = {}
+
+    def _add_family(self, family: str, entries: List[Tuple[str, Any]], literal: bool = False) -> None:
+        stage = self._stage_of.get(family, "features")
+        groups = self._anchored.setdefault(stage, {})
+        resolved = []
+        for pattern, payload in entries:
+            if literal:
+                resolved.append((LITERAL, pattern, payload))
+            elif _is_anchored(pattern):
+                name = groups.setdefault(pattern, f'{stage}_{len(groups)}')
+                resolved.append((ANCHORED, name, payload))
+            else:
+                self._searches.setdefault(pattern, re.compile(pattern))
+                resolved.append((SEARCH, pattern, payload))
+        self._families[family] = (stage, resolved)
+
+    @property
+    def pattern_count(self) -> int:
+        return sum(len(groups) for groups in self._anchored.values()) + len(self._searches)
+
+    def _scan(self, text: str, stage: str) -> Tuple[str, tuple, Dict[str, bool]]:
+        state = self._last.get(stage)
+        if state is None or state[0] != text:
+            state = (text, self.regexes[stage].match(text).regs, {})
+            self._last[stage] = state
+        return state
+
+    def _matches(self, state: Tuple[str, tuple, Dict[str, bool]], kind: int, key: Any) -> bool:
+        if kind == ANCHORED:
+            return state[1][key][0] != -1
+        if kind == LITERAL:
+            return key in state[0]
+        searched = state[2]
+        found = searched.get(key)
+        if found is None:
+            found = searched[key] = self._searches[key].search(state[0]) is not None
+        return found
+
+    def first(self, text: str, family: str, default: Any = None) -> Any:
+        """Payload of the first entry of ``family`` that matches ``text``."""
+        stage, entries = self._families[family]
+        state = self._scan(text, stage)
+        spans = state[1]
+        for kind, key, payload in entries:
+            if kind == ANCHORED:
+                if spans[key][0] != -1:
+                    return payload
+            elif self._matches(state, kind, key):
+                return payload
+        return default
+
+    def any(self, text: str, family: str) -> bool:
+        """True if any pattern of ``family`` matches ``text``."""
+        stage, entries = self._families[family]
+        state = self._scan(text, stage)
+        spans = state[1]
+        for kind, key, _ in entries:
+            if kind == ANCHORED:
+                if spans[key][0] != -1:
+                    return True
+            elif self._matches(state, kind, key):
+                return True
+        return False
+
+    def matched(self, text: str) -> List[str]:
+        """Names of every family with at least one match in ``text`` (for debugging)."""
+        return [family for family in self._families if self.any(text, family)]
+
+
+@lru_cache(maxsize=None)
+def get_pattern_engine(language: Optional[str] = None) -> PatternEngine:
+    """Shared pattern engine for a language, compiled on first use."""
+    return PatternEngine(language)
@@ -0,0 +1,191 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from config import settings
+from config.settings import BASE_DIR, RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+
+
+# Settings in config/settings.py that change results. Anything else (worker counts,
+# cache sizes, deadlines, tracing, batching) only changes how fast they are produced;
+# partial results from a deadline are never cached. A new setting that can change
+# what the pipeline outputs must be added here
+_OUTPUT_SETTINGS = (
+    # Candidate detection and scoring
+    "FONT_SIZE_THRESHOLD_RATIO", "MIN_FONT_SIZE_FOR_HEADING", "RELATIVE_SIZE_BONUS",
+    "BOLD_WEIGHT_THRESHOLD", "MIN_HEADING_LENGTH", "MAX_HEADING_LENGTH", "CANDIDATE_SCORE_WEIGHTS",
+    # Semantic filtering
+    "EMBEDDING_MODEL", "EMBEDDING_BACKEND", "EMBEDDING_STORE_DTYPE",
+    "SEMANTIC_SIMILARITY_THRESHOLD", "CONTEXT_WINDOW",
+    # Hierarchy and output
+    "MAX_HIERARCHY_LEVELS", "TITLE_POSITION_THRESHOLD", "CENTER_ALIGNMENT_TOLERANCE",
+    "OUTPUT_FORMAT", "INCLUDE_CONFIDENCE_SCORES", "INCLUDE_DEBUG_INFO",
+)
+
+_code_version: Optional[str] = None
+
+
+def code_version() -> str:
+    """Hash of the pipeline source (src/ and config/), computed once per process."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for package in ("src", "config"):
+            for source in sorted((BASE_DIR / package).rglob("*.py")):
+                digest.update(str(source.relative_to(BASE_DIR)).encode("utf-8"))
+                digest.update(source.read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def settings_fingerprint() -> Dict[str, Any]:
+    """Values of the output-relevant settings (model name, thresholds, weights, flags)."""
+    return {name: getattr(settings, name) for name in _OUTPUT_SETTINGS}
+
+
+def file_digest(pdf_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent, content-addressed cache of pipeline results.
+
+    Entries are keyed by the SHA-256 of the PDF bytes combined with the pipeline
+    configuration (output-relevant settings, processing flags and a hash of the
+    source code), so a renamed copy of a document is still a hit while any
+    settings or code change is a miss. Each entry is one JSON file; a hit bumps
+    the file's mtime, and writes evict the least recently used entries until the
+    directory is back under the size cap. Writes are atomic, so worker processes
+    can share the same directory.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_size_mb: Optional[float] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else RESULT_CACHE_DIR
+        self.max_bytes = int((max_size_mb if max_size_mb is not None else RESULT_CACHE_MAX_MB) * 1024 * 1024)
+        self.logger = logging.getLogger(__name__)
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+    def make_key(self, pdf_digest: str, flags: Dict[str, Any]) -> str:
+        """Cache key for a document digest processed with the given flags."""
+        config = {
+            "settings": settings_fingerprint(),
+            "flags": flags,
+            "code_version": code_version()
+        }
+        config_blob = json.dumps(config, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(pdf_digest.encode("ascii") + config_blob).hexdigest()
+
+    def key_for_file(self, pdf_path: Union[str, Path], flags: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a file on disk, or None if it cannot be read."""
+        try:
+            return self.make_key(file_digest(pdf_path), flags)
+        except OSError as e:
+            self.logger.debug(f"Cannot hash {pdf_path} for result cache: {e}")
+            return None
+
+    def key_for_buffer(self, data, flags: Dict[str, Any]) -> str:
+        """Cache key for an in-memory PDF (bytes, memoryview or mmap)."""
+        return self.make_key(hashlib.sha256(data).hexdigest(), flags)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result for a key, or None on a miss."""
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable result cache entry {entry.name}: {e}")
+            self._remove(entry)
+            self.stats["misses"] += 1
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+        self.stats["hits"] += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> bool:
+        """Store a result; returns False if it could not be cached."""
+        try:
+            payload = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Result is not JSON serializable, not caching: {e}")
+            return False
+
+        if len(payload) > self.max_bytes:
+            return False
+
+        entry = self._entry_path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = entry.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_file, entry)
+        except OSError as e:
+            self.logger.warning(f"Failed to write result cache entry: {e}")
+            return False
+
+        self.stats["stores"] += 1
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits the size cap."""
+        entries = []
+        total_size = 0
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total_size += stat.st_size
+
+        if total_size <= self.max_bytes:
+            return
+
+        entries.sort(key=lambda e: e[0])
+        for _, size, entry in entries:
+            if total_size <= self.max_bytes:
+                break
+            self._remove(entry)
+            total_size -= size
+            self.stats["evictions"] += 1
+
+    def _remove(self, entry: Path) -> None:
+        try:
+            entry.unlink()
+        except OSError:
+            pass  # already removed by another process
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        for entry in self.cache_dir.glob("*.json"):
+            self._remove(entry)
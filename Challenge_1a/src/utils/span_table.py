@@ -0,0 +1,344 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Tuple, Optional
+import numpy as np
+
+
+# Alignment codes used by SpanTable.alignment_codes()
+ALIGN_LEFT, ALIGN_CENTER, ALIGN_RIGHT = 0, 1, 2
+ALIGNMENT_NAMES = ("left", "center", "right")
+
+# PyMuPDF span flag bits
+BOLD_FLAG = 2**4
+ITALIC_FLAG = 2**1
+
+# Column detection (LineGeometry): a gutter is an x-range at least this wide
+# that almost no line crosses, separating columns at least this wide
+MIN_GUTTER_WIDTH = 8.0
+MIN_COLUMN_WIDTH = 50.0
+# Lines allowed to cross a gutter (titles, centered page numbers), as a share of the lines
+GUTTER_CROSSING_RATIO = 0.05
+# Table columns leave gutters too: a gutter between text columns has at least
+# this many lines on either side, and text on both sides along this share of
+# the text height
+MIN_COLUMN_LINES = 5
+MIN_GUTTER_HEIGHT_RATIO = 0.5
+
+
+@dataclass
+class LineGeometry:
+    """
+    Column index of the text lines of one page.
+
+    Text columns are found from gutters in the x-coverage of the lines, and each
+    line with spans is assigned to the column its left edge falls in.
+    """
+    column_bounds: np.ndarray   # (n_columns, 2) left, right
+    line_column: np.ndarray     # (n_lines,) column of each line, -1 for lines without spans
+
+    @classmethod
+    def from_table(cls, table: 'SpanTable') -> 'LineGeometry':
+        """Build the index from a page's line columns."""
+        n_lines = table.n_lines
+        line_ids = np.flatnonzero(table.has_spans())
+        bbox = table.line_bbox[line_ids]
+
+        column_bounds = cls._find_columns(bbox, table.page_width)
+
+        # Lines belong to the column their left edge falls in
+        line_column = np.full(n_lines, -1, dtype=np.int64)
+        if len(line_ids):
+            gutter_mid = (column_bounds[1:, 0] + column_bounds[:-1, 1]) / 2
+            line_column[line_ids] = np.searchsorted(gutter_mid, bbox[:, 0])
+
+        return cls(column_bounds=column_bounds, line_column=line_column)
+
+    @staticmethod
+    def _find_columns(bbox: np.ndarray, page_width: float) -> np.ndarray:
+        """
+        Column (left, right) bounds from the x-coverage profile of the lines.
+
+        Coverage is counted per point of the text area with a difference array;
+        runs crossed by at most GUTTER_CROSSING_RATIO of the lines are gutters. Columns narrower than MIN_COLUMN_WIDTH are merged
+        into their neighbour, as are columns split by a gutter that only runs
+        along a band of the page (see _is_text_gutter).
+        """
+        if len(bbox) == 0:
+            return np.array([[0.0, page_width]])
+
+        # Off-page and inverted extents are clamped to the page
+        x_left = np.clip(bbox[:, 0], 0, page_width)
+        x_right = np.maximum(np.clip(bbox[:, 2], 0, page_width), x_left)
+        left = float(x_left.min())
+        right = float(x_right.max())
+
+        # Coverage of each point of the text area [origin, origin + span)
+        origin = int(np.floor(left))
+        span = int(np.ceil(right)) - origin + 1
+        x0 = np.floor(x_left).astype(np.int64) - origin
+        x1 = np.ceil(x_right).astype(np.int64) - origin
+        coverage = np.cumsum(np.bincount(x0, minlength=span) - np.bincount(x1, minlength=span))
+
+        # Runs of open points, as alternating change positions of the padded mask
+        is_open = np.zeros(span + 2, dtype=np.int8)
+        is_open[1:-1] = coverage <= int(len(bbox) * GUTTER_CROSSING_RATIO)
+        changes = np.flatnonzero(is_open[1:] != is_open[:-1]) + origin
+        run_start, run_end = changes[0::2], changes[1::2]
+
+        bounds = []
+        column_left = left
+        for start, end in zip(run_start, run_end):
+            if end - start < MIN_GUTTER_WIDTH or start - column_left < MIN_COLUMN_WIDTH:
+                continue
+            bounds.append((column_left, float(start)))
+            column_left = float(end)
+        if bounds and right - column_left < MIN_COLUMN_WIDTH:
+            # Too narrow to be a column: the last gutter was not one
+            column_left = bounds.pop()[0]
+        bounds.append((column_left, right))
+
+        # Merge the columns on either side of gutters that do not separate text columns
+        gutter_mid = [(bounds[i][1] + bounds[i + 1][0]) / 2 for i in range(len(bounds) - 1)]
+        column = np.searchsorted(gutter_mid, x_left)
+        merged = [bounds[0]]
+        for gutter, next_bounds in enumerate(bounds[1:]):
+            if LineGeometry._is_text_gutter(bbox[column == gutter], bbox[column == gutter + 1], bbox):
+                merged.append(next_bounds)
+            else:
+                merged[-1] = (merged[-1][0], next_bounds[1])
+        return np.array(merged, dtype=np.float64)
+
+    @staticmethod
+    def _is_text_gutter(left_lines: np.ndarray, right_lines: np.ndarray, bbox: np.ndarray) -> bool:
+        """
+        True if a gutter separates columns of text rather than the cells of a table.
+
+        Each side needs MIN_COLUMN_LINES lines, and the heights covered by lines
+        on both sides must overlap along MIN_GUTTER_HEIGHT_RATIO of the text
+        height. A table, or a header row with text at both margins, only spans
+        a band of the page.
+        """
+        if len(left_lines) < MIN_COLUMN_LINES or len(right_lines) < MIN_COLUMN_LINES:
+            return False
+
+        top = int(np.floor(bbox[:, 1].min()))
+        height = int(np.ceil(bbox[:, 3].max())) - top + 1
+
+        def covered(lines: np.ndarray) -> np.ndarray:
+            y0 = np.clip(np.floor(lines[:, 1]).astype(np.int64) - top, 0, height)
+            y1 = np.clip(np.ceil(lines[:, 3]).astype(np.int64) - top, 0, height)
+            depth = np.cumsum(np.bincount(y0, minlength=height + 1) - np.bincount(y1, minlength=height + 1))
+            return depth[:height] > 0
+
+        both_sides = np.count_nonzero(covered(left_lines) & covered(right_lines))
+        return both_sides >= MIN_GUTTER_HEIGHT_RATIO * height
+
+    @property
+    def column_count(self) -> int:
+        return len(self.column_bounds)
+
+
+@dataclass
+class SpanTable:
+    """
+    Columnar (struct-of-arrays) view of the text on one page.
+
+    Built once from the ``get_text("dict")`` blocks of a page. Span attributes
+    (bbox, size, flags, font id, line/block ids) and line attributes (bbox,
+    block id, dominant span) live in NumPy arrays so layout checks can run as
+    vectorized masks; text is kept in plain Python lists alongside them.
+
+    Lines are stored in reading order (block by block, line by line) and include
+    lines without spans, so neighbouring-line geometry matches the block layout.
+    """
+    page_width: float
+    page_height: float
+
+    # Span columns
+    span_bbox: np.ndarray       # (n_spans, 4) x0, y0, x1, y1
+    span_size: np.ndarray       # (n_spans,)
+    span_flags: np.ndarray      # (n_spans,)
+    span_font_id: np.ndarray    # (n_spans,) index into fonts
+    span_line_id: np.ndarray    # (n_spans,) index into line columns
+    span_block_id: np.ndarray   # (n_spans,) index into the page's blocks
+    span_text: List[str]
+    fonts: List[str]
+
+    # Line columns
+    line_bbox: np.ndarray       # (n_lines, 4)
+    line_block_id: np.ndarray   # (n_lines,) index into the page's blocks
+    line_index: np.ndarray      # (n_lines,) index of the line within its block
+    line_dominant: np.ndarray   # (n_lines,) dominant span index, -1 if no spans
+    line_text: List[str]        # spans joined with single spaces
+
+    _geometry: Optional[LineGeometry] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_blocks(cls, blocks: List[Dict[str, Any]],
+                    page_width: float, page_height: float) -> 'SpanTable':
+        """Flatten ``get_text("dict")`` blocks into columns."""
+        span_bbox, span_size, span_flags = [], [], []
+        span_font_id, span_line_id, span_block_id = [], [], []
+        span_text = []
+        fonts: List[str] = []
+        font_ids: Dict[str, int] = {}
+
+        line_bbox, line_block_id, line_index, line_text = [], [], [], []
+
+        for block_idx, block in enumerate(blocks):
+            if "lines" not in block:
+                continue
+
+            for line_idx, line in enumerate(block["lines"]):
+                line_id = len(line_bbox)
+                line_bbox.append(line["bbox"])
+                line_block_id.append(block_idx)
+                line_index.append(line_idx)
+
+                spans = line["spans"]
+                for span in spans:
+                    font_id = font_ids.get(span["font"])
+                    if font_id is None:
+                        font_id = font_ids[span["font"]] = len(fonts)
+                        fonts.append(span["font"])
+
+                    span_bbox.append(span["bbox"])
+                    span_size.append(span["size"])
+                    span_flags.append(span["flags"])
+                    span_font_id.append(font_id)
+                    span_line_id.append(line_id)
+                    span_block_id.append(block_idx)
+                    span_text.append(span["text"])
+
+                line_text.append(" ".join([span["text"].strip() for span in spans]))
+
+        table = cls(
+            page_width=page_width,
+            page_height=page_height,
+            span_bbox=np.asarray(span_bbox, dtype=np.float64).reshape(-1, 4),
+            span_size=np.asarray(span_size, dtype=np.float64),
+            span_flags=np.asarray(span_flags, dtype=np.int64),
+            span_font_id=np.asarray(span_font_id, dtype=np.int32),
+            span_line_id=np.asarray(span_line_id, dtype=np.int32),
+            span_block_id=np.asarray(span_block_id, dtype=np.int32),
+            span_text=span_text,
+            fonts=fonts,
+            line_bbox=np.asarray(line_bbox, dtype=np.float64).reshape(-1, 4),
+            line_block_id=np.asarray(line_block_id, dtype=np.int32),
+            line_index=np.asarray(line_index, dtype=np.int32),
+            line_dominant=np.full(len(line_bbox), -1, dtype=np.int64),
+            line_text=line_text,
+        )
+        table.line_dominant = table._dominant_spans()
+        return table
+
+    @property
+    def n_lines(self) -> int:
+        return len(self.line_text)
+
+    @property
+    def n_spans(self) -> int:
+        return len(self.span_text)
+
+    def _dominant_spans(self) -> np.ndarray:
+        """
+        Index of the dominant span of each line: largest size, then longest text,
+        first occurrence on ties (same choice as ``max(spans, key=(size, len))``).
+        """
+        dominant = np.full(self.n_lines, -1, dtype=np.int64)
+        if self.n_spans == 0:
+            return dominant
+
+        span_idx = np.arange(self.n_spans)
+        text_len = np.fromiter((len(t) for t in self.span_text), dtype=np.int64, count=self.n_spans)
+
+        # Sort by line, then size, then text length, then reverse span order;
+        # the last entry of each line group is the dominant span.
+        order = np.lexsort((-span_idx, text_len, self.span_size, self.span_line_id))
+        sorted_lines = self.span_line_id[order]
+        group_ends = np.append(np.nonzero(np.diff(sorted_lines))[0], self.n_spans - 1)
+
+        dominant[sorted_lines[group_ends]] = order[group_ends]
+        return dominant
+
+    def has_spans(self) -> np.ndarray:
+        """Mask of lines that contain at least one span."""
+        return self.line_dominant >= 0
+
+    def line_size(self) -> np.ndarray:
+        """Font size of each line's dominant span (0 for lines without spans)."""
+        sizes = np.zeros(self.n_lines, dtype=np.float64)
+        has_spans = self.has_spans()
+        sizes[has_spans] = self.span_size[self.line_dominant[has_spans]]
+        return sizes
+
+    def line_flags(self) -> np.ndarray:
+        """Flags of each line's dominant span (0 for lines without spans)."""
+        flags = np.zeros(self.n_lines, dtype=np.int64)
+        has_spans = self.has_spans()
+        flags[has_spans] = self.span_flags[self.line_dominant[has_spans]]
+        return flags
+
+    def position_ratio(self) -> np.ndarray:
+        """Vertical position of each line's top edge (0 = top of page)."""
+        return self.line_bbox[:, 1] / self.page_height
+
+    def spacing_before(self) -> np.ndarray:
+        """
+        Gap between each line and the previous one: the previous line of the same
+        block, or the last line of the immediately preceding block. 0 otherwise.
+        """
+        spacing = np.zeros(self.n_lines, dtype=np.float64)
+        if self.n_lines < 2:
+            return spacing
+
+        gaps = self.line_bbox[1:, 1] - self.line_bbox[:-1, 3]
+        prev_block = self.line_block_id[:-1]
+        cur_block = self.line_block_id[1:]
+        adjacent = (cur_block == prev_block) | (cur_block - 1 == prev_block)
+
+        spacing[1:] = np.where(adjacent, gaps, 0.0)
+        return spacing
+
+    def spacing_after(self) -> np.ndarray:
+        """Gap between each line and the next line in reading order (0 for the last line)."""
+        spacing = np.zeros(self.n_lines, dtype=np.float64)
+        if self.n_lines < 2:
+            return spacing
+
+        spacing[:-1] = self.line_bbox[1:, 1] - self.line_bbox[:-1, 3]
+        return spacing
+
+    def geometry(self) -> LineGeometry:
+        """Column index of the lines, built on first use."""
+        if self._geometry is None:
+            self._geometry = LineGeometry.from_table(self)
+        return self._geometry
+
+    def alignment_codes(self, center_tolerance: float) -> np.ndarray:
+        """
+        Alignment of every line as ALIGN_* codes (see ALIGNMENT_NAMES).
+
+        On multi-column pages each line is measured against its own column
+        (from geometry()), otherwise against the page.
+        """
+        x0 = self.line_bbox[:, 0]
+        x1 = self.line_bbox[:, 2]
+        width = self.page_width
+
+        if self.n_lines:
+            geometry = self.geometry()
+            if geometry.column_count > 1:
+                bounds = geometry.column_bounds[np.maximum(geometry.line_column, 0)]
+                width = bounds[:, 1] - bounds[:, 0]
+                x0 = x0 - bounds[:, 0]
+                x1 = x1 - bounds[:, 0]
+
+        center_pos = (x0 + x1) / 2
+        is_center = np.abs(center_pos - width / 2) / width < center_tolerance
+        is_right = (width - x1) < x0 * 0.5
+
+        return np.where(is_center, ALIGN_CENTER, np.where(is_right, ALIGN_RIGHT, ALIGN_LEFT))
+
+    def line_bbox_tuple(self, line_id: int) -> Tuple[float, float, float, float]:
+        """Bounding box of a line as a plain tuple of floats."""
+        return tuple(self.line_bbox[line_id].tolist())
@@ -1,10 +1,16 @@
 import re
 import logging
+import threading
 import unicodedata
+import importlib.util
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Dict, Any, Optional, Tuple, Set
 from collections import Counter, defaultdict
 import numpy as np
 from pathlib import Path
+from config.settings import HEADING_ANALYSIS_CACHE_SIZE
+from src.utils.pattern_engine import get_pattern_engine
 
 # Language detection imports
 try:
@@ -15,30 +21,66 @@ except ImportError:
     LANGDETECT_AVAILABLE = False
     logging.warning("langdetect not available, language detection will be limited")
 
-# NLP imports
-try:
-    import nltk
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    from nltk.corpus import stopwords
-    NLTK_AVAILABLE = True
-except ImportError:
-    NLTK_AVAILABLE = False
-    #logging.warning("NLTK not available, some text processing features will be limited")
+# NLP and tokenizer packages are only looked up here and imported on first use,
+# so the fast path (which never tokenizes sentences) does not pay for them
+NLTK_AVAILABLE = importlib.util.find_spec("nltk") is not None
 
-# SentencePiece imports for better CJK tokenization
-try:
-    import sentencepiece as spm
-    SENTENCEPIECE_AVAILABLE = True
-except ImportError:
-    SENTENCEPIECE_AVAILABLE = False
+# SentencePiece for better CJK tokenization
+SENTENCEPIECE_AVAILABLE = importlib.util.find_spec("sentencepiece") is not None
+if not SENTENCEPIECE_AVAILABLE:
     logging.warning("SentencePiece not available, CJK tokenization will use fallback methods")
 
 # Additional tokenizers for specific languages
-try:
-    import MeCab
-    MECAB_AVAILABLE = True
-except ImportError:
-    MECAB_AVAILABLE = False
+MECAB_AVAILABLE = importlib.util.find_spec("MeCab") is not None
+
+_nltk = None
+_nltk_lock = threading.Lock()
+
+
+def _get_nltk():
+    """
+    Import nltk on first use, make sure its data is present (downloading it once
+    if missing) and route punkt_tab lookups to the classic punkt tokenizer.
+    """
+    global _nltk
+    if _nltk is None:
+        with _nltk_lock:
+            if _nltk is None:
+                import nltk
+                _ensure_nltk_data(nltk)
+                _patch_punkt_tab(nltk)
+                _nltk = nltk
+    return _nltk
+
+
+def _ensure_nltk_data(nltk) -> None:
+    """Ensure required NLTK data is downloaded."""
+    required_data = {
+        'punkt': 'tokenizers/punkt',
+        'stopwords': 'corpora/stopwords',
+        'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger'
+    }
+    
+    for data_name, resource_path in required_data.items():
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            try:
+                nltk.download(data_name, quiet=True)
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Failed to download NLTK data '{data_name}': {e}")
+
+
+def _patch_punkt_tab(nltk) -> None:
+    """Newer nltk releases look for 'punkt_tab'; substitute the punkt english pickle."""
+    original_find = nltk.data.find
+    
+    def patched_find(resource_name, *args, **kwargs):
+        if 'punkt_tab' in resource_name:
+            return original_find('tokenizers/punkt/english.pickle', *args, **kwargs)
+        return original_find(resource_name, *args, **kwargs)
+    
+    nltk.data.find = patched_find
 
 
 class TokenizerManager:
@@ -58,6 +100,7 @@ class TokenizerManager:
         # Initialize MeCab for Japanese if available
         if MECAB_AVAILABLE:
             try:
+                import MeCab
                 self.tokenizers['mecab'] = MeCab.Tagger('-Owakati')
                 #self.logger.info("MeCab tokenizer initialized")
             except Exception as e:
@@ -75,6 +118,7 @@ class TokenizerManager:
         for lang, model_path in model_configs.items():
             try:
                 if Path(model_path).exists():
+                    import sentencepiece as spm
                     sp = spm.SentencePieceProcessor()
                     sp.load(model_path)
                     self.tokenizers[f'sp_{lang}'] = sp
@@ -93,20 +137,23 @@ class TokenizerManager:
         return None
 
 
-# Global tokenizer manager instance
-_tokenizer_manager = TokenizerManager()
+@lru_cache(maxsize=None)
+def _get_tokenizer_manager() -> TokenizerManager:
+    """Process-wide tokenizer manager, created on first CJK tokenization."""
+    return TokenizerManager()
 
 
 class TextUtils:
-    """Advanced text processing and analysis utilities."""
+    """
+    Advanced text processing and analysis utilities.
+    
+    Holds compiled patterns and language tables only, all read-only; use the
+    process-wide instance from get_text_utils() instead of constructing one.
+    """
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # Initialize NLTK data if available
-        if NLTK_AVAILABLE:
-            self._ensure_nltk_data()
-        
         # Text cleaning patterns
         self.whitespace_pattern = re.compile(r'\s+')
         self.punctuation_pattern = re.compile(r'[^\w\s]')
@@ -115,7 +162,7 @@ class TextUtils:
         self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
         
         # Language-specific patterns
-        self.language_patterns = {
+        self.language_patterns = _freeze({
             'english': {
                 'articles': {'a', 'an', 'the'},
                 'common_words': {'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with'},
@@ -137,10 +184,10 @@ class TextUtils:
                 'particles': {'का', 'की', 'के', 'में', 'से', 'को', 'पर', 'और'},
                 'heading_indicators': {'अध्याय', 'खंड', 'भाग', 'प्रकरण', 'के बारे में'}
             }
-        }
+        })
         
         # Character encoding mappings
-        self.unicode_replacements = {
+        self.unicode_replacements = MappingProxyType({
             '\u2019': "'",  # Right single quotation mark
             '\u2018': "'",  # Left single quotation mark
             '\u201c': '"',  # Left double quotation mark
@@ -150,20 +197,26 @@ class TextUtils:
             '\u2026': '...', # Horizontal ellipsis
             '\u00a0': ' ',  # Non-breaking space
             '\u2022': '•',  # Bullet
-        }
-    
-    def _ensure_nltk_data(self):
-        """Ensure required NLTK data is downloaded."""
-        required_data = ['punkt', 'stopwords', 'averaged_perceptron_tagger']
-        
-        for data_name in required_data:
-            try:
-                nltk.data.find(f'tokenizers/{data_name}')
-            except LookupError:
-                try:
-                    nltk.download(data_name, quiet=True)
-                except Exception as e:
-                    self.logger.warning(f"Failed to download NLTK data '{data_name}': {e}")
+        })
+
+
+def _freeze(tables: Dict[str, Dict[str, Set[str]]]) -> MappingProxyType:
+    """Read-only view of nested language tables (sets become frozensets)."""
+    return MappingProxyType({
+        name: MappingProxyType({key: frozenset(values) for key, values in table.items()})
+        for name, table in tables.items()
+    })
+
+
+@lru_cache(maxsize=None)
+def get_text_utils() -> TextUtils:
+    """Process-wide TextUtils instance, created on first use."""
+    return TextUtils()
+
+
+def _copy_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a memoized analysis, so callers can modify what they get back."""
+    return dict(analysis, reasons=list(analysis["reasons"]))
 
 
 def tokenize_japanese(text: str) -> List[str]:
@@ -175,7 +228,7 @@ def tokenize_japanese(text: str) -> List[str]:
     
     # Try SentencePiece first
     if SENTENCEPIECE_AVAILABLE:
-        tokenizer = _tokenizer_manager.get_tokenizer('japanese', 'sentencepiece')
+        tokenizer = _get_tokenizer_manager().get_tokenizer('japanese', 'sentencepiece')
         if tokenizer:
             try:
                 tokens = tokenizer.encode_as_pieces(text)
@@ -186,7 +239,7 @@ def tokenize_japanese(text: str) -> List[str]:
     
     # Try MeCab as fallback
     if MECAB_AVAILABLE:
-        tokenizer = _tokenizer_manager.get_tokenizer('japanese', 'mecab')
+        tokenizer = _get_tokenizer_manager().get_tokenizer('japanese', 'mecab')
         if tokenizer:
             try:
                 result = tokenizer.parse(text).strip()
@@ -208,7 +261,7 @@ def tokenize_chinese(text: str) -> List[str]:
     
     # Try SentencePiece
     if SENTENCEPIECE_AVAILABLE:
-        tokenizer = _tokenizer_manager.get_tokenizer('chinese', 'sentencepiece')
+        tokenizer = _get_tokenizer_manager().get_tokenizer('chinese', 'sentencepiece')
         if tokenizer:
             try:
                 tokens = tokenizer.encode_as_pieces(text)
@@ -220,8 +273,13 @@ def tokenize_chinese(text: str) -> List[str]:
     return _chinese_character_split(text)
 
 
-def tokenize_multilingual(text: str, language: str = 'auto') -> List[str]:
-    """Universal tokenization that handles multiple languages intelligently."""
+def tokenize_multilingual(text: str, language: str = 'auto', use_nltk: bool = True) -> List[str]:
+    """
+    Universal tokenization that handles multiple languages intelligently.
+    
+    ``use_nltk=False`` splits European languages with a regex instead of NLTK,
+    for per-line callers on the fast path that must not import NLTK.
+    """
     if not text or not text.strip():
         return []
     
@@ -240,7 +298,7 @@ def tokenize_multilingual(text: str, language: str = 'auto') -> List[str]:
         return _handle_rtl_languages(text, language)
     else:
         # Use NLTK for European languages
-        return extract_words(text, language)
+        return extract_words(text, language, use_nltk=use_nltk)
 
 
 def _japanese_character_split(text: str) -> List[str]:
@@ -301,6 +359,12 @@ def enhance_heading_detection_for_cjk(text: str, language: str) -> Dict[str, Any
     if not text:
         return {"is_heading": False, "confidence": 0.0, "reasons": []}
     
+    return _copy_analysis(_cjk_heading_analysis(text, language))
+
+
+@lru_cache(maxsize=HEADING_ANALYSIS_CACHE_SIZE)
+def _cjk_heading_analysis(text: str, language: str) -> Dict[str, Any]:
+    """Memoized body of enhance_heading_detection_for_cjk (never modify the result)."""
     reasons = []
     score = 0.0
     
@@ -323,7 +387,7 @@ def enhance_heading_detection_for_cjk(text: str, language: str) -> Dict[str, Any
                 break
         
         # Check for numbering patterns
-        if re.search(r'第[一二三四五六七八九十\d]+[章節部篇]', text):
+        if get_pattern_engine(language).any(text, "cjk_numbered_chapter"):
             score += 0.4
             reasons.append("numbered_chapter")
         
@@ -367,7 +431,7 @@ def clean_text(text: str) -> str:
     text = unicodedata.normalize('NFKC', text)
     
     # Replace common Unicode characters
-    utils = TextUtils()
+    utils = get_text_utils()
     for unicode_char, replacement in utils.unicode_replacements.items():
         text = text.replace(unicode_char, replacement)
     
@@ -431,17 +495,13 @@ def extract_sentences(text: str, language: str = 'english') -> List[str]:
 
     if NLTK_AVAILABLE:
         try:
-            # Sanity check: ensure 'punkt' tokenizer is available
-            try:
-                nltk.data.find('tokenizers/punkt/english.pickle')
-            except LookupError:
-                nltk.download('punkt', quiet=True)
+            nltk = _get_nltk()  # checks for 'punkt' on first use
 
             # Restrict language to those supported by NLTK
             supported_languages = ['english', 'spanish', 'portuguese', 'french', 'german']
             language_for_tokenize = language if language in supported_languages else 'english'
 
-            sentences = sent_tokenize(text, language=language_for_tokenize)
+            sentences = nltk.tokenize.sent_tokenize(text, language=language_for_tokenize)
 
         except Exception as e:
             logging.warning(f"NLTK sentence tokenization failed, falling back to simple split: {e}")
@@ -472,7 +532,7 @@ def _simple_sentence_split(text: str) -> List[str]:
 
 
 def extract_words(text: str, language: str = 'english', 
-                 include_stopwords: bool = True) -> List[str]:
+                 include_stopwords: bool = True, use_nltk: bool = True) -> List[str]:
     """Extract words from text with advanced language-aware tokenization."""
     if not text:
         return []
@@ -483,14 +543,15 @@ def extract_words(text: str, language: str = 'english',
     if language in ['japanese', 'chinese']:
         return tokenize_multilingual(text, language)
     
-    if NLTK_AVAILABLE:
+    if NLTK_AVAILABLE and use_nltk:
         try:
-            words = word_tokenize(text, language=language if language in ['english', 'spanish', 'portuguese', 'french', 'german'] else 'english')
+            nltk = _get_nltk()
+            words = nltk.tokenize.word_tokenize(text, language=language if language in ['english', 'spanish', 'portuguese', 'french', 'german'] else 'english')
             
             # Filter out punctuation and optionally stopwords
             if not include_stopwords and language == 'english':
                 try:
-                    stop_words = set(stopwords.words('english'))
+                    stop_words = set(nltk.corpus.stopwords.words('english'))
                     words = [word for word in words if word.lower() not in stop_words and word.isalpha()]
                 except Exception:
                     words = [word for word in words if word.isalpha()]
@@ -579,15 +640,26 @@ def _simple_language_detection(text: str) -> str:
 
 
 def is_likely_heading(text: str, language: str = 'english') -> Dict[str, Any]:
-    """Analyze if text is likely to be a heading based on linguistic features with CJK support."""
+    """Analyze if text is likely to be a heading based on linguistic features with CJK support.
+    
+    Results are memoized per (text, language): the same strings (running
+    headers, "Table of Contents", numbered templates) recur across pages and
+    documents.
+    """
     if not text:
         return {"is_heading": False, "confidence": 0.0, "reasons": []}
     
-    text = text.strip()
-    
+    return _copy_analysis(_heading_analysis(text.strip(), language))
+
+
+@lru_cache(maxsize=HEADING_ANALYSIS_CACHE_SIZE)
+def _heading_analysis(text: str, language: str) -> Dict[str, Any]:
+    """Memoized body of is_likely_heading for stripped text (never modify the result)."""
     # Use enhanced CJK detection if applicable
     if language in ['japanese', 'chinese']:
-        return enhance_heading_detection_for_cjk(text, language)
+        if not text:
+            return {"is_heading": False, "confidence": 0.0, "reasons": []}
+        return _cjk_heading_analysis(text, language)
     
     # Original logic for other languages
     reasons = []
@@ -620,25 +692,17 @@ def is_likely_heading(text: str, language: str = 'english') -> Dict[str, Any]:
         score -= 0.1
         reasons.append("ends_with_period")
     
-    # Check for numbering patterns
-    numbering_patterns = [
-        r'^\d+\.',          # 1. 2. 3.
-        r'^\d+\.\d+',       # 1.1 1.2
-        r'^[IVX]+\.',       # I. II. III.
-        r'^[A-Z]\.',        # A. B. C.
-        r'^Chapter \d+',    # Chapter 1
-        r'^Section \d+',    # Section 1
-    ]
+    pattern_engine = get_pattern_engine(language)
     
-    for pattern in numbering_patterns:
-        if re.match(pattern, text, re.IGNORECASE):
-            score += 0.3
-            reasons.append("has_numbering")
-            break
+    # Check for numbering patterns (1., 1.1, I., A., Chapter 1, Section 1)
+    if pattern_engine.any(text, "heading_numbering"):
+        score += 0.3
+        reasons.append("has_numbering")
     
     # Language-specific analysis
-    if language in TextUtils().language_patterns:
-        patterns = TextUtils().language_patterns[language]
+    language_patterns = get_text_utils().language_patterns
+    if language in language_patterns:
+        patterns = language_patterns[language]
         heading_indicators = patterns.get('heading_indicators', set())
         
         text_lower = text.lower()
@@ -657,20 +721,10 @@ def is_likely_heading(text: str, language: str = 'english') -> Dict[str, Any]:
         score -= 0.1
         reasons.append("too_many_words")
     
-    # Check for common non-heading patterns
-    non_heading_patterns = [
-        r'^\d+$',           # Just numbers
-        r'^page \d+',       # Page numbers
-        r'@',               # Email addresses
-        r'http',            # URLs
-        r'www\.',           # URLs
-    ]
-    
-    for pattern in non_heading_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            score -= 0.3
-            reasons.append("non_heading_pattern")
-            break
+    # Check for common non-heading patterns (numbers, page numbers, emails, URLs)
+    if pattern_engine.any(text, "non_heading"):
+        score -= 0.3
+        reasons.append("non_heading_pattern")
     
     # Normalize score
     confidence = max(0.0, min(1.0, score))
@@ -707,9 +761,9 @@ def extract_key_phrases(text: str, max_phrases: int = 10) -> List[Tuple[str, flo
     # Bigrams (two-word phrases)
     if NLTK_AVAILABLE:
         try:
-            from nltk import bigrams
-            word_tokens = word_tokenize(text.lower())
-            bigram_freq = Counter(bigrams(word_tokens))
+            nltk = _get_nltk()
+            word_tokens = nltk.tokenize.word_tokenize(text.lower())
+            bigram_freq = Counter(nltk.bigrams(word_tokens))
             
             for (word1, word2), freq in bigram_freq.most_common(max_phrases // 2):
                 if len(word1) > 2 and len(word2) > 2 and freq > 1:
@@ -811,7 +865,7 @@ def contains_url_or_email(text: str) -> bool:
     if not text:
         return False
     
-    utils = TextUtils()
+    utils = get_text_utils()
     return bool(utils.url_pattern.search(text) or utils.email_pattern.search(text))
 
 
@@ -922,7 +976,7 @@ def get_tokenizer_info() -> Dict[str, Any]:
         "mecab_available": MECAB_AVAILABLE,
         "nltk_available": NLTK_AVAILABLE,
         "langdetect_available": LANGDETECT_AVAILABLE,
-        "loaded_models": list(_tokenizer_manager.tokenizers.keys())
+        "loaded_models": list(_get_tokenizer_manager().tokenizers.keys())
     }
     
     return info
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import random
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from config.settings import TRACE_SAMPLE_RATE, TRACE_MAX_EVENTS
+
+
+class _Tracer:
+    """
+    Process-global collector of trace spans in Chrome trace event format.
+
+    Disabled by default: ``span()`` then returns a shared no-op object, so the
+    instrumentation left in the pipeline costs one attribute check per call.
+    When enabled, sampling is decided per document (``document()``), and only
+    the thread processing a sampled document records spans. Events are kept in
+    memory up to ``max_events`` and written with ``export_chrome_trace``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = TRACE_SAMPLE_RATE
+        self.max_events = TRACE_MAX_EVENTS
+        self.events: List[Dict[str, Any]] = []
+        self.dropped_events = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def active(self) -> bool:
+        """True if spans are being recorded on the current thread."""
+        return self.enabled and getattr(self._local, "depth", 0) > 0
+
+    def record(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+            else:
+                self.dropped_events += 1
+
+
+_tracer = _Tracer()
+
+
+class Span:
+    """One timed span; extra ``args`` (counts, sizes) can be attached with ``set``."""
+
+    __slots__ = ("name", "cat", "args", "_start_ns", "_is_document")
+
+    def __init__(self, name: str, cat: str, args: Dict[str, Any], is_document: bool = False):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._start_ns = 0
+        self._is_document = is_document
+
+    def set(self, **args) -> 'Span':
+        self.args.update(args)
+        return self
+
+    def __enter__(self) -> 'Span':
+        if self._is_document:
+            _tracer._local.depth = getattr(_tracer._local, "depth", 0) + 1
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+
+        _tracer.record({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": self._start_ns / 1000,
+            "dur": (end_ns - self._start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args
+        })
+
+        if self._is_document:
+            _tracer._local.depth -= 1
+
+
+class _NoopSpan:
+    """Span stand-in used when the current thread is not being traced."""
+
+    __slots__ = ()
+
+    def set(self, **args) -> '_NoopSpan':
+        return self
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def enable(sample_rate: Optional[float] = None, max_events: Optional[int] = None) -> None:
+    """Start collecting spans for a fraction ``sample_rate`` of documents."""
+    if sample_rate is not None:
+        _tracer.sample_rate = sample_rate
+    if max_events is not None:
+        _tracer.max_events = max_events
+    _tracer.enabled = True
+
+
+def disable() -> None:
+    _tracer.enabled = False
+
+
+def is_enabled() -> bool:
+    return _tracer.enabled
+
+
+def span(name: str, cat: str = "pipeline", **args) -> Union[Span, _NoopSpan]:
+    """Span nested inside the current document trace (no-op if not traced)."""
+    if not _tracer.active:
+        return _NOOP_SPAN
+    return Span(name, cat, args)
+
+
+def document(name: str, **args) -> Union[Span, _NoopSpan]:
+    """
+    Root span for one document. Decides sampling: when the document is sampled,
+    spans opened on this thread until the root span closes are recorded.
+    """
+    if not _tracer.enabled:
+        return _NOOP_SPAN
+    if _tracer.active or random.random() < _tracer.sample_rate:
+        return Span(name, "document", args, is_document=True)
+    return _NOOP_SPAN
+
+
+def drain_events() -> List[Dict[str, Any]]:
+    """Remove and return collected events (used to ship events from worker processes)."""
+    with _tracer._lock:
+        events, _tracer.events = _tracer.events, []
+    return events
+
+
+def add_events(events: List[Dict[str, Any]]) -> None:
+    """Merge events collected in another process."""
+    for event in events:
+        _tracer.record(event)
+
+
+def export_chrome_trace(output_path: Union[str, Path]) -> int:
+    """
+    Write collected events as Chrome trace JSON (chrome://tracing, Perfetto UI).
+    Returns the number of events written.
+    """
+    with _tracer._lock:
+        events = list(_tracer.events)
+        dropped = _tracer.dropped_events
+
+    trace = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"dropped_events": dropped}
+    }
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, ensure_ascii=False, default=str)
+
+    return len(events)
@@ -16,6 +16,7 @@ from datetime import datetime
 
 from config.settings import MAX_FILE_SIZE_MB, MIN_HEADING_LENGTH, MAX_HEADING_LENGTH
 from src.utils.text_utils import clean_text, detect_language, is_likely_heading
+from src.utils.document_cache import DocumentCache
 
 
 
@@ -58,8 +59,9 @@ class PDFValidator:
             return False
 
     
-    def validate_pdf_file(self, file_path: Union[str, Path]) -> Dict[str, Any]:
-        """Comprehensive PDF file validation."""
+    def validate_pdf_file(self, file_path: Union[str, Path],
+                          document: Optional[DocumentCache] = None) -> Dict[str, Any]:
+        """Comprehensive PDF file validation (reuses ``document`` if already parsed)."""
         file_path = Path(file_path)
         validation_result = {
             "is_valid": False,
@@ -72,25 +74,37 @@ class PDFValidator:
         }
         
         try:
-            # Basic file existence and accessibility
-            file_info = self._validate_file_basics(file_path)
+            # Basic file existence and accessibility (buffer checks for in-memory documents)
+            if document is not None and document.is_in_memory:
+                file_info = self._validate_buffer_basics(document)
+            else:
+                file_info = self._validate_file_basics(file_path)
             validation_result["file_info"] = file_info
             
             if file_info.get("errors"):
                 validation_result["errors"].extend(file_info["errors"])
                 return validation_result
             
-            # PDF-specific validation
-            pdf_info = self._validate_pdf_structure(file_path)
-            validation_result["pdf_info"] = pdf_info
-            
-            if pdf_info.get("errors"):
-                validation_result["errors"].extend(pdf_info["errors"])
-                return validation_result
+            # Parse once for both structure and content validation
+            owns_document = document is None
+            if owns_document:
+                document = DocumentCache(file_path)
             
-            # Content validation
-            content_info = self._validate_pdf_content(file_path)
-            validation_result["content_info"] = content_info
+            try:
+                # PDF-specific validation
+                pdf_info = self._validate_pdf_structure(file_path, document)
+                validation_result["pdf_info"] = pdf_info
+                
+                if pdf_info.get("errors"):
+                    validation_result["errors"].extend(pdf_info["errors"])
+                    return validation_result
+                
+                # Content validation
+                content_info = self._validate_pdf_content(file_path, document)
+                validation_result["content_info"] = content_info
+            finally:
+                if owns_document:
+                    document.close()
             
             if content_info.get("errors"):
                 validation_result["errors"].extend(content_info["errors"])
@@ -163,6 +177,33 @@ class PDFValidator:
         
         return info
     
+    def _validate_buffer_basics(self, document: DocumentCache) -> Dict[str, Any]:
+        """Validate basic properties of a PDF held in memory."""
+        info = {
+            "exists": True,
+            "readable": True,
+            "size_bytes": document.size_bytes,
+            "extension": Path(document.pdf_path).suffix.lower(),
+            "mime_type": "",
+            "errors": [],
+            "warnings": []
+        }
+        
+        # Validate buffer size
+        if info["size_bytes"] < self.min_file_size:
+            info["errors"].append(f"File too small: {info['size_bytes']} bytes (minimum: {self.min_file_size})")
+        elif info["size_bytes"] > self.max_file_size:
+            info["warnings"].append(f"Large file: {info['size_bytes'] / (1024*1024):.1f}MB (may be slow to process)")
+        
+        # No file name to trust: check the PDF signature instead of the extension
+        if bytes(document.data[:5]) == b"%PDF-":
+            info["mime_type"] = "application/pdf"
+        else:
+            info["mime_type"] = "application/octet-stream"
+            info["warnings"].append("Missing %PDF- header")
+        
+        return info
+    
     def _get_mime_type(self, file_path: Path) -> str:
         """Get MIME type of the file."""
         try:
@@ -176,7 +217,7 @@ class PDFValidator:
             self.logger.warning(f"MIME type detection failed: {e}")
             return "unknown"
     
-    def _validate_pdf_structure(self, file_path: Path) -> Dict[str, Any]:
+    def _validate_pdf_structure(self, file_path: Path, document: DocumentCache) -> Dict[str, Any]:
         """Validate PDF document structure."""
         info = {
             "can_open": False,
@@ -190,7 +231,7 @@ class PDFValidator:
         }
         
         try:
-            doc = fitz.open(str(file_path))
+            doc = document.doc
             
             info["can_open"] = True
             info["page_count"] = len(doc)
@@ -231,8 +272,7 @@ class PDFValidator:
                     # Check first few pages for text
                     text_found = False
                     for page_num in range(min(3, info["page_count"])):
-                        page = doc.load_page(page_num)
-                        page_text = page.get_text().strip()
+                        page_text = document.page_text(page_num).strip()
                         if len(page_text) > 10:  # At least some meaningful text
                             text_found = True
                             break
@@ -244,14 +284,12 @@ class PDFValidator:
                 except Exception as e:
                     info["warnings"].append(f"Cannot extract text for validation: {e}")
             
-            doc.close()
-            
         except Exception as e:
             info["errors"].append(f"Cannot open PDF: {str(e)}")
         
         return info
     
-    def _validate_pdf_content(self, file_path: Path) -> Dict[str, Any]:
+    def _validate_pdf_content(self, file_path: Path, document: DocumentCache) -> Dict[str, Any]:
         """Validate PDF content for heading extraction."""
         info = {
             "total_text_length": 0,
@@ -266,11 +304,10 @@ class PDFValidator:
         }
         
         try:
-            doc = fitz.open(str(file_path))
+            doc = document.doc
             
             if doc.needs_pass:
                 info["errors"].append("Cannot analyze encrypted PDF content")
-                doc.close()
                 return info
             
             total_text = ""
@@ -284,8 +321,7 @@ class PDFValidator:
             pages_to_analyze = min(5, len(doc))
             
             for page_num in range(pages_to_analyze):
-                page = doc.load_page(page_num)
-                page_text = page.get_text()
+                page_text = document.page_text(page_num)
                 
                 if page_text.strip():
                     pages_with_text += 1
@@ -293,7 +329,7 @@ class PDFValidator:
                 
                 # Analyze text blocks
                 try:
-                    blocks = page.get_text("dict")["blocks"]
+                    blocks = document.page_blocks(page_num)
                     total_blocks += len([b for b in blocks if "lines" in b])
                     
                     # Analyze fonts and potential headings
@@ -315,8 +351,6 @@ class PDFValidator:
                 except Exception as e:
                     info["warnings"].append(f"Cannot analyze page {page_num + 1} structure: {e}")
             
-            doc.close()
-            
             # Populate analysis results
             info["total_text_length"] = len(total_text)
             info["total_blocks"] = total_blocks
@@ -651,11 +685,11 @@ class ResultValidator:
 
 
 # Convenience functions
-def validate_pdf(file_path: Union[str, Path]) -> bool:
+def validate_pdf(file_path: Union[str, Path], document: Optional[DocumentCache] = None) -> bool:
     """Quick PDF validation - returns True if valid, False otherwise."""
     try:
         validator = PDFValidator()
-        result = validator.validate_pdf_file(file_path)
+        result = validator.validate_pdf_file(file_path, document=document)
         return result["is_valid"]
     except Exception:
         return False
@@ -0,0 +1,115 @@
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+
+
+# Word tokens: runs of letters/digits (punctuation, '-' and '_' separate tokens)
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """
+    Lowercased word tokens of a string, as used by PageWordIndex.
+
+    NFKC folds compatibility characters (ligatures, full-width forms, and the
+    Arabic presentation forms shaped text is often extracted as), so page text
+    matches the plain characters of TOC titles.
+    """
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+@dataclass
+class PageWordIndex:
+    """
+    Normalized word index of one page.
+
+    Built from PyMuPDF ``get_text("words")`` output: every word is split into
+    normalized tokens, and each token keeps the bbox and line of its word.
+    ``positions`` maps a token to where it occurs, so a phrase is found by
+    looking up its first token and comparing the following ones, without
+    scanning the page text.
+    """
+    tokens: List[str]
+    bboxes: List[Tuple[float, float, float, float]]
+    line_ids: List[int]
+    positions: Dict[str, List[int]] = field(default_factory=dict)
+    _text: Optional[str] = None
+
+    @classmethod
+    def from_words(cls, words: List[tuple]) -> 'PageWordIndex':
+        """Build from ``(x0, y0, x1, y1, word, block_no, line_no, word_no)`` tuples."""
+        tokens, bboxes, line_ids = [], [], []
+        line_keys: Dict[Tuple[int, int], int] = {}
+
+        for x0, y0, x1, y1, word, block_no, line_no, _ in words:
+            line_id = line_keys.setdefault((block_no, line_no), len(line_keys))
+            for token in normalize_tokens(word):
+                tokens.append(token)
+                bboxes.append((x0, y0, x1, y1))
+                line_ids.append(line_id)
+
+        positions = defaultdict(list)
+        for i, token in enumerate(tokens):
+            positions[token].append(i)
+
+        return cls(tokens=tokens, bboxes=bboxes, line_ids=line_ids, positions=dict(positions))
+
+    @property
+    def text(self) -> str:
+        """Normalized page text (tokens joined by single spaces)."""
+        if self._text is None:
+            self._text = " ".join(self.tokens)
+        return self._text
+
+    def find_sequence(self, tokens: List[str]) -> int:
+        """Start index of the first occurrence of a token sequence, or -1."""
+        if not tokens:
+            return -1
+
+        n = len(tokens)
+        for start in self.positions.get(tokens[0], ()):
+            if self.tokens[start:start + n] == tokens:
+                return start
+        return -1
+
+    def contains(self, tokens: List[str]) -> bool:
+        """True if the tokens occur on the page, also inside longer words or run together."""
+        if not tokens:
+            return False
+        if self.find_sequence(tokens) >= 0:
+            return True
+
+        # Slower fallbacks: partial words ("intro" in "introduction"), scripts
+        # written without spaces, and titles whose spaces were dropped on the page
+        phrase = " ".join(tokens)
+        return phrase in self.text or (len(tokens) > 1 and "".join(tokens) in self.text)
+
+    def sequence_bbox(self, start: int, length: int) -> Tuple[float, float, float, float]:
+        """Bounding box of a matched sequence, limited to its first line (like search_for's first hit)."""
+        first_line = self.line_ids[start]
+        boxes = [self.bboxes[i] for i in range(start, start + length) if self.line_ids[i] == first_line]
+        return (
+            min(b[0] for b in boxes),
+            min(b[1] for b in boxes),
+            max(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+
+    def locate(self, tokens: List[str]) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Bbox of the tokens on the page, or of their longest significant word
+        (more than 3 characters) if the full sequence is not present.
+        """
+        start = self.find_sequence(tokens)
+        if start >= 0:
+            return self.sequence_bbox(start, len(tokens))
+
+        words = [t for t in tokens if len(t) > 3]
+        if words:
+            longest_word = max(words, key=len)
+            positions = self.positions.get(longest_word)
+            if positions:
+                return self.bboxes[positions[0]]
+        return None
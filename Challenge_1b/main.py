@@ -5,6 +5,7 @@ Enhanced version with advanced features and optimizations
 """
 
 import os
+import sys
 import json
 import logging
 from datetime import datetime
@@ -1023,12 +1024,28 @@ class AdvancedDocumentProcessor:
             logger.error(f"Error generating accessibility summary: {e}")
             return {'error': str(e)}
 
+def open_shared_embedding_store(model_name: str):
+    """Open Challenge 1A's memory-mapped EmbeddingStore for a model, or None if it is not available"""
+    challenge_1a = Path(__file__).resolve().parent.parent / "Challenge_1a"
+    if challenge_1a.is_dir() and str(challenge_1a) not in sys.path:
+        sys.path.append(str(challenge_1a))
+    
+    try:
+        from src.utils.embedding_store import EmbeddingStore
+        return EmbeddingStore(model_name)
+    except Exception as e:
+        logger.info(f"Shared embedding store not available, caching embeddings as .npy files: {e}")
+        return None
+
 class CacheManager:
     """Advanced caching system for model optimization"""
     
-    def __init__(self, cache_dir: str = "./model_cache"):
+    def __init__(self, cache_dir: str = "./model_cache", model_name: str = 'all-MiniLM-L6-v2'):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        # Embeddings go to the store shared with Challenge 1A (one namespace per model);
+        # one .npy file per text is the fallback when it cannot be imported
+        self.embedding_store = open_shared_embedding_store(model_name)
         
     def get_embedding_cache_key(self, text: str) -> str:
         """Generate cache key for text embeddings"""
@@ -1036,6 +1053,10 @@ class CacheManager:
     
     def cache_embeddings(self, text: str, embedding: np.ndarray):
         """Cache embeddings for reuse"""
+        if self.embedding_store is not None:
+            self.embedding_store.put(text, embedding)
+            return
+        
         cache_key = self.get_embedding_cache_key(text)
         cache_file = self.cache_dir / f"emb_{cache_key}.npy"
         try:
@@ -1045,6 +1066,9 @@ class CacheManager:
     
     def load_cached_embedding(self, text: str) -> Optional[np.ndarray]:
         """Load cached embedding if available"""
+        if self.embedding_store is not None:
+            return self.embedding_store.get(text)
+        
         cache_key = self.get_embedding_cache_key(text)
         cache_file = self.cache_dir / f"emb_{cache_key}.npy"
         
@@ -1054,6 +1078,20 @@ class CacheManager:
             except Exception as e:
                 logger.warning(f"Failed to load cached embedding: {e}")
         return None
+    
+    def load_cached_embeddings(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Load cached embeddings for several texts (None where not cached)"""
+        if self.embedding_store is not None:
+            return self.embedding_store.get_many(texts)
+        return [self.load_cached_embedding(text) for text in texts]
+    
+    def cache_embeddings_many(self, texts: List[str], embeddings: List[np.ndarray]):
+        """Cache embeddings for several texts"""
+        if self.embedding_store is not None:
+            self.embedding_store.put_many(texts, embeddings)
+            return
+        for text, embedding in zip(texts, embeddings):
+            self.cache_embeddings(text, embedding)
 
 def create_performance_optimized_processor(enable_caching: bool = True, 
                                          enable_multilingual: bool = False) -> AdvancedDocumentProcessor:
@@ -1079,9 +1117,8 @@ def create_performance_optimized_processor(enable_caching: bool = True,
             uncached_texts = []
             uncached_indices = []
             
-            # Check cache for each text
-            for i, text in enumerate(texts):
-                cached = processor.cache_manager.load_cached_embedding(text)
+            # Check cache for all texts at once
+            for i, (text, cached) in enumerate(zip(texts, processor.cache_manager.load_cached_embeddings(texts))):
                 if cached is not None:
                     results.append((i, cached))
                 else:
@@ -1093,8 +1130,8 @@ def create_performance_optimized_processor(enable_caching: bool = True,
                 new_embeddings = original_encode(uncached_texts, **kwargs)
                 
                 # Cache new embeddings and add to results
-                for idx, (text, embedding) in enumerate(zip(uncached_texts, new_embeddings)):
-                    processor.cache_manager.cache_embeddings(text, embedding)
+                processor.cache_manager.cache_embeddings_many(uncached_texts, new_embeddings)
+                for idx, embedding in enumerate(new_embeddings):
                     results.append((uncached_indices[idx], embedding))
             
             # Sort results by original order and extract embeddings